@@ -0,0 +1,99 @@
+"""
+Latência de `/embrapa/*` durante uma rajada de logins.
+
+Mede p50/p99 de GETs em uma rota da Embrapa em duas fases: sem carga e com
+`--logins` clientes fazendo POST /auth/token em paralelo. Com o bcrypt fora do
+event loop, o p99 das rotas da Embrapa deve ficar praticamente igual nas duas fases.
+
+Uso (com a API rodando):
+    python benchmarks/login_storm.py --base-url http://localhost:8000 \\
+        --username admin --password <senha> --rota /embrapa/producao
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+async def token(cliente: httpx.AsyncClient, username: str, password: str) -> str:
+    resposta = await cliente.post("/auth/token", data={"username": username, "password": password})
+    resposta.raise_for_status()
+    return resposta.json()["access_token"]
+
+
+async def medir(cliente: httpx.AsyncClient, rota: str, headers: Dict[str, str], requisicoes: int, concorrencia: int) -> List[float]:
+    """Latências (ms) de `requisicoes` GETs em `rota`, com `concorrencia` clientes."""
+    latencias: List[float] = []
+    restantes = iter(range(requisicoes))
+
+    async def cliente_leitura():
+        for _ in restantes:
+            inicio = time.perf_counter()
+            resposta = await cliente.get(rota, headers=headers)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            resposta.raise_for_status()
+
+    await asyncio.gather(*(cliente_leitura() for _ in range(concorrencia)))
+    return latencias
+
+
+async def rajada(cliente: httpx.AsyncClient, username: str, password: str, clientes: int, parar: asyncio.Event) -> Dict[str, int]:
+    """Logins em loop até `parar` (respeitando o Retry-After dos 503); conta as respostas por status."""
+    contagem: Dict[str, int] = {}
+
+    async def cliente_login():
+        while not parar.is_set():
+            resposta = await cliente.post("/auth/token", data={"username": username, "password": password})
+            contagem[str(resposta.status_code)] = contagem.get(str(resposta.status_code), 0) + 1
+            if resposta.status_code == 503:
+                await asyncio.sleep(float(resposta.headers.get("Retry-After", 1)))
+
+    await asyncio.gather(*(cliente_login() for _ in range(clientes)))
+    return contagem
+
+
+def resumo(nome: str, latencias: List[float]) -> None:
+    print(
+        f"{nome:<12} n={len(latencias):<5} p50={percentil(latencias, 0.50):8.2f} ms  "
+        f"p99={percentil(latencias, 0.99):8.2f} ms  média={statistics.mean(latencias):8.2f} ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    limites = httpx.Limits(max_connections=args.logins + args.concorrencia + 8)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limites) as cliente:
+        headers = {"Authorization": f"Bearer {await token(cliente, args.username, args.password)}"}
+        await medir(cliente, args.rota, headers, args.concorrencia * 5, args.concorrencia)  # aquecimento
+
+        sem_carga = await medir(cliente, args.rota, headers, args.requisicoes, args.concorrencia)
+
+        parar = asyncio.Event()
+        logins = asyncio.create_task(rajada(cliente, args.username, args.password, args.logins, parar))
+        await asyncio.sleep(0.5)  # deixa a rajada começar
+        com_carga = await medir(cliente, args.rota, headers, args.requisicoes, args.concorrencia)
+        parar.set()
+        contagem = await logins
+
+    resumo("sem logins", sem_carga)
+    resumo("com logins", com_carga)
+    print(f"logins por status: {contagem}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--rota", default="/embrapa/producao", help="Rota da Embrapa medida")
+    parser.add_argument("--requisicoes", type=int, default=500, help="GETs por fase")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Clientes de leitura simultâneos")
+    parser.add_argument("--logins", type=int, default=32, help="Clientes de login simultâneos na rajada")
+    asyncio.run(main(parser.parse_args()))
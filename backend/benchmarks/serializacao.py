@@ -0,0 +1,125 @@
+"""
+Vazão de um worker nas rotas `/embrapa/*`: `response_model` x bytes pré-serializados.
+
+Sobe um uvicorn de um worker com duas rotas sobre o mesmo dataset em memória:
+`/antes`, como as rotas originais (lista de dicionários validada pelo
+`response_model=List[Dict]` e serializada pelo FastAPI), e `/depois`, como
+`_responder_dataset` (bytes do `corpo_serializado`, na variante pedida pelo
+`Accept-Encoding`). O dataset é gerado no layout do ImpVinhos.csv (país e
+quantidade/valor por ano).
+
+Além das requisições/s vistas pelo cliente, mostra a capacidade do worker:
+requisições por segundo de CPU do processo do servidor (lido de /proc, só em
+Linux), que não depende de quanto CPU o próprio cliente consome.
+
+Uso (a partir de backend/src):
+    PYTHONPATH=. python ../benchmarks/serializacao.py --linhas 140 --anos 54
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, List
+
+import httpx
+
+from core.settings import settings
+from domain.external_api.use_cases import DATASETS_EMBRAPA, UseCases
+
+
+def gerar_csv(linhas: int, anos: int) -> bytes:
+    """CSV no layout do ImpVinhos.csv: Id, País e duas colunas (quantidade, valor) por ano."""
+    aleatorio = random.Random(0)
+    cabecalho = ["Id", "País"] + [str(1970 + i) for i in range(anos) for _ in range(2)]
+    corpo = ["\t".join(cabecalho)]
+    for i in range(linhas):
+        valores = [str(aleatorio.randint(0, 5_000_000)) if aleatorio.random() > 0.2 else "0" for _ in range(2 * anos)]
+        corpo.append("\t".join([str(i + 1), f"País {i + 1}"] + valores))
+    return "\n".join(corpo).encode("latin1")
+
+
+def montar(linhas: int, anos: int):
+    config = DATASETS_EMBRAPA["importacao"]
+    settings.EMBRAPA_SNAPSHOT_ENABLED = False
+    df = UseCases.parse_csv(gerar_csv(linhas, anos), config["sep"], config["encoding"], config["num_colunas_fixas"])
+    return UseCases.montar_dataset(df, config["num_colunas_fixas"], None, config["csv_url"], config["sep"], config["encoding"], {})
+
+
+def servidor(porta: int, linhas: int, anos: int) -> None:
+    import uvicorn
+    from fastapi import FastAPI, Request, Response
+
+    dataset = montar(linhas, anos)
+    registros = dataset.registros()
+    app = FastAPI()
+
+    @app.get("/antes", response_model=List[Dict])
+    def antes():
+        return registros
+
+    @app.get("/depois", response_model=List[Dict])
+    async def depois(request: Request):
+        corpo, content_encoding = dataset.corpo_serializado().escolher(request.headers.get("accept-encoding", ""))
+        headers = {"Content-Encoding": content_encoding} if content_encoding else {}
+        return Response(content=corpo, media_type="application/json", headers=headers)
+
+    uvicorn.run(app, port=porta, log_level="warning", access_log=False)
+
+
+def cpu_processo(pid: int) -> float:
+    """Tempo de CPU (usuário + sistema, em segundos) do processo `pid`."""
+    with open(f"/proc/{pid}/stat") as arquivo:
+        campos = arquivo.read().rsplit(")", 1)[1].split()
+    return (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def medir(base_url: str, rota: str, accept_encoding: str, requisicoes: int, concorrencia: int, pid: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, headers={"Accept-Encoding": accept_encoding}) as cliente:
+        for _ in range(concorrencia * 5):  # aquecimento
+            (await cliente.get(rota)).raise_for_status()
+        restantes = iter(range(requisicoes))
+        tamanho = int((await cliente.get(rota)).headers["content-length"])  # bytes no fio
+
+        async def cliente_leitura():
+            for _ in restantes:
+                (await cliente.get(rota)).raise_for_status()
+
+        cpu_inicio, inicio = cpu_processo(pid), time.perf_counter()
+        await asyncio.gather(*(cliente_leitura() for _ in range(concorrencia)))
+        duracao, cpu = time.perf_counter() - inicio, cpu_processo(pid) - cpu_inicio
+    return requisicoes / duracao, requisicoes / cpu, tamanho
+
+
+async def main(args: argparse.Namespace) -> None:
+    processo = multiprocessing.Process(target=servidor, args=(args.porta, args.linhas, args.anos), daemon=True)
+    processo.start()
+    base_url = f"http://127.0.0.1:{args.porta}"
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(base_url + "/docs")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        print(f"{'rota':<8} {'accept-encoding':<16} {'bytes':>8} {'req/s':>8} {'req/s de CPU do worker':>24}")
+        for rota in ("/antes", "/depois"):
+            for accept_encoding in ("identity", "gzip", "br"):
+                if rota == "/antes" and accept_encoding != "identity":
+                    continue  # o FastAPI não comprime sem um middleware
+                requisicoes = args.requisicoes if rota == "/depois" else max(args.requisicoes // 10, 50)
+                vazao, capacidade, tamanho = await medir(base_url, rota, accept_encoding, requisicoes, args.concorrencia, processo.pid)
+                print(f"{rota:<8} {accept_encoding:<16} {tamanho:>8} {vazao:>8.0f} {capacidade:>24.0f}")
+    finally:
+        processo.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--linhas", type=int, default=140, help="Países no dataset gerado")
+    parser.add_argument("--anos", type=int, default=54, help="Anos no dataset gerado (duas colunas por ano)")
+    parser.add_argument("--requisicoes", type=int, default=2000, help="GETs por medição em /depois (/antes usa 1/10)")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Clientes simultâneos")
+    parser.add_argument("--porta", type=int, default=8799)
+    asyncio.run(main(parser.parse_args()))
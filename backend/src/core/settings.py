@@ -22,6 +22,15 @@ class Settings:
     DB_DATABASENAME = os.getenv("DB_DATABASENAME")
     DB_PORT = int(os.getenv("DB_PORT"))
 
+    # Pool de conexões do banco (engines síncrono e assíncrono)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Sessões assíncronas (asyncpg/aiosqlite) nas rotas de usuários e auth
+    DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+
     INITIAL_USER_LOGIN_JWT=os.getenv("INITIAL_USER_LOGIN_JWT")
     INITIAL_USER_PASSWORD_JWT=os.getenv("INITIAL_USER_PASSWORD_JWT")
     INITIAL_USER_EMAIL_JWT=os.getenv("INITIAL_USER_EMAIL_JWT")
@@ -37,6 +46,75 @@ class Settings:
     SECRET_KEY = "mysecretkey"
     ALGORITHM = "HS256"
     JWT_EXP_MINUTES = 30
+    # Tokens já verificados mantidos em memória até o `exp` (0 desliga o cache)
+    JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "4096"))
+
+    # Login: pool dedicado ao bcrypt e limite de logins simultâneos (com fila)
+    AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+    AUTH_LOGIN_CONCURRENCY = int(os.getenv("AUTH_LOGIN_CONCURRENCY", "4"))
+    AUTH_LOGIN_MAX_QUEUE = int(os.getenv("AUTH_LOGIN_MAX_QUEUE", "64"))
+
+    # Cache dos datasets da Embrapa
+    EMBRAPA_CACHE_TTL_SECONDS = int(os.getenv("EMBRAPA_CACHE_TTL_SECONDS", "21600"))
+    EMBRAPA_CACHE_MAX_ENTRIES = int(os.getenv("EMBRAPA_CACHE_MAX_ENTRIES", "32"))
+    # Corpos de junção (por par de versões) e agregações memoizadas em cada dataset (por versão)
+    EMBRAPA_JOIN_CACHE_MAX_ENTRIES = int(os.getenv("EMBRAPA_JOIN_CACHE_MAX_ENTRIES", "64"))
+    EMBRAPA_AGGREGATION_CACHE_MAX_ENTRIES = int(os.getenv("EMBRAPA_AGGREGATION_CACHE_MAX_ENTRIES", "128"))
+
+    # Cliente HTTP do upstream da Embrapa
+    EMBRAPA_HTTP_TIMEOUT_SECONDS = float(os.getenv("EMBRAPA_HTTP_TIMEOUT_SECONDS", "10"))
+    EMBRAPA_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("EMBRAPA_HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+    EMBRAPA_HTTP_MAX_CONNECTIONS = int(os.getenv("EMBRAPA_HTTP_MAX_CONNECTIONS", "20"))
+    EMBRAPA_HTTP_MAX_KEEPALIVE = int(os.getenv("EMBRAPA_HTTP_MAX_KEEPALIVE", "10"))
+    EMBRAPA_PARSE_WORKERS = int(os.getenv("EMBRAPA_PARSE_WORKERS", "2"))
+    # Leitor dos CSVs: "auto" (pyarrow, se instalado), "pyarrow" ou "pandas"
+    EMBRAPA_CSV_ENGINE = os.getenv("EMBRAPA_CSV_ENGINE", "auto")
+
+    # Origem dos CSVs da Embrapa: "http" (site), "local" (diretório EMBRAPA_SOURCE_DIR, sem rede)
+    # ou "record" (baixa do site e grava uma cópia em EMBRAPA_SOURCE_DIR). Local e record exigem o diretório
+    EMBRAPA_SOURCE = os.getenv("EMBRAPA_SOURCE", "http").lower()
+    EMBRAPA_SOURCE_DIR = os.getenv("EMBRAPA_SOURCE_DIR")
+
+    # Circuit breaker do upstream da Embrapa
+    EMBRAPA_CB_FAILURE_THRESHOLD = int(os.getenv("EMBRAPA_CB_FAILURE_THRESHOLD", "3"))
+    EMBRAPA_CB_RESET_SECONDS = float(os.getenv("EMBRAPA_CB_RESET_SECONDS", "30"))
+    EMBRAPA_CB_MAX_RESET_SECONDS = float(os.getenv("EMBRAPA_CB_MAX_RESET_SECONDS", "600"))
+    EMBRAPA_CB_BACKOFF_FACTOR = float(os.getenv("EMBRAPA_CB_BACKOFF_FACTOR", "2"))
+
+    # Agendador de ingestão dos datasets da Embrapa
+    EMBRAPA_SCHEDULER_ENABLED = os.getenv("EMBRAPA_SCHEDULER_ENABLED", "true").lower() == "true"
+    EMBRAPA_REFRESH_INTERVAL_SECONDS = float(os.getenv("EMBRAPA_REFRESH_INTERVAL_SECONDS", "3600"))
+    EMBRAPA_REFRESH_JITTER_SECONDS = float(os.getenv("EMBRAPA_REFRESH_JITTER_SECONDS", "300"))
+    EMBRAPA_REFRESH_RETRY_SECONDS = float(os.getenv("EMBRAPA_REFRESH_RETRY_SECONDS", "60"))
+    EMBRAPA_INGESTION_CONCURRENCY = int(os.getenv("EMBRAPA_INGESTION_CONCURRENCY", "4"))
+    # Datasets exigidos pelo /embrapa/ready, separados por vírgula (vazio = todos)
+    EMBRAPA_READY_DATASETS = [
+        nome.strip()
+        for nome in os.getenv("EMBRAPA_READY_DATASETS", "producao,processamento,comercializacao,importacao,exportacao").split(",")
+        if nome.strip()
+    ]
+
+    # Snapshots em disco dos datasets da Embrapa (por padrão em backend/snapshots; no compose, no volume /snapshots)
+    EMBRAPA_SNAPSHOT_ENABLED = os.getenv("EMBRAPA_SNAPSHOT_ENABLED", "true").lower() == "true"
+    EMBRAPA_SNAPSHOT_DIR = os.getenv("EMBRAPA_SNAPSHOT_DIR", str(Path(__file__).resolve().parents[2] / "snapshots"))
+
+    # Paginação das rotas /embrapa
+    EMBRAPA_PAGE_DEFAULT_LIMIT = int(os.getenv("EMBRAPA_PAGE_DEFAULT_LIMIT", "100"))
+    EMBRAPA_PAGE_MAX_LIMIT = int(os.getenv("EMBRAPA_PAGE_MAX_LIMIT", "1000"))
+
+    # Paginação de /users (cursor `after_id`)
+    USERS_PAGE_DEFAULT_LIMIT = int(os.getenv("USERS_PAGE_DEFAULT_LIMIT", "50"))
+    USERS_PAGE_MAX_LIMIT = int(os.getenv("USERS_PAGE_MAX_LIMIT", "500"))
+
+    # Cache HTTP das respostas /embrapa (Cache-Control: max-age)
+    EMBRAPA_HTTP_CACHE_MAX_AGE = int(os.getenv("EMBRAPA_HTTP_CACHE_MAX_AGE", "300"))
+
+    # Carga das séries da Embrapa no banco (tabela embrapa_series)
+    EMBRAPA_DB_SYNC_ENABLED = os.getenv("EMBRAPA_DB_SYNC_ENABLED", "true").lower() == "true"
+    EMBRAPA_DB_BATCH_SIZE = int(os.getenv("EMBRAPA_DB_BATCH_SIZE", "5000"))
+
+    # Feed de mudanças (/embrapa/{dataset}/changes): atualizações guardadas por dataset
+    EMBRAPA_CHANGES_MAX_VERSIONS = int(os.getenv("EMBRAPA_CHANGES_MAX_VERSIONS", "24"))
 
 # Instância global
 settings = Settings()
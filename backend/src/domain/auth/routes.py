@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 from typing import Annotated
 
 from domain.user.schemas import UserTypeEnum
-from domain.auth.use_cases import UseCases as AuthUserCases
-from infra.db.database import get_db
-from utils.auth import AuthUtils
+from domain.auth.use_cases import AsyncUseCases as AuthAsyncUseCases
+from infra.db.database import DbSession, get_session
+from utils.auth import AuthUtils, token_cache
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -19,14 +18,15 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 )
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Realiza autenticação do usuário com username/email e senha.
 
-    Retorna um token JWT em caso de sucesso.
+    Retorna um token JWT em caso de sucesso. A verificação da senha (bcrypt)
+    roda fora do event loop; com muitos logins simultâneos retorna 503 com `Retry-After`.
     """
-    access_token = AuthUserCases.login(
+    access_token = await AuthAsyncUseCases.login(
         email_or_username=form_data.username,
         password=form_data.password,
         db_session=db
@@ -34,6 +34,27 @@ async def login(
     return access_token
 
 
+# 📊 Estatísticas do cache de tokens - ADMIN ou SUPERUSER
+@router.get(
+    "/token-cache",
+    summary="Estatísticas do cache de tokens",
+    description="Retorna o tamanho e os contadores de acertos/faltas do cache de tokens JWT verificados. Acesso restrito a `admin` ou `superuser`."
+)
+def token_cache_stats(
+    current_data_from_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+    """
+    Retorna `entries`, `hits`, `misses`, `expired` e `hit_ratio` do cache de tokens.
+
+    Retorna erro 403 se o papel não for `admin` ou `superuser`.
+    """
+    if current_data_from_token.get("user_type") not in ["superuser", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para acessar este recurso.",
+        )
+    return token_cache.stats()
+
+
 # ✅ Rota Pública Teste
 @router.get(
     "/test/public",
@@ -1,24 +1,82 @@
+import asyncio
+from typing import Optional
+
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.settings import settings
+from infra.db.database import DbSession
 from infra.db.models import User,UserTypeEnum
-from fastapi import HTTPException
+from fastapi import HTTPException, status
 from utils.auth import AuthUtils  # Certifique-se de importar a classe AuthUtils
 
 class UseCases:
-    
+
+    @staticmethod
+    def buscar_usuario(email_or_username, db_session: Session) -> Optional[User]:
+        return db_session.query(User).filter(or_(User.email == email_or_username, User.username == email_or_username)).first()
+
+
+class AsyncUseCases:
+    """
+    Login sem bloquear o event loop.
+
+    A consulta ao banco usa a `AsyncSession` (DB_ASYNC_ENABLED) ou, com uma
+    `Session` síncrona, roda no threadpool padrão; a verificação do bcrypt roda
+    no pool dedicado (`password_executor`). No máximo `AUTH_LOGIN_CONCURRENCY`
+    logins são processados ao mesmo tempo por worker; os demais esperam na
+    fila, limitada a `AUTH_LOGIN_MAX_QUEUE` (acima disso, 503 com Retry-After).
+    """
+
+    _semaforo: Optional[asyncio.Semaphore] = None
+    _semaforo_loop = None
+    _pendentes = 0
+
     @staticmethod
-    def login(email_or_username, password, db_session: Session):
-        user = db_session.query(User).filter(or_(User.email == email_or_username, User.username == email_or_username)).first()
+    def _limite() -> asyncio.Semaphore:
+        # O semáforo pertence a um event loop; recria se o loop mudou (ex: testes, reload)
+        loop = asyncio.get_running_loop()
+        if AsyncUseCases._semaforo is None or AsyncUseCases._semaforo_loop is not loop:
+            AsyncUseCases._semaforo = asyncio.Semaphore(settings.AUTH_LOGIN_CONCURRENCY)
+            AsyncUseCases._semaforo_loop = loop
+        return AsyncUseCases._semaforo
+
+    @staticmethod
+    async def buscar_usuario(email_or_username, db_session: DbSession) -> Optional[User]:
+        if isinstance(db_session, AsyncSession):
+            resultado = await db_session.execute(
+                select(User).where(or_(User.email == email_or_username, User.username == email_or_username)).limit(1)
+            )
+            return resultado.scalars().first()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, UseCases.buscar_usuario, email_or_username, db_session)
+
+    @staticmethod
+    async def login(email_or_username, password, db_session: DbSession):
+        if AsyncUseCases._pendentes >= settings.AUTH_LOGIN_CONCURRENCY + settings.AUTH_LOGIN_MAX_QUEUE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Muitas tentativas de login simultâneas. Tente novamente em instantes.",
+                headers={"Retry-After": "1"},
+            )
+        AsyncUseCases._pendentes += 1
+        try:
+            async with AsyncUseCases._limite():
+                return await AsyncUseCases._login(email_or_username, password, db_session)
+        finally:
+            AsyncUseCases._pendentes -= 1
+
+    @staticmethod
+    async def _login(email_or_username, password, db_session: DbSession):
+        user = await AsyncUseCases.buscar_usuario(email_or_username, db_session)
         if not user:
             raise HTTPException(status_code=404, detail="User/Email not found")
-        print(type(user.is_active), user.is_active)
 
         if not user.is_active:
-            print("Entrou no if")
             raise HTTPException(status_code=401, detail="User account is not active. Please contact an administrator for approval.")
 
-        if not AuthUtils.verify_password(password, user.hashed_password):
+        if not await AuthUtils.averify_password(password, user.hashed_password):
             raise HTTPException(status_code=401, detail="Incorrect password")
-        
+
         access_token = AuthUtils.create_access_token(data={"sub": user.username, "user_type": user.user_type})
-        return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+        return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.settings import settings
+from domain.external_api.dataset import EmbrapaDataset
+from domain.external_api.schemas import AgregacaoSchema, FiltrosDatasetSchema
+from domain.external_api.use_cases import UseCases
+
+# Operações que só fazem sentido sobre a série anual (group_by=ano)
+OPERACOES_SERIE = ("yoy", "moving_avg")
+
+
+def _valor(numero: float, inteiro: bool = False):
+    """Converte para float (ou int) do Python; NaN/infinito viram None (null no JSON)."""
+    if not np.isfinite(numero):
+        return None
+    return int(numero) if inteiro else float(numero)
+
+
+class AgregacaoUseCases:
+    """
+    Agregações sobre a matriz numérica (linhas x anos) de um dataset em cache.
+
+    Todas as operações são vetorizadas (NumPy/pandas) e o resultado é memoizado
+    no próprio dataset, ou seja, vale enquanto a versão em cache não mudar.
+    """
+
+    @staticmethod
+    def agregar(
+        dataset: EmbrapaDataset,
+        parametros: AgregacaoSchema,
+        filtros: Optional[FiltrosDatasetSchema] = None,
+    ) -> List[Dict]:
+        chave = (parametros.model_dump_json(), filtros.model_dump_json() if filtros else None)
+        return dataset.memoizar_agregacao(
+            chave,
+            lambda: AgregacaoUseCases._calcular(dataset, parametros, filtros),
+            settings.EMBRAPA_AGGREGATION_CACHE_MAX_ENTRIES,
+        )
+
+    @staticmethod
+    def colunas_medida(dataset: EmbrapaDataset, medida: Optional[str], posicoes_anos: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Colunas de ano usadas na agregação.
+
+        Nos datasets com duas colunas por ano (quantidade e valor) é preciso escolher
+        uma delas, para não somar grandezas diferentes; o padrão é `valor`. Nos
+        demais, qualquer `medida` é rejeitada.
+        """
+        posicoes = np.arange(len(dataset.anos)) if posicoes_anos is None else np.asarray(posicoes_anos)
+        if dataset.possui_medidas:
+            posicoes = np.intersect1d(posicoes, dataset.posicoes_medida(medida or "valor"))
+        elif medida is not None:
+            raise ValueError("Este dataset possui uma única medida por ano; o parâmetro 'medida' não se aplica.")
+        return posicoes
+
+    @staticmethod
+    def _calcular(dataset: EmbrapaDataset, parametros: AgregacaoSchema, filtros: Optional[FiltrosDatasetSchema]) -> List[Dict]:
+        selecao = UseCases.selecionar(dataset, filtros)
+        linhas = np.arange(dataset.num_linhas) if selecao.linhas is None else selecao.linhas
+        colunas = AgregacaoUseCases.colunas_medida(dataset, parametros.medida, selecao.posicoes_anos)
+        matriz = dataset.valores[np.ix_(linhas, colunas)]
+
+        if parametros.group_by.lower() == "ano":
+            anos = np.floor(np.asarray(dataset.anos)[colunas]).astype(np.int64)
+            resultado = AgregacaoUseCases._por_ano(matriz, anos, parametros)
+        else:
+            if parametros.op in OPERACOES_SERIE:
+                raise ValueError(f"A operação '{parametros.op}' só é suportada com group_by=ano.")
+            posicao = dataset.posicao_coluna_fixa(parametros.group_by)
+            if posicao is None:
+                raise ValueError(f"Coluna '{parametros.group_by}' inexistente. Use 'ano' ou uma das colunas: {', '.join(dataset.colunas_fixas)}")
+            codigos, distintos = dataset.codigos_chave(posicao)
+            resultado = AgregacaoUseCases._por_chave(matriz, codigos[linhas], distintos, parametros)
+
+        if parametros.top is not None:
+            resultado = sorted(
+                resultado, key=lambda item: (item["valor"] is None, -(item["valor"] or 0))
+            )[:parametros.top]
+        return resultado
+
+    @staticmethod
+    def _por_ano(matriz: np.ndarray, anos: np.ndarray, parametros: AgregacaoSchema) -> List[Dict]:
+        """Agrega as linhas de cada ano; `yoy` e `moving_avg` partem do total anual."""
+        contagem = np.sum(~np.isnan(matriz), axis=0)
+        op = parametros.op
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if op == "count":
+                serie = contagem.astype(np.float64)
+            elif op == "mean":
+                serie = np.nansum(matriz, axis=0) / contagem
+            elif op in ("min", "max"):
+                reducao = np.fmin if op == "min" else np.fmax
+                serie = reducao.reduce(matriz, axis=0, initial=np.nan) if matriz.shape[0] else np.full(len(anos), np.nan)
+            else:
+                serie = np.where(contagem > 0, np.nansum(matriz, axis=0), np.nan)
+                if op == "yoy":
+                    anterior = np.concatenate(([np.nan], serie[:-1]))
+                    serie = np.where(anterior != 0, (serie - anterior) / anterior, np.nan)
+                elif op == "moving_avg":
+                    serie = pd.Series(serie).rolling(parametros.janela, min_periods=parametros.janela).mean().to_numpy()
+        return [{"ano": int(ano), "valor": _valor(v, op == "count")} for ano, v in zip(anos.tolist(), serie.tolist())]
+
+    @staticmethod
+    def _por_chave(matriz: np.ndarray, codigos: np.ndarray, distintos, parametros: AgregacaoSchema) -> List[Dict]:
+        """Agrega todas as células (linhas x anos) de cada valor distinto da coluna."""
+        n = len(distintos)
+        validos = codigos >= 0
+        matriz, codigos = matriz[validos], codigos[validos]
+        contagem = np.bincount(codigos, weights=np.sum(~np.isnan(matriz), axis=1), minlength=n)
+        presentes = np.bincount(codigos, minlength=n) > 0
+        op = parametros.op
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if op == "count":
+                serie = contagem
+            elif op in ("min", "max"):
+                por_linha = (np.fmin if op == "min" else np.fmax).reduce(matriz, axis=1, initial=np.nan) if matriz.shape[1] else np.full(len(codigos), np.nan)
+                agrupado = getattr(pd.Series(por_linha).groupby(codigos), op)()
+                serie = np.full(n, np.nan)
+                serie[agrupado.index.to_numpy()] = agrupado.to_numpy()
+            else:
+                soma = np.bincount(codigos, weights=np.nansum(matriz, axis=1), minlength=n)
+                serie = soma / contagem if op == "mean" else np.where(contagem > 0, soma, np.nan)
+        return [
+            {"chave": distintos[i], "valor": _valor(serie[i], op == "count")}
+            for i in np.flatnonzero(presentes).tolist()
+        ]
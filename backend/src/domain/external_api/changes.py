@@ -0,0 +1,120 @@
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from domain.external_api.dataset import EmbrapaDataset
+
+# Colunas que identificam uma célula entre duas versões do dataset
+CHAVE_CELULA = ["categoria", "chave", "ocorrencia", "ano", "medida"]
+
+
+def celulas(dataset: EmbrapaDataset, posicao_chave: int, posicao_categoria: Optional[int]) -> pd.DataFrame:
+    """
+    Células com valor do dataset, identificadas por (categoria, chave, ocorrência, ano, medida).
+
+    A ocorrência diferencia linhas repetidas com a mesma categoria e chave, sem
+    depender da posição da linha no CSV (que muda quando linhas são inseridas).
+    É também a identidade das linhas da tabela `embrapa_series`.
+
+    Returns:
+        pd.DataFrame: Colunas `categoria`, `chave`, `ocorrencia`, `ano`, `medida` e `valor`.
+    """
+    longo = dataset.formato_longo(posicao_chave, posicao_categoria)
+    linhas = pd.DataFrame({
+        "categoria": None if posicao_categoria is None else dataset.coluna_fixa(posicao_categoria),
+        "chave": pd.Series(dataset.coluna_fixa(posicao_chave), dtype=object).astype(str).str.strip(),
+    })
+    ocorrencia = linhas.groupby(["categoria", "chave"], dropna=False, sort=False).cumcount().to_numpy()
+    longo["ocorrencia"] = ocorrencia[longo["linha"].to_numpy()]
+    return longo.drop(columns="linha")[CHAVE_CELULA + ["valor"]]
+
+
+def calcular_mudancas(
+    anterior: EmbrapaDataset,
+    atual: EmbrapaDataset,
+    posicao_chave: int,
+    posicao_categoria: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Compara duas versões de um dataset célula a célula (junção externa pelas chaves).
+
+    Returns:
+        List[Dict]: Células inseridas, atualizadas ou removidas, com o valor anterior e o atual.
+    """
+    juntas = celulas(anterior, posicao_chave, posicao_categoria).merge(
+        celulas(atual, posicao_chave, posicao_categoria),
+        on=CHAVE_CELULA, how="outer", suffixes=("_anterior", "_atual"), indicator=True,
+    )
+    origem = juntas["_merge"].to_numpy()
+    tipos = np.select(
+        [origem == "right_only", origem == "left_only"], ["insercao", "remocao"], default="atualizacao"
+    )
+    alteradas = (origem != "both") | (juntas["valor_anterior"].to_numpy() != juntas["valor_atual"].to_numpy())
+    juntas = juntas.loc[alteradas].assign(tipo=tipos[alteradas]).sort_values(["chave", "ano"], kind="stable")
+
+    juntas = juntas.astype(object).where(juntas.notna(), None)
+    return [
+        {
+            "tipo": tipo,
+            "categoria": categoria,
+            "chave": chave,
+            "ocorrencia": int(ocorrencia),
+            "ano": int(ano),
+            "medida": medida,
+            "anterior": anterior_valor,
+            "atual": atual_valor,
+        }
+        for tipo, categoria, chave, ocorrencia, ano, medida, anterior_valor, atual_valor in zip(
+            juntas["tipo"], juntas["categoria"], juntas["chave"], juntas["ocorrencia"], juntas["ano"],
+            juntas["medida"], juntas["valor_anterior"], juntas["valor_atual"],
+        )
+    ]
+
+
+class FeedMudancas:
+    """
+    Histórico em memória das mudanças entre versões consecutivas de cada dataset.
+
+    O histórico é do processo: cada worker/réplica guarda as atualizações que ele
+    mesmo observou. Também é a fonte da carga incremental de `embrapa_series`.
+
+    Guarda as últimas `max_versoes` atualizações por dataset; clientes que pedem
+    mudanças desde uma versão mais antiga (ou desconhecida) precisam recarregar
+    o dataset completo.
+    """
+
+    def __init__(self, max_versoes: int = 24):
+        self.max_versoes = max_versoes
+        self._feeds: Dict[Hashable, Deque[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, chave: Hashable, versao_anterior: str, versao: str, mudancas: List[Dict]) -> None:
+        atualizacao = {
+            "versao_anterior": versao_anterior,
+            "versao": versao,
+            "registrado_em": datetime.now(timezone.utc).isoformat(),
+            "mudancas": mudancas,
+        }
+        with self._lock:
+            self._feeds.setdefault(chave, deque(maxlen=self.max_versoes)).append(atualizacao)
+
+    def desde(self, chave: Hashable, versao: str, versao_atual: str) -> Optional[List[Dict]]:
+        """
+        Atualizações aplicadas depois de `versao`, da mais antiga para a mais recente.
+
+        Returns:
+            Optional[List[Dict]]: Lista (vazia se `versao` já é a atual) ou None se a
+            versão não está mais (ou nunca esteve) no histórico.
+        """
+        if versao == versao_atual:
+            return []
+        with self._lock:
+            atualizacoes = list(self._feeds.get(chave, ()))
+        for i, atualizacao in enumerate(atualizacoes):
+            if atualizacao["versao_anterior"] == versao:
+                return atualizacoes[i:]
+        return None
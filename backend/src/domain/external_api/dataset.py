@@ -0,0 +1,432 @@
+import hashlib
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_bool_dtype, is_float_dtype, is_integer_dtype
+
+from domain.external_api.serialization import CorpoSerializado, json_bytes
+
+# Tipo de cada coluna de ano, usado para reproduzir o valor original na saída
+TIPO_INTEIRO = 0   # coluna inteira sem faltantes: valores emitidos como int
+TIPO_DECIMAL = 1   # coluna decimal: valores emitidos como float e faltantes como ''
+TIPO_TEXTO = 2     # coluna com texto: valores originais preservados em `textos`
+
+
+def remover_acentos(texto):
+    if not isinstance(texto, str):
+        return texto
+    nfkd = unicodedata.normalize('NFKD', texto)
+    return ''.join([c for c in nfkd if not unicodedata.combining(c)])
+
+
+def normalizar(valor) -> str:
+    """Forma usada nas buscas: sem acentos, sem espaços nas pontas e minúscula."""
+    return remover_acentos(str(valor)).strip().lower()
+
+
+class SelecaoDataset(NamedTuple):
+    """Subconjunto de um dataset: linhas, colunas de ano e colunas fixas (None = todas)."""
+    linhas: Optional[np.ndarray] = None
+    posicoes_anos: Optional[np.ndarray] = None
+    campos: Optional[List[int]] = None
+
+
+class EmbrapaDataset:
+    """
+    Representação colunar de um dataset da Embrapa.
+
+    As colunas fixas (ex: id, controle, produto/país) são categóricas: para cada
+    coluna, `codigos` (int32 por linha, -1 nos faltantes) e `categorias` (valores
+    distintos). As colunas de ano viram uma matriz `valores` (linhas x anos)
+    float64 com NaN nos faltantes. Essa forma é a que vai para o snapshot em
+    disco e pode ser aberta com memmap.
+
+    Os dicionários no formato JSON das rotas só são montados na saída
+    (`registros`, `corpo_serializado`) e não ficam em memória.
+    As primeiras `anos_como_campo` colunas de ano fazem parte da matriz, mas
+    saem como campo do registro (ex: `"1970": 52297`), como nas rotas originais.
+
+    A `versao` é um hash do conteúdo e muda apenas quando os dados mudam.
+    """
+
+    def __init__(
+        self,
+        colunas_fixas: List[str],
+        codigos: List[np.ndarray],
+        categorias: List[list],
+        anos: np.ndarray,
+        valores: np.ndarray,
+        tipos: np.ndarray,
+        textos: Optional[Dict[int, list]] = None,
+        anos_como_campo: int = 0,
+        versao: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        criado_em: Optional[datetime] = None,
+    ):
+        self.colunas_fixas = colunas_fixas
+        self.codigos = codigos
+        self.categorias = categorias
+        self.anos = anos
+        self.valores = valores
+        self.tipos = tipos
+        self.textos = textos or {}
+        self.anos_como_campo = anos_como_campo
+        self.versao = versao or self._calcular_versao()
+        self.etag = etag
+        self.last_modified = last_modified
+        self.criado_em = criado_em or datetime.now(timezone.utc)
+        # Categorias + '' no fim: o código -1 (faltante) é decodificado como ''
+        self._tabelas = [np.array(list(c) + [''], dtype=object) for c in categorias]
+        self._corpo: Optional[CorpoSerializado] = None
+        self._normalizados: Dict[int, List[str]] = {}
+        self._indices_chaves: Dict[int, Dict[str, np.ndarray]] = {}
+        self._agregacoes: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+        self._indice_anos: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    @property
+    def num_linhas(self) -> int:
+        return self.valores.shape[0]
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, num_colunas_fixas: int, anos_como_campo: int = 0) -> "EmbrapaDataset":
+        """
+        Monta o dataset a partir do DataFrame lido do CSV.
+
+        As primeiras `num_colunas_fixas` colunas são chaves; das demais, apenas
+        as que têm um ano como nome entram na matriz de valores. Faltantes
+        podem vir como NaN ou como '' (DataFrames após `fillna('')`).
+        `anos_como_campo` só muda o layout do JSON (ver a classe).
+        """
+        # Remove acentos das colunas
+        colunas = [remover_acentos(str(c)) for c in df.columns]
+        colunas_fixas = colunas[:num_colunas_fixas]
+
+        # Colunas de dados cujo nome é um ano válido (as demais são ignoradas)
+        anos, posicoes_anos = [], []
+        for posicao in range(num_colunas_fixas, len(colunas)):
+            try:
+                anos.append(float(colunas[posicao]))
+                posicoes_anos.append(posicao)
+            except (TypeError, ValueError):
+                continue
+
+        # Remove acentos em colunas tipo "Pais", normalizando cada valor distinto uma vez,
+        # e codifica cada coluna fixa como categórica
+        codigos, categorias = [], []
+        for posicao in range(len(colunas_fixas)):
+            serie = df.iloc[:, posicao]
+            if serie.dtype == object:
+                serie = serie.map({v: remover_acentos(v) for v in serie.unique()})
+            codigos_coluna, distintos = pd.factorize(serie)
+            codigos.append(codigos_coluna.astype(np.int32))
+            categorias.append(distintos.tolist())
+
+        valores = np.full((len(df), len(posicoes_anos)), np.nan, dtype=np.float64)
+        tipos = np.empty(len(posicoes_anos), dtype=np.int8)
+        textos: Dict[int, list] = {}
+        for j, posicao in enumerate(posicoes_anos):
+            serie = df.iloc[:, posicao]
+            if is_integer_dtype(serie.dtype) and not is_bool_dtype(serie.dtype):
+                tipos[j] = TIPO_INTEIRO
+                valores[:, j] = serie.to_numpy(dtype=np.float64)
+                continue
+            if is_float_dtype(serie.dtype):
+                tipos[j] = TIPO_DECIMAL
+                valores[:, j] = serie.to_numpy(dtype=np.float64)
+                continue
+
+            # Colunas object: decimais com faltantes, ou texto de fato
+            brutos = serie.to_numpy(dtype=object, copy=True)
+            faltantes = pd.isna(brutos) | (brutos == '')
+            brutos[faltantes] = ''
+            numericos = brutos.copy()
+            numericos[faltantes] = np.nan
+            if infer_dtype(numericos, skipna=True) in ("floating", "empty"):
+                tipos[j] = TIPO_DECIMAL
+                valores[:, j] = numericos.astype(np.float64)
+            else:
+                tipos[j] = TIPO_TEXTO
+                valores[:, j] = pd.to_numeric(pd.Series(numericos), errors="coerce").to_numpy(dtype=np.float64)
+                textos[j] = brutos.tolist()
+
+        return cls(
+            colunas_fixas=colunas_fixas,
+            codigos=codigos,
+            categorias=categorias,
+            anos=np.asarray(anos, dtype=np.float64),
+            valores=valores,
+            tipos=tipos,
+            textos=textos,
+            anos_como_campo=anos_como_campo,
+        )
+
+    def coluna_fixa(self, posicao: int, linhas: Optional[np.ndarray] = None) -> np.ndarray:
+        """Valores (decodificados) de uma coluna fixa, com '' nos faltantes."""
+        codigos = self.codigos[posicao] if linhas is None else self.codigos[posicao][linhas]
+        return self._tabelas[posicao][codigos]
+
+    def posicao_coluna_fixa(self, nome: str) -> Optional[int]:
+        """Posição da coluna fixa com o nome informado (sem diferenciar acentos/maiúsculas)."""
+        alvo = normalizar(nome)
+        for posicao, coluna in enumerate(self.colunas_fixas):
+            if normalizar(coluna) == alvo:
+                return posicao
+        return None
+
+    def normalizados(self, posicao: int) -> List[str]:
+        """
+        Tabela de normalização de uma coluna fixa: a forma normalizada (sem acentos,
+        minúscula) de cada categoria, na ordem de `categorias`.
+
+        Montada uma única vez por versão do dataset e usada nos filtros, junções e na busca.
+        """
+        tabela = self._normalizados.get(posicao)
+        if tabela is None:
+            tabela = [normalizar(valor) for valor in self.categorias[posicao]]
+            self._normalizados[posicao] = tabela
+        return tabela
+
+    def indice_chave(self, posicao: int) -> Dict[str, np.ndarray]:
+        """
+        Índice invertido de uma coluna fixa: valor normalizado -> linhas.
+
+        Montado uma única vez por versão do dataset, a partir da tabela de normalização.
+        """
+        indice = self._indices_chaves.get(posicao)
+        if indice is None:
+            normalizados = self.normalizados(posicao)
+            with self._lock:
+                indice = self._indices_chaves.get(posicao)
+                if indice is None:
+                    # '' no fim: linhas sem valor (código -1)
+                    recodigos, unicos = pd.factorize(pd.Series(normalizados + [''], dtype=object))
+                    codigos = recodigos[self.codigos[posicao]]
+                    ordem = np.argsort(codigos, kind="stable")
+                    limites = np.searchsorted(codigos[ordem], np.arange(len(unicos) + 1))
+                    indice = {
+                        valor: ordem[limites[k]:limites[k + 1]]
+                        for k, valor in enumerate(unicos)
+                    }
+                    self._indices_chaves[posicao] = indice
+        return indice
+
+    def codigos_chave(self, posicao: int) -> tuple:
+        """
+        Codificação categórica de uma coluna fixa: (códigos por linha, valores distintos).
+
+        Usada nas agregações por chave; linhas sem valor têm código -1.
+        """
+        return self.codigos[posicao], self.categorias[posicao]
+
+    @property
+    def possui_medidas(self) -> bool:
+        """
+        True quando cada ano aparece em duas colunas (ex: `1970` e `1970.1`), como
+        nos arquivos de importação/exportação: quantidade e valor.
+        """
+        anos = np.asarray(self.anos)
+        return bool(np.any(anos != np.floor(anos)))
+
+    def posicoes_medida(self, medida: str) -> np.ndarray:
+        """Colunas de ano da medida `quantidade` (primeira coluna do ano) ou `valor` (segunda)."""
+        anos = np.asarray(self.anos)
+        segunda = anos != np.floor(anos)
+        return np.flatnonzero(segunda if medida == "valor" else ~segunda)
+
+    def memoizar_agregacao(self, chave: tuple, calcular, max_entradas: int = 128) -> List[Dict]:
+        """Resultado de agregação memoizado por versão (no máximo `max_entradas` combinações de parâmetros, LRU)."""
+        with self._lock:
+            if chave in self._agregacoes:
+                self._agregacoes.move_to_end(chave)
+                return self._agregacoes[chave]
+        resultado = calcular()
+        with self._lock:
+            self._agregacoes[chave] = resultado
+            while len(self._agregacoes) > max_entradas:
+                self._agregacoes.popitem(last=False)
+        return resultado
+
+    def formato_longo(self, posicao_chave: int, posicao_categoria: Optional[int] = None) -> pd.DataFrame:
+        """
+        Converte a matriz em formato longo: uma linha por célula com valor.
+
+        Returns:
+            pd.DataFrame: Colunas `linha`, `categoria`, `chave`, `ano`, `medida` e `valor`.
+        """
+        linhas, colunas = np.nonzero(~np.isnan(self.valores))
+        anos = np.asarray(self.anos)
+        medidas = None
+        if self.possui_medidas:
+            medidas = np.where(anos != np.floor(anos), "valor", "quantidade").astype(object)[colunas]
+        categorias = None if posicao_categoria is None else self.coluna_fixa(posicao_categoria, linhas)
+        return pd.DataFrame({
+            "linha": linhas.astype(np.int64),
+            "categoria": categorias,
+            "chave": pd.Series(self.coluna_fixa(posicao_chave, linhas), dtype=object).astype(str).str.strip().to_numpy(),
+            "ano": np.floor(anos[colunas]).astype(np.int64),
+            "medida": medidas,
+            "valor": self.valores[linhas, colunas],
+        })
+
+    def linhas_com_valores(self, posicao: int, valores: List[str]) -> np.ndarray:
+        """Linhas cuja coluna fixa `posicao` tem algum dos `valores` (busca exata normalizada)."""
+        indice = self.indice_chave(posicao)
+        encontrados = [indice[normalizar(v)] for v in valores if normalizar(v) in indice]
+        if not encontrados:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(encontrados))
+
+    def posicoes_anos(self, inicio: Optional[int] = None, fim: Optional[int] = None) -> np.ndarray:
+        """
+        Colunas de ano dentro do intervalo [inicio, fim], na ordem original.
+
+        Usa os anos ordenados (montados uma vez por versão) e busca binária.
+        Colunas duplicadas do CSV (ex: 1970.1) contam como o próprio ano.
+        """
+        if self._indice_anos is None:
+            with self._lock:
+                if self._indice_anos is None:
+                    inteiros = np.floor(np.asarray(self.anos))
+                    ordem = np.argsort(inteiros, kind="stable")
+                    self._indice_anos = (inteiros[ordem], ordem)
+        ordenados, ordem = self._indice_anos
+        inicio_idx = 0 if inicio is None else np.searchsorted(ordenados, inicio, side="left")
+        fim_idx = len(ordenados) if fim is None else np.searchsorted(ordenados, fim, side="right")
+        return np.sort(ordem[inicio_idx:fim_idx])
+
+    def _valores_coluna(self, j: int, linhas: Optional[np.ndarray] = None) -> list:
+        """Valores de uma coluna de ano com o mesmo tipo que o CSV original produzia."""
+        if self.tipos[j] == TIPO_TEXTO:
+            textos = self.textos[j]
+            return textos if linhas is None else [textos[i] for i in linhas]
+        coluna = np.asarray(self.valores[:, j] if linhas is None else self.valores[linhas, j])
+        if self.tipos[j] == TIPO_INTEIRO:
+            return coluna.astype(np.int64).tolist()
+        saida = coluna.astype(object)
+        saida[np.isnan(coluna)] = ''
+        return saida.tolist()
+
+    def registros(
+        self,
+        linhas: Optional[np.ndarray] = None,
+        posicoes_anos: Optional[np.ndarray] = None,
+        campos: Optional[List[int]] = None,
+    ) -> List[Dict]:
+        """
+        Retorna o dataset no formato das rotas /embrapa:
+        `[{<colunas fixas>, "dados": [{"ano", "valor"}, ...]}, ...]`.
+
+        Os registros são montados a cada chamada; para o dataset completo as
+        rotas usam `corpo_serializado`, que guarda apenas os bytes do JSON.
+
+        Args:
+            linhas (np.ndarray, opcional): Linhas a incluir.
+            posicoes_anos (np.ndarray, opcional): Colunas de ano a incluir.
+            campos (List[int], opcional): Colunas fixas a incluir (projeção).
+        """
+        return self._montar_registros(linhas, posicoes_anos, campos)
+
+    def corpo_serializado(self) -> CorpoSerializado:
+        """
+        JSON completo do dataset já em bytes (e comprimido), gerado uma vez por versão.
+
+        As rotas devolvem esses bytes diretamente, sem revalidar nem reserializar
+        os registros a cada requisição.
+        """
+        if self._corpo is None:
+            with self._lock:
+                if self._corpo is None:
+                    self._corpo = CorpoSerializado(json_bytes(self._montar_registros()))
+        return self._corpo
+
+    def blocos_linhas(self, linhas: Optional[np.ndarray] = None, tamanho_bloco: int = 256) -> Iterator[np.ndarray]:
+        """
+        Divide as linhas (todas, se None) em blocos de até `tamanho_bloco`.
+
+        Usado no modo streaming: os registros são montados um bloco por vez, para
+        que a memória não cresça com o tamanho do dataset.
+        """
+        linhas = np.arange(self.num_linhas) if linhas is None else linhas
+        for inicio in range(0, len(linhas), tamanho_bloco):
+            yield linhas[inicio:inicio + tamanho_bloco]
+
+    def _montar_registros(
+        self,
+        linhas: Optional[np.ndarray] = None,
+        posicoes_anos: Optional[np.ndarray] = None,
+        campos: Optional[List[int]] = None,
+    ) -> List[Dict]:
+        num_linhas = self.num_linhas if linhas is None else len(linhas)
+        posicoes = range(len(self.anos)) if posicoes_anos is None else posicoes_anos.tolist()
+        campos = range(len(self.colunas_fixas)) if campos is None else campos
+        # Anos devolvidos como campo do registro (layout das rotas originais), com o nome da coluna do CSV
+        posicoes_campo = [j for j in posicoes if j < self.anos_como_campo]
+        posicoes = [j for j in posicoes if j >= self.anos_como_campo]
+
+        anos = [float(self.anos[j]) for j in posicoes]
+        nomes = [self.colunas_fixas[c] for c in campos] + [f"{self.anos[j]:g}" for j in posicoes_campo]
+        chaves = [self.coluna_fixa(c, linhas).tolist() for c in campos] + [self._valores_coluna(j, linhas) for j in posicoes_campo]
+        colunas = [self._valores_coluna(j, linhas) for j in posicoes]
+        linhas_fixas = zip(*chaves) if chaves else (() for _ in range(num_linhas))
+        linhas_dados = zip(*colunas) if colunas else (() for _ in range(num_linhas))
+
+        resultado = []
+        for linha_fixa, linha_dados in zip(linhas_fixas, linhas_dados):
+            item = dict(zip(nomes, linha_fixa))
+            item["dados"] = [{"ano": ano, "valor": valor} for ano, valor in zip(anos, linha_dados)]
+            resultado.append(item)
+        return resultado
+
+    def _calcular_versao(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps(
+            [self.colunas_fixas, self.categorias, {str(k): v for k, v in self.textos.items()}, self.anos_como_campo],
+            ensure_ascii=False, default=str,
+        ).encode("utf-8"))
+        for codigos in self.codigos:
+            digest.update(np.ascontiguousarray(codigos, dtype=np.int32).tobytes())
+        digest.update(np.ascontiguousarray(self.anos).tobytes())
+        digest.update(np.ascontiguousarray(self.tipos).tobytes())
+        digest.update(np.ascontiguousarray(self.valores).tobytes())
+        return digest.hexdigest()[:16]
+
+    def to_snapshot(self):
+        """Separa o dataset em arrays (gravados como .npy) e metadados JSON."""
+        arrays = {"anos": self.anos, "valores": self.valores, "tipos": self.tipos}
+        arrays.update({f"codigos_{i}": codigos for i, codigos in enumerate(self.codigos)})
+        meta = {
+            "colunas_fixas": self.colunas_fixas,
+            "categorias": self.categorias,
+            "textos": {str(k): v for k, v in self.textos.items()},
+            "anos_como_campo": self.anos_como_campo,
+            "versao": self.versao,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "criado_em": self.criado_em.isoformat(),
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_snapshot(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "EmbrapaDataset":
+        return cls(
+            colunas_fixas=meta["colunas_fixas"],
+            codigos=[arrays[f"codigos_{i}"] for i in range(len(meta["colunas_fixas"]))],
+            categorias=meta["categorias"],
+            anos=arrays["anos"],
+            valores=arrays["valores"],
+            tipos=arrays["tipos"],
+            textos={int(k): v for k, v in meta.get("textos", {}).items()},
+            anos_como_campo=meta["anos_como_campo"],
+            versao=meta["versao"],
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            criado_em=datetime.fromisoformat(meta["criado_em"]),
+        )
@@ -0,0 +1,126 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.settings import settings
+from domain.external_api.aggregations import AgregacaoUseCases
+from domain.external_api.dataset import EmbrapaDataset
+from domain.external_api.schemas import FiltrosDatasetSchema, JuncaoSchema
+from domain.external_api.serialization import json_bytes
+from domain.external_api.use_cases import UseCases
+
+# Pares de datasets cruzados pelas rotas de junção:
+# `diferenca` = esquerda - direita (na balança comercial, exportação - importação)
+PARES_JUNCAO: Dict[str, Dict] = {
+    "balanca-comercial": {"esquerda": "exportacao", "direita": "importacao", "chave": "pais", "campo_diferenca": "saldo"},
+    "producao-comercializacao": {"esquerda": "producao", "direita": "comercializacao", "chave": "produto", "campo_diferenca": "diferenca"},
+}
+
+# Corpos JSON das junções, chaveados pelo par de versões dos datasets. A chave já
+# muda a cada atualização, então basta um LRU limitado (EMBRAPA_JOIN_CACHE_MAX_ENTRIES), sem TTL
+# nem recarga em segundo plano
+juncao_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_juncao_cache_lock = threading.Lock()
+
+
+class JuncaoUseCases:
+    """
+    Cruza dois datasets da Embrapa por chave normalizada (sem acentos/maiúsculas) e ano.
+
+    Cada lado é reduzido a uma matriz chave x ano (somando as linhas de mesma
+    chave) e as duas matrizes são alinhadas pelo índice do pandas, sem laços
+    por registro. O corpo JSON resultante fica em cache por par de versões.
+    """
+
+    @staticmethod
+    def matriz_por_chave(
+        dataset: EmbrapaDataset,
+        coluna: str,
+        filtros: Optional[FiltrosDatasetSchema],
+        medida: Optional[str],
+    ) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Soma os valores de cada chave normalizada por ano.
+
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, str]]: Matriz (índice = chave normalizada,
+            colunas = anos) e o rótulo original de cada chave normalizada.
+        """
+        posicao = dataset.posicao_coluna_fixa(coluna)
+        if posicao is None:
+            raise ValueError(f"Coluna '{coluna}' inexistente. Colunas disponíveis: {', '.join(dataset.colunas_fixas)}")
+
+        selecao = UseCases.selecionar(dataset, filtros)
+        linhas = np.arange(dataset.num_linhas) if selecao.linhas is None else selecao.linhas
+        colunas = AgregacaoUseCases.colunas_medida(dataset, medida, selecao.posicoes_anos)
+
+        # Recodifica as linhas pela forma normalizada de cada valor distinto
+        codigos, distintos = dataset.codigos_chave(posicao)
+        normalizados = dataset.normalizados(posicao)
+        codigos_norm, chaves_norm = pd.factorize(pd.Series(normalizados, dtype=object))
+        rotulos: Dict[str, str] = {}
+        for valor, chave in zip(distintos, normalizados):
+            rotulos.setdefault(chave, str(valor).strip())
+
+        codigos_linhas = codigos[linhas]
+        validas = codigos_linhas >= 0
+        matriz = pd.DataFrame(
+            dataset.valores[np.ix_(linhas[validas], colunas)],
+            columns=np.floor(np.asarray(dataset.anos)[colunas]).astype(np.int64),
+        )
+        agrupada = matriz.groupby(codigos_norm[codigos_linhas[validas]]).sum(min_count=1)
+        agrupada.index = chaves_norm[agrupada.index.to_numpy()]
+        return agrupada, rotulos
+
+    @staticmethod
+    def juntar(nome_par: str, esquerda: EmbrapaDataset, direita: EmbrapaDataset, parametros: JuncaoSchema, filtros: Optional[FiltrosDatasetSchema] = None) -> bytes:
+        """Retorna o corpo JSON da junção, calculado uma vez por par de versões e parâmetros."""
+        chave = (
+            nome_par, esquerda.versao, direita.versao,
+            parametros.model_dump_json(), filtros.model_dump_json() if filtros else None,
+        )
+        with _juncao_cache_lock:
+            if chave in juncao_cache:
+                juncao_cache.move_to_end(chave)
+                return juncao_cache[chave]
+        corpo = JuncaoUseCases._calcular(nome_par, esquerda, direita, parametros, filtros)
+        with _juncao_cache_lock:
+            juncao_cache[chave] = corpo
+            while len(juncao_cache) > settings.EMBRAPA_JOIN_CACHE_MAX_ENTRIES:
+                juncao_cache.popitem(last=False)
+        return corpo
+
+    @staticmethod
+    def _calcular(nome_par: str, esquerda: EmbrapaDataset, direita: EmbrapaDataset, parametros: JuncaoSchema, filtros: Optional[FiltrosDatasetSchema]) -> bytes:
+        par = PARES_JUNCAO[nome_par]
+        coluna = parametros.chave or par["chave"]
+        matriz_esq, rotulos_esq = JuncaoUseCases.matriz_por_chave(esquerda, coluna, filtros, parametros.medida)
+        matriz_dir, rotulos_dir = JuncaoUseCases.matriz_por_chave(direita, coluna, filtros, parametros.medida)
+
+        # Alinha chaves e anos dos dois lados (NaN onde um dos lados não tem valor)
+        matriz_esq, matriz_dir = matriz_esq.align(matriz_dir, join=parametros.how)
+        valores_esq = matriz_esq.to_numpy(dtype=np.float64)
+        valores_dir = matriz_dir.to_numpy(dtype=np.float64)
+        diferenca = valores_esq - valores_dir
+
+        # Formato longo: uma linha por (chave, ano) com valor em ao menos um dos lados
+        i, j = np.nonzero(~(np.isnan(valores_esq) & np.isnan(valores_dir)))
+        chaves = matriz_esq.index.to_numpy()[i].tolist()
+        anos = matriz_esq.columns.to_numpy()[j].tolist()
+        campo_esq, campo_dir, campo_diferenca = par["esquerda"], par["direita"], par["campo_diferenca"]
+        registros = [
+            {
+                "chave": rotulos_esq.get(chave) or rotulos_dir.get(chave),
+                "ano": int(ano),
+                campo_esq: None if np.isnan(v_esq) else float(v_esq),
+                campo_dir: None if np.isnan(v_dir) else float(v_dir),
+                campo_diferenca: None if np.isnan(v_dif) else float(v_dif),
+            }
+            for chave, ano, v_esq, v_dir, v_dif in zip(
+                chaves, anos, valores_esq[i, j].tolist(), valores_dir[i, j].tolist(), diferenca[i, j].tolist()
+            )
+        ]
+        return json_bytes(registros)
@@ -0,0 +1,234 @@
+import io
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Leitor multithread do pyarrow (dependência do projeto); o parser C do pandas
+# fica como alternativa para ambientes sem ele
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover
+    pa = None
+    pa_csv = None
+
+# Marcadores usados nos arquivos da Embrapa para valor ausente ou não disponível
+VALORES_AUSENTES: Tuple[str, ...] = ("", "*", "-", "--", "nd", "ND", "n.d.", "NA", "nan", "NaN")
+
+# Tipos das colunas fixas
+INTEIRO = "inteiro"   # ex: id
+TEXTO = "texto"       # ex: controle, produto, país
+NUMERO = "numero"     # valores (as colunas de ano são sempre numéricas)
+
+# Intervalo aceito nos cabeçalhos das colunas de ano
+ANO_MINIMO, ANO_MAXIMO = 1900, 2100
+
+
+class CabecalhoInvalidoError(ValueError):
+    """O CSV tem, depois das colunas fixas, colunas cujo nome não é um ano."""
+
+
+class EsquemaCsv(NamedTuple):
+    """
+    Como ler um CSV da Embrapa: separador, encoding, tipo de cada coluna fixa
+    e marcadores de valor ausente. As colunas depois das fixas são anos e são
+    sempre lidas como números (inteiros quando não há faltantes).
+    """
+    sep: str = ';'
+    encoding: str = 'latin1'
+    tipos_fixas: Tuple[str, ...] = (INTEIRO, TEXTO, TEXTO)
+    valores_ausentes: Tuple[str, ...] = VALORES_AUSENTES
+    separador_milhar: Optional[str] = None
+    separador_decimal: str = '.'
+
+    @classmethod
+    def padrao(cls, sep: str = ';', encoding: str = 'latin1', num_colunas_fixas: int = 3) -> "EsquemaCsv":
+        """Esquema com id inteiro seguido de `num_colunas_fixas - 1` colunas de texto."""
+        return cls(sep=sep, encoding=encoding, tipos_fixas=(INTEIRO,) + (TEXTO,) * (num_colunas_fixas - 1))
+
+
+class RelatorioParse(NamedTuple):
+    """Resultado de um parse: engine usado, tamanho, tempo e memória do DataFrame."""
+    engine: str
+    separador: str
+    linhas: int
+    colunas: int
+    segundos: float
+    memoria_bytes: int
+    valores_invalidos: int
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+def _cabecalho(content: bytes, encoding: str) -> str:
+    """Primeira linha do arquivo (só ela é decodificada para escolher o separador)."""
+    fim = content.find(b"\n")
+    return content[:fim if fim >= 0 else len(content)].decode(encoding).rstrip("\r")
+
+
+def _nomes_unicos(nomes: List[str]) -> List[str]:
+    """Renomeia repetidos como o pandas (`1970`, `1970.1`), usado nas colunas de quantidade/valor."""
+    vistos: Dict[str, int] = {}
+    unicos = []
+    for nome in nomes:
+        if nome in vistos:
+            vistos[nome] += 1
+            unicos.append(f"{nome}.{vistos[nome]}")
+        else:
+            vistos[nome] = 0
+            unicos.append(nome)
+    return unicos
+
+
+def validar_cabecalho(nomes: List[str], num_colunas_fixas: int) -> List[str]:
+    """
+    Confere que toda coluna depois das fixas tem um ano como nome.
+
+    Colunas sem nome no fim da linha (separador sobrando) são descartadas.
+
+    Returns:
+        List[str]: Nomes das colunas a ler, sem espaços nas pontas.
+
+    Raises:
+        CabecalhoInvalidoError: Alguma coluna de dados não tem um ano válido como nome.
+    """
+    if len(nomes) <= num_colunas_fixas:
+        raise CabecalhoInvalidoError(
+            f"O CSV tem {len(nomes)} colunas; esperadas {num_colunas_fixas} fixas seguidas de anos."
+        )
+    nomes = [nome.strip() for nome in nomes]
+    while nomes and not nomes[-1]:
+        nomes = nomes[:-1]
+    invalidas = []
+    for nome in nomes[num_colunas_fixas:]:
+        try:
+            ano = int(nome)
+        except ValueError:
+            invalidas.append(nome)
+            continue
+        if not ANO_MINIMO <= ano <= ANO_MAXIMO:
+            invalidas.append(nome)
+    if invalidas:
+        raise CabecalhoInvalidoError(f"Colunas de ano inválidas no CSV: {', '.join(repr(n) for n in invalidas[:10])}")
+    return nomes
+
+
+def _para_inteiro(serie: pd.Series) -> pd.Series:
+    """Converte para int64 quando não há faltantes nem casas decimais (como a inferência do pandas)."""
+    valores = serie.to_numpy()
+    if len(valores) and not np.isnan(valores).any() and np.array_equal(valores, np.floor(valores)):
+        return serie.astype(np.int64)
+    return serie
+
+
+def _ler_pyarrow(content: bytes, esquema: EsquemaCsv, sep: str, todas: List[str], nomes: List[str], numericas: List[str]) -> pd.DataFrame:
+    tabela = pa_csv.read_csv(
+        io.BytesIO(content),
+        read_options=pa_csv.ReadOptions(encoding=esquema.encoding, column_names=todas, skip_rows=1, use_threads=True),
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={nome: (pa.float64() if nome in numericas else pa.string()) for nome in nomes},
+            include_columns=nomes,
+            null_values=list(esquema.valores_ausentes),
+            strings_can_be_null=False,
+            decimal_point=esquema.separador_decimal,
+        ),
+    )
+    df = tabela.to_pandas()
+    # O pyarrow pode entregar texto como StringDtype (ex: com `future.infer_string`);
+    # as colunas fixas ficam como object, igual ao leitor do pandas
+    for nome in nomes:
+        if nome not in numericas:
+            df[nome] = df[nome].astype(object)
+    return df
+
+
+def _ler_pandas(texto: str, esquema: EsquemaCsv, sep: str, todas: List[str], nomes: List[str], numericas: List[str]) -> Tuple[pd.DataFrame, int]:
+    opcoes = dict(
+        sep=sep, header=0, names=todas, decimal=esquema.separador_decimal,
+        na_values={nome: list(esquema.valores_ausentes) for nome in numericas}, keep_default_na=False,
+    )
+    # Só passa as opções que custam tempo de parse quando são necessárias
+    if len(todas) > len(nomes):
+        opcoes["usecols"] = nomes
+    if esquema.separador_milhar:
+        opcoes["thousands"] = esquema.separador_milhar
+    try:
+        tipos = {nome: (np.float64 if nome in numericas else object) for nome in nomes}
+        return pd.read_csv(io.StringIO(texto), dtype=tipos, **opcoes), 0
+    except ValueError:
+        pass
+
+    # Algum valor não numérico fora da tabela de ausentes: lê como texto e converte
+    # coluna a coluna, contando os valores descartados
+    df = pd.read_csv(io.StringIO(texto), dtype=object, **opcoes)
+    invalidos = 0
+    for nome in numericas:
+        brutos = df[nome].str.strip()
+        if esquema.separador_milhar:
+            brutos = brutos.str.replace(esquema.separador_milhar, "", regex=False)
+        if esquema.separador_decimal != '.':
+            brutos = brutos.str.replace(esquema.separador_decimal, ".", regex=False)
+        convertidos = pd.to_numeric(brutos, errors="coerce").astype(np.float64)
+        invalidos += int((convertidos.isna() & brutos.notna()).sum())
+        df[nome] = convertidos
+    return df, invalidos
+
+
+def ler_csv(content: bytes, esquema: EsquemaCsv, engine: str = "auto") -> Tuple[pd.DataFrame, RelatorioParse]:
+    """
+    Faz o parse tipado de um CSV da Embrapa.
+
+    O separador é confirmado pelo cabeçalho (os arquivos alternam entre `;` e
+    tabulação) e os nomes das colunas de ano são validados antes da leitura.
+    Colunas de ano são lidas direto como float64, com os marcadores de
+    `valores_ausentes` como NaN, e viram int64 quando não têm faltantes.
+    Colunas de texto são mantidas como estão (sem marcadores de ausente).
+
+    Com `engine="auto"` usa o leitor multithread do pyarrow se estiver
+    instalado (e o esquema não tiver separador de milhar); senão, o do pandas.
+
+    Returns:
+        Tuple[pd.DataFrame, RelatorioParse]: Dados e estatísticas do parse.
+    """
+    inicio = time.perf_counter()
+    num_fixas = len(esquema.tipos_fixas)
+    cabecalho = _cabecalho(content, esquema.encoding)
+    sep = esquema.sep
+    alternativo = '\t' if sep == ';' else ';' if sep == '\t' else None
+    if sep not in cabecalho and alternativo is not None and alternativo in cabecalho:
+        sep = alternativo
+
+    colunas = cabecalho.split(sep)
+    nomes = _nomes_unicos(validar_cabecalho(colunas, num_fixas))
+    # Colunas vazias no fim da linha recebem um nome só para a leitura e são descartadas
+    todas = nomes + [f"_vazia_{i}" for i in range(len(nomes), len(colunas))]
+    numericas = [nome for i, nome in enumerate(nomes) if i >= num_fixas or esquema.tipos_fixas[i] != TEXTO]
+
+    usar_pyarrow = engine == "pyarrow" or (engine == "auto" and pa_csv is not None and esquema.separador_milhar is None)
+    df, invalidos = None, 0
+    if usar_pyarrow and pa_csv is not None:
+        try:
+            df = _ler_pyarrow(content, esquema, sep, todas, nomes, numericas)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = None  # ex: valor não numérico fora da tabela de ausentes
+    nome_engine = "pyarrow" if df is not None else "pandas"
+    if df is None:
+        df, invalidos = _ler_pandas(content.decode(esquema.encoding), esquema, sep, todas, nomes, numericas)
+
+    for nome in numericas:
+        df[nome] = _para_inteiro(df[nome])
+
+    relatorio = RelatorioParse(
+        engine=nome_engine,
+        separador=sep,
+        linhas=len(df),
+        colunas=df.shape[1],
+        segundos=round(time.perf_counter() - inicio, 6),
+        memoria_bytes=int(df.memory_usage(deep=True).sum()),
+        valores_invalidos=invalidos,
+    )
+    return df, relatorio
@@ -1,20 +1,238 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, status
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from utils.auth import AuthUtils
-from typing import List, Dict
-from domain.external_api.use_cases import UseCases
+from typing import AsyncIterator, Dict, List, Literal, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import asyncio
+import hashlib
+import math
+from core.settings import settings
+from domain.external_api.aggregations import AgregacaoUseCases
+from domain.external_api.joins import JuncaoUseCases, PARES_JUNCAO
+from domain.external_api.search import BuscaUseCases
+from domain.external_api.schemas import AgregacaoSchema, FiltrosDatasetSchema, JuncaoSchema, PaginacaoSchema
+from domain.external_api.serialization import json_bytes
+from domain.external_api.use_cases import (
+    AsyncUseCases, CursorExpiradoError, DATASETS_EMBRAPA, SUBTIPOS_EMBRAPA, UpstreamIndisponivelError, UseCases,
+    dataset_cache, estatisticas_parse, upstream_breaker,
+)
+from infra.http.circuit_breaker import CircuitoAbertoError
+from domain.external_api.scheduler import ingestion_scheduler
 
 router = APIRouter(prefix="/embrapa", tags=["Embrapa"])
 
+
+def filtros_dataset(
+    ano_inicio: Optional[int] = Query(None, description="Primeiro ano incluído nos `dados`."),
+    ano_fim: Optional[int] = Query(None, description="Último ano incluído nos `dados`."),
+    produto: Optional[List[str]] = Query(None, description="Filtra por produto (aceita vários; ignora acentos e maiúsculas)."),
+    pais: Optional[List[str]] = Query(None, description="Filtra por país (aceita vários; ignora acentos e maiúsculas)."),
+    controle: Optional[List[str]] = Query(None, description="Filtra pelo código de controle (aceita vários)."),
+    campos: Optional[List[str]] = Query(None, description="Colunas fixas retornadas em cada registro (ex: `Pais`). `dados` é sempre retornado."),
+) -> FiltrosDatasetSchema:
+    return FiltrosDatasetSchema(
+        ano_inicio=ano_inicio, ano_fim=ano_fim, produto=produto, pais=pais, controle=controle, campos=campos
+    )
+
+
+def paginacao_dataset(
+    limit: Optional[int] = Query(None, ge=1, le=settings.EMBRAPA_PAGE_MAX_LIMIT, description="Quantidade máxima de registros por página."),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página, recebido no header `X-Next-Cursor`."),
+) -> PaginacaoSchema:
+    return PaginacaoSchema(limit=limit, cursor=cursor)
+
+
+def parametros_agregacao(
+    group_by: str = Query("ano", description="`ano` ou o nome de uma coluna fixa (ex: `Pais`, `produto`)."),
+    op: str = Query("sum", pattern="^(sum|mean|min|max|count|yoy|moving_avg)$", description="Operação: `sum`, `mean`, `min`, `max`, `count`; com group_by=ano também `yoy` (crescimento anual) e `moving_avg` (média móvel)."),
+    top: Optional[int] = Query(None, ge=1, description="Retorna apenas os N maiores valores, em ordem decrescente."),
+    janela: int = Query(3, ge=1, le=50, description="Janela, em anos, da média móvel."),
+    medida: Optional[str] = Query(None, pattern="^(quantidade|valor)$", description="Em importação/exportação, escolhe a coluna de quantidade ou de valor de cada ano (padrão: `valor`); nos demais datasets resulta em 400."),
+) -> AgregacaoSchema:
+    return AgregacaoSchema(group_by=group_by, op=op, top=top, janela=janela, medida=medida)
+
+
+def parametros_juncao(
+    chave: Optional[str] = Query(None, description="Coluna fixa usada para cruzar os datasets (padrão: `Pais` na balança comercial, `produto` em produção x comercialização)."),
+    how: str = Query("outer", pattern="^(inner|outer|left|right)$", description="Tipo de junção: `inner`, `outer`, `left` ou `right`."),
+    medida: Optional[str] = Query(None, pattern="^(quantidade|valor)$", description="Em importação/exportação, usa a coluna de quantidade ou de valor de cada ano (padrão: `valor`)."),
+) -> JuncaoSchema:
+    return JuncaoSchema(chave=chave, how=how, medida=medida)
+
+
+def _bloco_ndjson(dataset, selecao) -> bytes:
+    """Registros de uma seleção em NDJSON: um objeto JSON por linha."""
+    return b"".join(json_bytes(registro) + b"\n" for registro in dataset.registros(*selecao))
+
+
+async def _ndjson(dataset, selecao) -> AsyncIterator[bytes]:
+    """Corpo do streaming NDJSON: cada bloco de linhas é montado e serializado no pool de parse."""
+    for linhas in dataset.blocos_linhas(selecao.linhas):
+        yield await AsyncUseCases.executar(_bloco_ndjson, dataset, selecao._replace(linhas=linhas))
+
+
+def _corpo_json(dataset, selecao) -> bytes:
+    """Registros de uma seleção (filtros, projeção ou página) serializados em JSON."""
+    return json_bytes(dataset.registros(*selecao))
+
+
+def _etag(versao: str, request: Request) -> str:
+    """
+    ETag (fraco) da resposta: versão do dataset + hash dos parâmetros da requisição,
+    já que filtros, paginação e streaming mudam o corpo.
+    """
+    parametros = sorted(request.query_params.multi_items())
+    if not parametros:
+        return f'W/"{versao}"'
+    digest = hashlib.sha1(repr(parametros).encode("utf-8")).hexdigest()[:12]
+    return f'W/"{versao}-{digest}"'
+
+
+def _ultima_modificacao(*datasets) -> Optional[datetime]:
+    """
+    Last-Modified informado pelo upstream (guardado também no snapshot), igual em
+    todos os workers; o mais recente entre os datasets. None se algum não tiver.
+    """
+    datas = []
+    for dataset in datasets:
+        try:
+            data = parsedate_to_datetime(dataset.last_modified)
+        except (TypeError, ValueError):
+            return None
+        datas.append(data.replace(tzinfo=timezone.utc) if data.tzinfo is None else data.astimezone(timezone.utc))
+    return max(datas)
+
+
+def _cabecalhos_cache(etag: str, *datasets) -> Dict[str, str]:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.EMBRAPA_HTTP_CACHE_MAX_AGE}, must-revalidate",
+        # O corpo varia com a negociação de formato (JSON/NDJSON) e de compressão
+        "Vary": "Accept, Accept-Encoding",
+    }
+    modificado = _ultima_modificacao(*datasets)
+    if modificado is not None:
+        headers["Last-Modified"] = format_datetime(modificado, usegmt=True)
+    # Com o circuito aberto os dados não puderam ser revalidados no upstream
+    if not upstream_breaker.fechado:
+        headers["X-Data-Stale"] = "true"
+        headers["Warning"] = '110 - "Response is Stale"'
+    return headers
+
+
+def _erro_upstream(e: Exception) -> HTTPException:
+    """Converte a falha ao obter um dataset: 503 com o circuito aberto, 502 para falhas do upstream, 400 nos demais casos."""
+    if isinstance(e, CircuitoAbertoError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(math.ceil(e.retry_after), 1))},
+        )
+    if isinstance(e, UpstreamIndisponivelError):
+        return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+    return HTTPException(status_code=400, detail=str(e))
+
+
+def _nao_modificado(request: Request, etag: str, *datasets) -> bool:
+    """
+    Avalia `If-None-Match` (comparação fraca) ou, na ausência dele, `If-Modified-Since`
+    (apenas quando o upstream informa Last-Modified).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {parte.strip().removeprefix("W/") for parte in if_none_match.split(",")}
+        return "*" in etags or etag.removeprefix("W/") in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    modificado = _ultima_modificacao(*datasets)
+    if if_modified_since and modificado is not None:
+        try:
+            return modificado <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _responder_dataset(
+    nome: str,
+    request: Request,
+    filtros: FiltrosDatasetSchema,
+    paginacao: PaginacaoSchema,
+    stream: bool,
+):
+    """
+    Monta a resposta de um dataset: aplica filtros e paginação e, se pedido
+    (`?stream=true` ou `Accept: application/x-ndjson`), devolve NDJSON em streaming.
+
+    As respostas JSON são devolvidas como bytes em um `Response`, sem passar pela
+    validação do `response_model` (mantido apenas para a documentação).
+    Toda resposta leva `ETag`/`Cache-Control`/`Vary` (e `Last-Modified`, se o
+    upstream informar) e requisições com `If-None-Match` correspondente recebem
+    304 sem corpo.
+    """
+    try:
+        dataset = await AsyncUseCases.obter_dataset_por_nome(nome)
+    except Exception as e:
+        raise _erro_upstream(e)
+
+    # Revalidação: se o cliente já tem esta versão, responde 304 antes de qualquer processamento
+    etag = _etag(dataset.versao, request)
+    headers = _cabecalhos_cache(etag, dataset)
+    if _nao_modificado(request, etag, dataset):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        selecao = UseCases.selecionar(dataset, filtros)
+        proximo_cursor = None
+        if paginacao.ativa:
+            selecao, proximo_cursor = UseCases.paginar(dataset, selecao, paginacao)
+    except CursorExpiradoError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if proximo_cursor:
+        headers["X-Next-Cursor"] = proximo_cursor
+    if stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _ndjson(dataset, selecao),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+
+    # Dataset completo: bytes pré-serializados (e pré-comprimidos) da versão em cache
+    if all(parte is None for parte in selecao):
+        corpo, content_encoding = dataset.corpo_serializado().escolher(request.headers.get("accept-encoding", ""))
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+        return Response(content=corpo, media_type="application/json", headers=headers)
+
+    # Seleção ou página: montagem e serialização no pool de parse, fora do event loop
+    corpo = await AsyncUseCases.executar(_corpo_json, dataset, selecao)
+    return Response(content=corpo, media_type="application/json", headers=headers)
+
+
 @router.get(
     "/producao",
     response_model=List[Dict],
     summary="Obter dados de produção",
     description="Retorna os dados de produção da uva coletados do site da Embrapa. Acesso permitido para usuários autenticados com papéis 'admin', 'superuser' ou 'user'."
 )
-def get_producao(current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+async def get_producao(
+    request: Request,
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    paginacao: PaginacaoSchema = Depends(paginacao_dataset),
+    stream: bool = Query(False, description="Retorna NDJSON (um registro por linha) em streaming."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
     """
     🔒 Retorna os dados históricos de produção da uva, conforme disponibilizados pela Embrapa.
 
+    Aceita filtros por ano (`ano_inicio`/`ano_fim`), por valor das colunas fixas
+    e projeção de campos (`campos`), paginação por cursor (`limit`/`cursor`) e
+    streaming NDJSON (`stream=true` ou `Accept: application/x-ndjson`).
+
     Acesso permitido apenas para usuários com os seguintes papéis:
     - admin
     - superuser
@@ -27,10 +245,7 @@ def get_producao(current_user_token: dict = Depends(AuthUtils.get_current_data_f
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem permissão para acessar este recurso.",
         )
-    try:
-        return UseCases.get_producao()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _responder_dataset("producao", request, filtros, paginacao, stream)
 
 
 @router.get(
@@ -39,16 +254,23 @@ def get_producao(current_user_token: dict = Depends(AuthUtils.get_current_data_f
     summary="Obter dados de processamento",
     description="Retorna os dados de processamento de uva do Brasil conforme registros da Embrapa."
 )
-def get_processamento(current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+async def get_processamento(
+    request: Request,
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    paginacao: PaginacaoSchema = Depends(paginacao_dataset),
+    stream: bool = Query(False, description="Retorna NDJSON (um registro por linha) em streaming."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
     """
     🔒 Retorna os dados de processamento de uvas no Brasil, com base nas informações da Embrapa.
 
+    Aceita filtros por ano (`ano_inicio`/`ano_fim`), por valor das colunas fixas
+    e projeção de campos (`campos`), paginação por cursor (`limit`/`cursor`) e
+    streaming NDJSON (`stream=true` ou `Accept: application/x-ndjson`).
+
     Acesso permitido apenas para usuários autenticados.
     """
-    try:
-        return UseCases.get_processamento()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _responder_dataset("processamento", request, filtros, paginacao, stream)
 
 
 @router.get(
@@ -57,16 +279,23 @@ def get_processamento(current_user_token: dict = Depends(AuthUtils.get_current_d
     summary="Obter dados de comercialização",
     description="Retorna os dados sobre a comercialização de uvas, conforme disponíveis nos relatórios da Embrapa."
 )
-def get_comercializacao(current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+async def get_comercializacao(
+    request: Request,
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    paginacao: PaginacaoSchema = Depends(paginacao_dataset),
+    stream: bool = Query(False, description="Retorna NDJSON (um registro por linha) em streaming."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
     """
     🔒 Retorna os dados de comercialização de uvas (quantidade, valores etc), conforme informações da Embrapa.
 
+    Aceita filtros por ano (`ano_inicio`/`ano_fim`), por valor das colunas fixas
+    e projeção de campos (`campos`), paginação por cursor (`limit`/`cursor`) e
+    streaming NDJSON (`stream=true` ou `Accept: application/x-ndjson`).
+
     Acesso permitido apenas para usuários autenticados.
     """
-    try:
-        return UseCases.get_comercializacao()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _responder_dataset("comercializacao", request, filtros, paginacao, stream)
 
 
 @router.get(
@@ -75,16 +304,23 @@ def get_comercializacao(current_user_token: dict = Depends(AuthUtils.get_current
     summary="Obter dados de importação",
     description="Retorna os dados históricos de importação de uvas disponíveis nos relatórios da Embrapa."
 )
-def get_importacao(current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+async def get_importacao(
+    request: Request,
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    paginacao: PaginacaoSchema = Depends(paginacao_dataset),
+    stream: bool = Query(False, description="Retorna NDJSON (um registro por linha) em streaming."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
     """
     🔒 Retorna os dados de importação de uvas ao longo dos anos, conforme coletados pela Embrapa.
 
+    Aceita filtros por ano (`ano_inicio`/`ano_fim`), por valor das colunas fixas
+    e projeção de campos (`campos`), paginação por cursor (`limit`/`cursor`) e
+    streaming NDJSON (`stream=true` ou `Accept: application/x-ndjson`).
+
     Acesso permitido apenas para usuários autenticados.
     """
-    try:
-        return UseCases.get_importacao()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _responder_dataset("importacao", request, filtros, paginacao, stream)
 
 
 @router.get(
@@ -93,13 +329,294 @@ def get_importacao(current_user_token: dict = Depends(AuthUtils.get_current_data
     summary="Obter dados de exportação",
     description="Retorna os dados históricos de exportação de uvas do Brasil, conforme registros da Embrapa."
 )
-def get_exportacao(current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+async def get_exportacao(
+    request: Request,
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    paginacao: PaginacaoSchema = Depends(paginacao_dataset),
+    stream: bool = Query(False, description="Retorna NDJSON (um registro por linha) em streaming."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
     """
     🔒 Retorna os dados de exportação de uvas do Brasil, com base nos relatórios da Embrapa.
 
+    Aceita filtros por ano (`ano_inicio`/`ano_fim`), por valor das colunas fixas
+    e projeção de campos (`campos`), paginação por cursor (`limit`/`cursor`) e
+    streaming NDJSON (`stream=true` ou `Accept: application/x-ndjson`).
+
+    Acesso permitido apenas para usuários autenticados.
+    """
+    return await _responder_dataset("exportacao", request, filtros, paginacao, stream)
+
+
+@router.get(
+    "/{dataset}/aggregate",
+    response_model=List[Dict],
+    summary="Agregações sobre um dataset",
+    description="Totais anuais, ranking (top-N) por país/produto, crescimento ano a ano e médias móveis calculados sobre o dataset em cache."
+)
+async def get_agregacao(
+    dataset: str,
+    request: Request,
+    parametros: AgregacaoSchema = Depends(parametros_agregacao),
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
+    """
+    🔒 Agrega um dos datasets (`producao`, `processamento`, `comercializacao`,
+    `importacao`, `exportacao`).
+
+    Exemplos:
+    - `/embrapa/producao/aggregate?group_by=ano&op=sum`: total produzido por ano
+    - `/embrapa/exportacao/aggregate?group_by=Pais&op=sum&top=10`: 10 maiores destinos em valor
+    - `/embrapa/comercializacao/aggregate?op=yoy&produto=VINHO DE MESA`: crescimento anual
+
+    Os filtros de ano e de valor das rotas do dataset também se aplicam.
+    Cada item é `{"ano", "valor"}` (group_by=ano) ou `{"chave", "valor"}`.
+
+    Acesso permitido apenas para usuários autenticados.
+    """
+    if dataset not in DATASETS_EMBRAPA:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Dataset '{dataset}' inexistente. Opções: {', '.join(DATASETS_EMBRAPA)}")
+    try:
+        embrapa_dataset = await AsyncUseCases.obter_dataset_por_nome(dataset)
+    except Exception as e:
+        raise _erro_upstream(e)
+
+    etag = _etag(embrapa_dataset.versao, request)
+    headers = _cabecalhos_cache(etag, embrapa_dataset)
+    if _nao_modificado(request, etag, embrapa_dataset):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        resultado = await AsyncUseCases.executar(AgregacaoUseCases.agregar, embrapa_dataset, parametros, filtros)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=json_bytes(resultado), media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/{dataset}/changes",
+    summary="Feed de mudanças de um dataset",
+    description="Retorna as células inseridas, atualizadas ou removidas em cada atualização do dataset desde a versão informada."
+)
+async def get_mudancas(
+    dataset: str,
+    since: str = Query(..., description="Versão já conhecida pelo cliente (header `ETag` sem `W/` ou campo `versao` de uma resposta anterior deste endpoint)."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
+    """
+    🔒 Feed de mudanças para consumo incremental.
+
+    Retorna `{"dataset", "desde", "versao", "atualizacoes"}`; cada atualização traz
+    `versao_anterior`, `versao` e a lista de `mudancas` (`tipo` = `insercao`,
+    `atualizacao` ou `remocao`, com `categoria`, `chave`, `ocorrencia` (para linhas
+    repetidas), `ano`, `medida`, `anterior` e `atual`). Guarde o campo `versao`
+    para a próxima chamada.
+
+    Responde 410 se a versão não estiver mais no histórico: nesse caso recarregue
+    o dataset completo e use a versão atual como novo ponto de partida.
+
+    O histórico fica na memória de cada processo: com vários workers ou réplicas,
+    uma versão vista por um deles pode ser desconhecida por outro e também gerar
+    410 (o cliente então recarrega o dataset, como acima). Para consumo incremental
+    consistente entre réplicas, use a tabela `embrapa_series`.
+
     Acesso permitido apenas para usuários autenticados.
     """
+    if dataset not in DATASETS_EMBRAPA:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Dataset '{dataset}' inexistente. Opções: {', '.join(DATASETS_EMBRAPA)}")
+    try:
+        mudancas = await AsyncUseCases.mudancas_desde(dataset, since.removeprefix("W/").strip('"'))
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except Exception as e:
+        raise _erro_upstream(e)
+    return Response(content=json_bytes(mudancas), media_type="application/json")
+
+
+async def _responder_juncao(nome_par: str, request: Request, parametros: JuncaoSchema, filtros: FiltrosDatasetSchema):
+    """
+    Monta a resposta de uma junção de `PARES_JUNCAO`. O ETag combina as versões
+    dos dois datasets, então a resposta muda quando qualquer um deles é atualizado.
+    """
+    par = PARES_JUNCAO[nome_par]
+    try:
+        esquerda, direita = await asyncio.gather(
+            AsyncUseCases.obter_dataset_por_nome(par["esquerda"]),
+            AsyncUseCases.obter_dataset_por_nome(par["direita"]),
+        )
+    except Exception as e:
+        raise _erro_upstream(e)
+
+    # Last-Modified/If-Modified-Since seguem o dataset atualizado mais recentemente
+    etag = _etag(f"{esquerda.versao}-{direita.versao}", request)
+    headers = _cabecalhos_cache(etag, esquerda, direita)
+    if _nao_modificado(request, etag, esquerda, direita):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     try:
-        return UseCases.get_exportacao()
+        corpo = await AsyncUseCases.executar(JuncaoUseCases.juntar, nome_par, esquerda, direita, parametros, filtros)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=corpo, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/balanca-comercial",
+    response_model=List[Dict],
+    summary="Balança comercial por país e ano",
+    description="Cruza exportação e importação por país (sem diferenciar acentos/maiúsculas) e ano, retornando os dois valores e o saldo."
+)
+async def get_balanca_comercial(
+    request: Request,
+    parametros: JuncaoSchema = Depends(parametros_juncao),
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
+    """
+    🔒 Retorna `{"chave", "ano", "exportacao", "importacao", "saldo"}` para cada país e ano,
+    com `saldo = exportacao - importacao` (null quando um dos lados não tem valor).
+
+    Os filtros de ano e de país das rotas dos datasets se aplicam aos dois lados.
+
+    Acesso permitido apenas para usuários autenticados.
+    """
+    return await _responder_juncao("balanca-comercial", request, parametros, filtros)
+
+
+@router.get(
+    "/producao-comercializacao",
+    response_model=List[Dict],
+    summary="Produção x comercialização por produto e ano",
+    description="Cruza produção e comercialização por produto (sem diferenciar acentos/maiúsculas) e ano."
+)
+async def get_producao_comercializacao(
+    request: Request,
+    parametros: JuncaoSchema = Depends(parametros_juncao),
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
+    """
+    🔒 Retorna `{"chave", "ano", "producao", "comercializacao", "diferenca"}` para cada produto e ano,
+    com `diferenca = producao - comercializacao`.
+
+    Produtos com o mesmo nome em categorias diferentes (ex: `Tinto`) são somados;
+    use `chave=control` para cruzar pelo código de controle.
+
+    Acesso permitido apenas para usuários autenticados.
+    """
+    return await _responder_juncao("producao-comercializacao", request, parametros, filtros)
+
+
+@router.get(
+    "/search",
+    response_model=List[Dict],
+    summary="Buscar produtos, países e categorias",
+    description="Busca por prefixo, sem diferenciar acentos e maiúsculas, nos nomes de produto, país e controle dos datasets da Embrapa já carregados em cache."
+)
+async def get_search(
+    q: str = Query(..., min_length=1, description="Texto buscado, ex: `alemanha` ou `vinho ti`."),
+    campo: Optional[Literal["produto", "pais", "controle"]] = Query(None, description="Restringe a busca a um campo."),
+    limit: int = Query(20, ge=1, le=100, description="Quantidade máxima de resultados."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
+    """
+    🔒 Retorna os nomes em que cada palavra de `q` é início de alguma palavra do nome,
+    com o campo, os datasets em que aparecem e a quantidade de linhas.
+
+    O índice é montado uma vez por versão dos datasets; as consultas não percorrem os dados.
+    Só entram os datasets já carregados pelo agendador de ingestão (a busca não
+    baixa arquivos da Embrapa).
+
+    Acesso permitido apenas para usuários autenticados.
+    """
+    return await BuscaUseCases.buscar(q, campo, limit)
+
+
+@router.get(
+    "/status",
+    summary="Estado da ingestão dos datasets",
+    description="Retorna, para cada dataset da Embrapa, o horário e a duração da última atualização bem-sucedida. Não requer autenticação."
+)
+def get_status():
+    """
+    Retorna o estado do agendador de ingestão.
+
+    O campo `pronto` indica se os datasets `essenciais` (EMBRAPA_READY_DATASETS) já estão carregados em cache,
+    `circuito`, o estado do circuit breaker do site da Embrapa, `parse`, o
+    engine, o tempo e a memória do último parse de cada arquivo e `cache`, as
+    entradas (expiradas e em atualização) e os carregamentos agrupados do cache de datasets.
+    """
+    return {
+        **ingestion_scheduler.status(),
+        "circuito": upstream_breaker.status(),
+        "parse": dict(estatisticas_parse),
+        "cache": dataset_cache.stats(),
+    }
+
+
+@router.get(
+    "/ready",
+    summary="Readiness dos datasets",
+    description="Retorna 200 quando os datasets essenciais da Embrapa já estão aquecidos em cache e 503 caso contrário. Útil como readiness probe."
+)
+def get_ready():
+    """
+    Readiness probe: responde 503 até que os datasets essenciais (EMBRAPA_READY_DATASETS,
+    por padrão os cinco das rotas originais) tenham sido carregados.
+    """
+    estado = ingestion_scheduler.status()
+    if not estado["pronto"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=estado)
+    return estado
+
+
+@router.post(
+    "/ingestao",
+    summary="Ingestão de todos os datasets",
+    description="Baixa e processa agora todos os arquivos do registro da Embrapa, em paralelo com concorrência limitada. Acesso restrito a administradores."
+)
+async def post_ingestao(current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)):
+    """
+    🔒 Dispara a ingestão de todos os datasets de `DATASETS_EMBRAPA` e retorna
+    o estado de cada um ao final (mesmo formato de `/embrapa/status`).
+
+    Acesso permitido apenas para usuários com o papel `admin`.
+    """
+    if current_user_token.get("user_type") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para acessar este recurso.",
+        )
+    return await ingestion_scheduler.ingerir_todos()
+
+
+# Declarada por último: rotas fixas com dois segmentos (ex: /{dataset}/aggregate) têm precedência
+@router.get(
+    "/{dataset}/{subtipo}",
+    response_model=List[Dict],
+    summary="Obter um subtipo de dataset",
+    description="Retorna os dados de um subtipo de processamento (viniferas, americanas, mesa, sem-classificacao), importação ou exportação (vinhos, espumantes, uvas-frescas, passas, suco)."
+)
+async def get_subtipo(
+    dataset: str,
+    subtipo: str,
+    request: Request,
+    filtros: FiltrosDatasetSchema = Depends(filtros_dataset),
+    paginacao: PaginacaoSchema = Depends(paginacao_dataset),
+    stream: bool = Query(False, description="Retorna NDJSON (um registro por linha) em streaming."),
+    current_user_token: dict = Depends(AuthUtils.get_current_data_from_token)
+):
+    """
+    🔒 Retorna um dos arquivos publicados pela Embrapa, por exemplo
+    `/embrapa/importacao/espumantes` ou `/embrapa/processamento/americanas`.
+
+    Aceita os mesmos filtros, paginação e streaming das rotas de cada dataset.
+
+    Acesso permitido apenas para usuários autenticados.
+    """
+    subtipos = SUBTIPOS_EMBRAPA.get(dataset)
+    if subtipos is None or subtipo not in subtipos:
+        opcoes = ", ".join(f"{d}/{s}" for d, itens in SUBTIPOS_EMBRAPA.items() for s in itens)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Subtipo '{dataset}/{subtipo}' inexistente. Opções: {opcoes}")
+    return await _responder_dataset(subtipos[subtipo], request, filtros, paginacao, stream)
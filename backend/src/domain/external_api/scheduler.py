@@ -0,0 +1,186 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.logger_config import logger
+from core.settings import settings
+from domain.external_api.use_cases import AsyncUseCases, DATASETS_EMBRAPA
+
+
+class StatusIngestao:
+    """Estado da última ingestão de um dataset."""
+
+    def __init__(self, dataset: str):
+        self.dataset = dataset
+        self.ultima_atualizacao: Optional[datetime] = None
+        self.duracao_segundos: Optional[float] = None
+        self.ultimo_erro: Optional[str] = None
+        self.falhas_consecutivas = 0
+        self.origem: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "dataset": self.dataset,
+            "ultima_atualizacao": self.ultima_atualizacao.isoformat() if self.ultima_atualizacao else None,
+            "duracao_segundos": self.duracao_segundos,
+            "ultimo_erro": self.ultimo_erro,
+            "falhas_consecutivas": self.falhas_consecutivas,
+            "origem": self.origem,
+        }
+
+
+class IngestionScheduler:
+    """
+    Mantém os datasets da Embrapa aquecidos no cache.
+
+    No startup restaura o último snapshot em disco de cada dataset (se houver),
+    baixa todos os datasets em paralelo e, depois, atualiza cada um
+    a cada `interval_seconds` (± `jitter_seconds`, para não sincronizar as
+    requisições ao upstream). Em caso de falha tenta novamente após
+    `retry_seconds`. No máximo `max_concurrency` downloads/parses rodam ao
+    mesmo tempo. `pronto` considera apenas os datasets `essenciais` (todos,
+    se não informados), para que um arquivo secundário fora do ar não derrube
+    a readiness.
+    """
+
+    def __init__(
+        self,
+        refreshers: Dict[str, Callable[[], Awaitable]],
+        interval_seconds: float,
+        restorers: Optional[Dict[str, Callable[[], Awaitable]]] = None,
+        jitter_seconds: float = 0,
+        retry_seconds: float = 60,
+        max_concurrency: int = 4,
+        essenciais: Optional[List[str]] = None,
+    ):
+        self.refreshers = refreshers
+        self.restorers = restorers or {}
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.retry_seconds = retry_seconds
+        self._status = {nome: StatusIngestao(nome) for nome in refreshers}
+        self.essenciais = list(essenciais or refreshers)
+        desconhecidos = [nome for nome in self.essenciais if nome not in refreshers]
+        if desconhecidos:
+            raise ValueError(f"Datasets essenciais inexistentes: {', '.join(desconhecidos)}")
+        self.max_concurrency = max_concurrency
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._semaforo_loop = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def pronto(self) -> bool:
+        """True quando todos os datasets essenciais já foram carregados pelo menos uma vez."""
+        return all(self._status[nome].ultima_atualizacao is not None for nome in self.essenciais)
+
+    def status(self) -> Dict:
+        return {
+            "pronto": self.pronto,
+            "essenciais": self.essenciais,
+            "datasets": {nome: s.to_dict() for nome, s in self._status.items()},
+        }
+
+    async def start(self) -> None:
+        """Inicia uma task de ingestão por dataset, sem bloquear o startup."""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._loop(nome), name=f"ingestao-{nome}")
+            for nome in self.refreshers
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def restaurar(self, nome: str) -> bool:
+        """Restaura o snapshot em disco de um dataset, se existir."""
+        if nome not in self.restorers:
+            return False
+        status = self._status[nome]
+        inicio = time.perf_counter()
+        try:
+            dataset = await self.restorers[nome]()
+        except Exception as e:
+            logger.warning(f"Falha ao restaurar o snapshot do dataset {nome}: {e}")
+            return False
+        if dataset is None:
+            return False
+        status.duracao_segundos = round(time.perf_counter() - inicio, 4)
+        status.ultima_atualizacao = dataset.criado_em
+        status.origem = "snapshot"
+        return True
+
+    async def atualizar(self, nome: str) -> bool:
+        """Atualiza um dataset e registra horário, duração ou erro."""
+        async with self._limite():
+            return await self._atualizar(nome)
+
+    def _limite(self) -> asyncio.Semaphore:
+        # O semáforo pertence a um event loop; recria se o loop mudou (ex: testes, reload)
+        loop = asyncio.get_running_loop()
+        if self._semaforo is None or self._semaforo_loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.max_concurrency)
+            self._semaforo_loop = loop
+        return self._semaforo
+
+    async def _atualizar(self, nome: str) -> bool:
+        status = self._status[nome]
+        inicio = time.perf_counter()
+        try:
+            await self.refreshers[nome]()
+        except Exception as e:
+            status.ultimo_erro = str(e)
+            status.falhas_consecutivas += 1
+            logger.warning(f"Falha na ingestão do dataset {nome}: {e}")
+            return False
+        status.duracao_segundos = round(time.perf_counter() - inicio, 4)
+        status.ultima_atualizacao = datetime.now(timezone.utc)
+        status.ultimo_erro = None
+        status.falhas_consecutivas = 0
+        status.origem = "upstream"
+        return True
+
+    async def ingerir_todos(self) -> Dict:
+        """
+        Atualiza todos os datasets agora, em paralelo (limitado a `max_concurrency`),
+        independente do intervalo de cada um.
+
+        Returns:
+            Dict: Estado de todos os datasets após a ingestão.
+        """
+        await asyncio.gather(*(self.atualizar(nome) for nome in self.refreshers))
+        return self.status()
+
+    async def _loop(self, nome: str) -> None:
+        await self.restaurar(nome)
+        while True:
+            sucesso = await self.atualizar(nome)
+            if sucesso:
+                espera = self.interval_seconds + random.uniform(-self.jitter_seconds, self.jitter_seconds)
+            else:
+                espera = self.retry_seconds
+            await asyncio.sleep(max(espera, 1))
+
+
+# Agendador global, iniciado e encerrado pelo lifespan da aplicação
+ingestion_scheduler = IngestionScheduler(
+    refreshers={
+        nome: (lambda nome=nome: AsyncUseCases.atualizar_dataset(nome))
+        for nome in DATASETS_EMBRAPA
+    },
+    interval_seconds=settings.EMBRAPA_REFRESH_INTERVAL_SECONDS,
+    restorers={
+        nome: (lambda nome=nome: AsyncUseCases.restaurar_snapshot(nome))
+        for nome in DATASETS_EMBRAPA
+    },
+    jitter_seconds=settings.EMBRAPA_REFRESH_JITTER_SECONDS,
+    retry_seconds=settings.EMBRAPA_REFRESH_RETRY_SECONDS,
+    max_concurrency=settings.EMBRAPA_INGESTION_CONCURRENCY,
+    essenciais=settings.EMBRAPA_READY_DATASETS,
+)
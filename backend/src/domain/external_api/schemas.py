@@ -0,0 +1,71 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+
+class PaginacaoSchema(BaseModel):
+    """Paginação por cursor: `cursor` é o valor do header `X-Next-Cursor` da página anterior."""
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+    @property
+    def ativa(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+
+class FiltrosDatasetSchema(BaseModel):
+    """Filtros e projeção aplicados no servidor às rotas /embrapa."""
+    ano_inicio: Optional[int] = None
+    ano_fim: Optional[int] = None
+    produto: Optional[List[str]] = None
+    pais: Optional[List[str]] = None
+    controle: Optional[List[str]] = None
+    campos: Optional[List[str]] = None
+
+    @property
+    def vazio(self) -> bool:
+        return all(valor is None for valor in self.model_dump().values())
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ano_inicio": 2010,
+                "ano_fim": 2020,
+                "pais": ["Alemanha", "Argentina"],
+                "campos": ["Pais"]
+            }
+        }
+
+
+class AgregacaoSchema(BaseModel):
+    """Parâmetros da rota /embrapa/{dataset}/aggregate."""
+    group_by: str = "ano"
+    op: Literal["sum", "mean", "min", "max", "count", "yoy", "moving_avg"] = "sum"
+    top: Optional[int] = None
+    janela: int = 3
+    medida: Optional[Literal["quantidade", "valor"]] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "group_by": "Pais",
+                "op": "sum",
+                "top": 10,
+                "medida": "valor"
+            }
+        }
+
+
+class JuncaoSchema(BaseModel):
+    """Parâmetros das rotas de junção entre datasets (ex: /embrapa/balanca-comercial)."""
+    chave: Optional[str] = None
+    how: Literal["inner", "outer", "left", "right"] = "outer"
+    medida: Optional[Literal["quantidade", "valor"]] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "chave": "Pais",
+                "how": "inner",
+                "medida": "valor"
+            }
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain.external_api.dataset import EmbrapaDataset, normalizar
+from domain.external_api.use_cases import AsyncUseCases, DATASETS_EMBRAPA, UseCases
+
+# Filtros de `COLUNAS_FILTRO` cujos valores entram no índice de busca
+CAMPOS_BUSCA = ("produto", "pais", "controle")
+
+
+def palavras(normalizado: str) -> List[str]:
+    """Palavras de um nome normalizado (ex: "vm_tinto" -> ["vm", "tinto"])."""
+    return [p for p in re.split(r"[^0-9a-z]+", normalizado) if p]
+
+
+class IndiceBusca:
+    """
+    Índice invertido dos nomes de produto, país e controle de vários datasets.
+
+    Cada nome distinto (por campo e forma normalizada, sem acentos/maiúsculas)
+    vira um item com os datasets em que aparece. O nome normalizado completo e
+    cada uma das suas palavras entram em uma lista ordenada de termos; a busca
+    por prefixo é uma busca binária nessa lista, sem percorrer os datasets.
+    """
+
+    def __init__(self, itens: List[Dict], normalizados: List[str]):
+        self.itens = itens
+        self._normalizados = normalizados
+        pares = sorted(
+            (termo, i)
+            for i, normalizado in enumerate(normalizados)
+            for termo in {normalizado, *palavras(normalizado)}
+        )
+        self._termos = [termo for termo, _ in pares]
+        self._ids = [i for _, i in pares]
+
+    @classmethod
+    def montar(cls, datasets: Dict[str, EmbrapaDataset]) -> "IndiceBusca":
+        """Monta o índice a partir das tabelas de normalização (memoizadas) de cada dataset."""
+        grupos: Dict[Tuple[str, str], Dict] = {}
+        for nome, dataset in datasets.items():
+            for campo in CAMPOS_BUSCA:
+                posicao = UseCases.posicao_filtro(dataset, campo)
+                if posicao is None:
+                    continue
+                codigos, categorias = dataset.codigos_chave(posicao)
+                linhas = np.bincount(codigos[codigos >= 0], minlength=len(categorias))
+                for valor, normalizado, quantidade in zip(categorias, dataset.normalizados(posicao), linhas.tolist()):
+                    if not normalizado:
+                        continue
+                    item = grupos.setdefault((campo, normalizado), {
+                        "valor": str(valor).strip(), "campo": campo, "datasets": set(), "linhas": 0,
+                    })
+                    item["datasets"].add(nome)
+                    item["linhas"] += quantidade
+
+        chaves = sorted(grupos)
+        itens = []
+        for chave in chaves:
+            item = grupos[chave]
+            itens.append({**item, "datasets": sorted(item["datasets"])})
+        return cls(itens, [normalizado for _, normalizado in chaves])
+
+    def buscar(self, consulta: str, campo: Optional[str] = None, limite: int = 20) -> List[Dict]:
+        """
+        Itens em que cada palavra da consulta é prefixo de alguma palavra do nome
+        (palavras separadas por espaços ou pontuação).
+
+        Os resultados vêm ordenados por relevância: nome igual à consulta, nome que
+        começa com a consulta e os demais, em ordem alfabética dentro de cada grupo.
+        """
+        termos = palavras(normalizar(consulta))
+        if not termos:
+            return []
+        candidatos = None
+        for palavra in termos:
+            inicio = bisect_left(self._termos, palavra)
+            fim = bisect_left(self._termos, palavra + "\uffff")
+            encontrados = set(self._ids[inicio:fim])
+            candidatos = encontrados if candidatos is None else candidatos & encontrados
+            if not candidatos:
+                return []
+
+        alvo = normalizar(consulta)
+        if campo is not None:
+            candidatos = [i for i in candidatos if self.itens[i]["campo"] == campo]
+        ordenados = sorted(
+            candidatos,
+            key=lambda i: (self._normalizados[i] != alvo, not self._normalizados[i].startswith(alvo), self._normalizados[i]),
+        )
+        return [self.itens[i] for i in ordenados[:limite]]
+
+
+class BuscaUseCases:
+    """
+    Busca por nome nos datasets da Embrapa em cache.
+
+    O índice é remontado apenas quando a versão de algum dataset muda; as
+    consultas seguintes usam o índice pronto. A busca não baixa datasets: os
+    que ainda não estão em cache entram no índice quando o agendador de
+    ingestão os carregar.
+    """
+
+    _indice: Optional[Tuple[tuple, IndiceBusca]] = None
+
+    @staticmethod
+    async def indice() -> IndiceBusca:
+        datasets = {}
+        for nome in DATASETS_EMBRAPA:
+            dataset = AsyncUseCases.dataset_em_cache(nome)
+            if dataset is not None:
+                datasets[nome] = dataset
+
+        versoes = tuple((nome, dataset.versao) for nome, dataset in datasets.items())
+        atual = BuscaUseCases._indice
+        if atual is not None and atual[0] == versoes:
+            return atual[1]
+        loop = asyncio.get_running_loop()
+        indice = await loop.run_in_executor(None, IndiceBusca.montar, datasets)
+        BuscaUseCases._indice = (versoes, indice)
+        return indice
+
+    @staticmethod
+    async def buscar(consulta: str, campo: Optional[str] = None, limite: int = 20) -> List[Dict]:
+        indice = await BuscaUseCases.indice()
+        return indice.buscar(consulta, campo, limite)
@@ -0,0 +1,78 @@
+import gzip
+import json
+from typing import Any, Dict, Optional, Tuple
+
+# Encoders rápidos (dependências do projeto); o json/gzip da stdlib fica como
+# alternativa para ambientes sem as extensões compiladas
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def json_bytes(obj: Any) -> bytes:
+    """Serializa para JSON (UTF-8, sem espaços), no mesmo formato do JSONResponse do FastAPI."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def qualidades_encoding(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """
+    Valor `q` de cada codificação do header `Accept-Encoding` (RFC 9110, seção 12.5.3).
+
+    Codificações sem `q` valem 1; `q` inválido é tratado como 0 (não aceita).
+    """
+    qualidades: Dict[str, float] = {}
+    for parte in (accept_encoding or "").split(","):
+        codificacao, *parametros = [item.strip() for item in parte.split(";")]
+        if not codificacao:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            nome, _, valor = parametro.partition("=")
+            if nome.strip().lower() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        qualidades[codificacao.lower()] = q
+    return qualidades
+
+
+class CorpoSerializado:
+    """
+    Corpo JSON já serializado de uma versão de dataset, com as variantes
+    pré-comprimidas (gzip e, se disponível, brotli).
+    """
+
+    def __init__(self, corpo: bytes):
+        self.identity = corpo
+        self.gzip = gzip.compress(corpo, compresslevel=6, mtime=0)
+        self.br = brotli.compress(corpo) if brotli is not None else None
+
+    def escolher(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """
+        Escolhe a variante conforme o header `Accept-Encoding` do cliente.
+
+        Returns:
+            Tuple[bytes, Optional[str]]: Corpo e valor do `Content-Encoding` (None = sem compressão).
+
+        Codificações com `q=0` não são usadas; `*` vale para as não listadas. Vence
+        o maior `q` e, no empate, brotli e depois gzip. Sem nenhuma aceita (ou com
+        `identity` preferido), o corpo vai sem compressão.
+        """
+        qualidades = qualidades_encoding(accept_encoding)
+        curinga = qualidades.get("*", 0.0)
+        escolhido: Tuple[bytes, Optional[str]] = (self.identity, None)
+        melhor_q = qualidades.get("identity", 0.0)
+        for corpo, codificacao in ((self.br, "br"), (self.gzip, "gzip")):
+            q = qualidades.get(codificacao, curinga)
+            if corpo is not None and q > 0 and q > melhor_q:
+                escolhido, melhor_q = (corpo, codificacao), q
+        return escolhido
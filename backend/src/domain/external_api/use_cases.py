@@ -1,39 +1,204 @@
-from typing import List, Dict
-import pandas as pd
-import requests
-import unicodedata
+from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import hashlib
+import os
+import threading
+import httpx
+import numpy as np
 import pandas as pd
+from core.logger_config import logger
+from core.settings import settings
+from domain.external_api.changes import FeedMudancas, calcular_mudancas, celulas
+from domain.external_api.dataset import EmbrapaDataset, SelecaoDataset, remover_acentos
+from domain.external_api.parsing import CabecalhoInvalidoError, EsquemaCsv, ler_csv
+from domain.external_api.schemas import FiltrosDatasetSchema, PaginacaoSchema
+from infra.cache.dataset_cache import DatasetCache
+from infra.db.bulk_loader import SeriesBulkLoader
+from infra.http.async_client import AsyncConditionalFetcher
+from infra.http.circuit_breaker import CircuitBreaker, CircuitoAbertoError
+from infra.sources.data_source import DataSource, HttpDataSource, LocalDirectoryDataSource, RecordingDataSource, nome_arquivo
+from infra.storage.snapshot_store import SnapshotStore
+
+# Cache compartilhado pelos datasets da Embrapa, chaveado por (url, sep, encoding)
+dataset_cache = DatasetCache(
+    ttl_seconds=settings.EMBRAPA_CACHE_TTL_SECONDS,
+    max_entries=settings.EMBRAPA_CACHE_MAX_ENTRIES,
+)
+
+# Cliente assíncrono com pool keep-alive (aberto/fechado no lifespan da aplicação)
+async_http_fetcher = AsyncConditionalFetcher(
+    timeout=settings.EMBRAPA_HTTP_TIMEOUT_SECONDS,
+    connect_timeout=settings.EMBRAPA_HTTP_CONNECT_TIMEOUT_SECONDS,
+    max_connections=settings.EMBRAPA_HTTP_MAX_CONNECTIONS,
+    max_keepalive=settings.EMBRAPA_HTTP_MAX_KEEPALIVE,
+)
+
+
+def criar_data_source(tipo: str, diretorio: Optional[str]) -> DataSource:
+    """Cria a origem dos CSVs conforme `EMBRAPA_SOURCE` (http, local ou record)."""
+    if tipo in ("local", "record") and not diretorio:
+        raise ValueError(f"EMBRAPA_SOURCE={tipo} exige EMBRAPA_SOURCE_DIR (diretório dos CSVs).")
+    if tipo == "local":
+        return LocalDirectoryDataSource(diretorio)
+    http = HttpDataSource(async_http_fetcher)
+    if tipo == "record":
+        return RecordingDataSource(http, diretorio)
+    if tipo != "http":
+        raise ValueError(f"EMBRAPA_SOURCE inválido: {tipo}. Use http, local ou record.")
+    return http
+
+
+# Origem dos CSVs usada por AsyncUseCases.fetch_data (site da Embrapa ou diretório local)
+data_source = criar_data_source(settings.EMBRAPA_SOURCE, settings.EMBRAPA_SOURCE_DIR)
+
+# Circuit breaker do upstream (site da Embrapa)
+upstream_breaker = CircuitBreaker(
+    failure_threshold=settings.EMBRAPA_CB_FAILURE_THRESHOLD,
+    reset_timeout=settings.EMBRAPA_CB_RESET_SECONDS,
+    max_reset_timeout=settings.EMBRAPA_CB_MAX_RESET_SECONDS,
+    backoff_factor=settings.EMBRAPA_CB_BACKOFF_FACTOR,
+    nome="Site da Embrapa",
+)
+
+# Pool dedicado ao parse/transformação dos CSVs, fora do event loop e do threadpool padrão.
+# Criado no primeiro uso e recriado depois de um `AsyncUseCases.encerrar` (ex: testes, reload)
+_parse_executor: Optional[ThreadPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def parse_executor() -> ThreadPoolExecutor:
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            _parse_executor = ThreadPoolExecutor(
+                max_workers=settings.EMBRAPA_PARSE_WORKERS, thread_name_prefix="csv-parser"
+            )
+        return _parse_executor
+
+# Snapshots colunares em disco, usados para o warm restart
+snapshot_store = SnapshotStore(settings.EMBRAPA_SNAPSHOT_DIR)
+
+# Carga em massa das séries na tabela embrapa_series
+series_loader = SeriesBulkLoader(batch_size=settings.EMBRAPA_DB_BATCH_SIZE)
+
+# Mudanças célula a célula entre versões consecutivas, chaveadas como o cache
+feed_mudancas = FeedMudancas(max_versoes=settings.EMBRAPA_CHANGES_MAX_VERSIONS)
+
+# Registro de todos os arquivos da Embrapa (parâmetros de download e transformação).
+# Os cinco primeiros são os das rotas originais; os demais são os subtipos de
+# processamento, importação e exportação publicados no site.
+_BASE_EMBRAPA = "http://vitibrasil.cnpuv.embrapa.br/download/"
+DATASETS_EMBRAPA: Dict[str, Dict] = {
+    "producao": {"csv_url": _BASE_EMBRAPA + "Producao.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 3},
+    "processamento": {"csv_url": _BASE_EMBRAPA + "ProcessaViniferas.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 3},
+    "comercializacao": {"csv_url": _BASE_EMBRAPA + "Comercio.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 3},
+    "importacao": {"csv_url": _BASE_EMBRAPA + "ImpVinhos.csv", "sep": '\t', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "exportacao": {"csv_url": _BASE_EMBRAPA + "ExpVinho.csv", "sep": '\t', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "processamento-americanas": {"csv_url": _BASE_EMBRAPA + "ProcessaAmericanas.csv", "sep": '\t', "encoding": 'latin1', "num_colunas_fixas": 3},
+    "processamento-mesa": {"csv_url": _BASE_EMBRAPA + "ProcessaMesa.csv", "sep": '\t', "encoding": 'latin1', "num_colunas_fixas": 3},
+    "processamento-sem-classificacao": {"csv_url": _BASE_EMBRAPA + "ProcessaSemclass.csv", "sep": '\t', "encoding": 'latin1', "num_colunas_fixas": 3},
+    "importacao-espumantes": {"csv_url": _BASE_EMBRAPA + "ImpEspumantes.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "importacao-uvas-frescas": {"csv_url": _BASE_EMBRAPA + "ImpFrescas.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "importacao-passas": {"csv_url": _BASE_EMBRAPA + "ImpPassas.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "importacao-suco": {"csv_url": _BASE_EMBRAPA + "ImpSuco.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "exportacao-espumantes": {"csv_url": _BASE_EMBRAPA + "ExpEspumantes.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "exportacao-uvas-frescas": {"csv_url": _BASE_EMBRAPA + "ExpUva.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+    "exportacao-suco": {"csv_url": _BASE_EMBRAPA + "ExpSuco.csv", "sep": ';', "encoding": 'latin1', "num_colunas_fixas": 2},
+}
+
+# Subtipos servidos por /embrapa/{dataset}/{subtipo} e o nome correspondente em DATASETS_EMBRAPA
+SUBTIPOS_EMBRAPA: Dict[str, Dict[str, str]] = {
+    "processamento": {
+        "viniferas": "processamento",
+        "americanas": "processamento-americanas",
+        "mesa": "processamento-mesa",
+        "sem-classificacao": "processamento-sem-classificacao",
+    },
+    "importacao": {
+        "vinhos": "importacao",
+        "espumantes": "importacao-espumantes",
+        "uvas-frescas": "importacao-uvas-frescas",
+        "passas": "importacao-passas",
+        "suco": "importacao-suco",
+    },
+    "exportacao": {
+        "vinhos": "exportacao",
+        "espumantes": "exportacao-espumantes",
+        "uvas-frescas": "exportacao-uvas-frescas",
+        "suco": "exportacao-suco",
+    },
+}
+
+# Ajustes do esquema de leitura por arquivo; os demais usam `EsquemaCsv.padrao`
+# (id inteiro, colunas fixas de texto e anos numéricos)
+ESQUEMAS_CSV: Dict[str, Dict] = {}
+
+# Arquivos cuja rota original (com 3 colunas fixas) devolvia a quantidade do primeiro
+# ano como campo do registro (`"1970": ...`) e não em `dados`. Na matriz do dataset
+# ela é uma coluna de ano como as demais; só o JSON mantém o layout antigo
+ANOS_COMO_CAMPO: Dict[str, int] = {
+    "ImpVinhos.csv": 1,
+    "ExpVinho.csv": 1,
+}
+
+# Último relatório de parse de cada arquivo (engine, tempo e memória), exposto em /embrapa/status
+estatisticas_parse: Dict[str, Dict] = {}
+
+# Filtros por valor e as colunas fixas a que se aplicam (nomes sem acento, minúsculos)
+COLUNAS_FILTRO: Dict[str, tuple] = {
+    "produto": ("produto",),
+    "pais": ("pais",),
+    "controle": ("control", "controle"),
+}
+
+class CursorExpiradoError(ValueError):
+    """O cursor de paginação pertence a uma versão anterior do dataset."""
+
+
+class UpstreamIndisponivelError(Exception):
+    """Falha de rede, timeout ou erro 5xx do site da Embrapa (conta para o circuit breaker)."""
+
+
+def _falha_upstream(mensagem: str) -> UpstreamIndisponivelError:
+    upstream_breaker.registrar_falha()
+    return UpstreamIndisponivelError(mensagem)
+
 
 class UseCases:
     @staticmethod
-    def fetch_data(url: str, sep: str = ';', encoding: str = 'latin1') -> List[Dict]:
-        try:
-            # Verifica se a URL está acessível
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()  # Gera um erro se o status não for 200
-
-            # Lê o CSV diretamente da URL
-            df = pd.read_csv(url, sep=sep, encoding=encoding)
-            df.to_csv("./data.csv")
-            return df.fillna('')
+    def esquema_csv(nome: Optional[str], sep: str = ';', encoding: str = 'latin1', num_colunas_fixas: int = 3) -> EsquemaCsv:
+        """Esquema de leitura de um arquivo: o padrão com os ajustes de `ESQUEMAS_CSV`."""
+        esquema = EsquemaCsv.padrao(sep, encoding, num_colunas_fixas)
+        return esquema._replace(**ESQUEMAS_CSV.get(nome, {}))
 
-        except requests.exceptions.HTTPError as http_err:
-            raise Exception(f"Erro HTTP ao acessar {url}: {http_err}")
-        except requests.exceptions.ConnectionError:
-            raise Exception(f"Erro de conexão ao acessar {url}. Verifique a URL ou sua conexão.")
-        except requests.exceptions.Timeout:
-            raise Exception(f"Timeout ao tentar acessar {url}.")
-        except pd.errors.ParserError as parse_err:
-            raise Exception(f"Erro ao ler o CSV de {url}: {parse_err}")
-        except Exception as e:
-            raise Exception(f"Erro inesperado ao processar {url}: {e}")
     @staticmethod
-    def remover_acentos(texto):
-        if not isinstance(texto, str):
-            return texto
-        nfkd = unicodedata.normalize('NFKD', texto)
-        return ''.join([c for c in nfkd if not unicodedata.combining(c)])
-    
+    def parse_csv(content: bytes, sep: str = ';', encoding: str = 'latin1', num_colunas_fixas: int = 3, nome: Optional[str] = None) -> pd.DataFrame:
+        """
+        Faz o parse tipado do conteúdo de um CSV já baixado (ver `parsing.ler_csv`).
+
+        Os arquivos da Embrapa alternam entre `;` e tabulação; o separador é
+        confirmado pelo cabeçalho. O tempo e a memória do parse ficam em
+        `estatisticas_parse`, pelo nome do arquivo.
+
+        Raises:
+            CabecalhoInvalidoError: Alguma coluna depois das fixas não tem um ano como nome.
+        """
+        esquema = UseCases.esquema_csv(nome, sep, encoding, num_colunas_fixas)
+        df, relatorio = ler_csv(content, esquema, engine=settings.EMBRAPA_CSV_ENGINE)
+        if nome is not None:
+            estatisticas_parse[nome] = relatorio.to_dict()
+            logger.info(
+                f"{nome}: parse ({relatorio.engine}) de {relatorio.linhas} linhas em {relatorio.segundos:.3f}s, "
+                f"{relatorio.memoria_bytes / 1024:.0f} KiB"
+            )
+        if relatorio.valores_invalidos:
+            logger.warning(f"{nome or 'CSV'}: {relatorio.valores_invalidos} valores não numéricos tratados como ausentes")
+        return df
+
+    remover_acentos = staticmethod(remover_acentos)
+
     @staticmethod
     def transformar_dataframe_em_json(df: pd.DataFrame, num_colunas_fixas: int) -> list:
         """
@@ -47,62 +212,352 @@ class UseCases:
         Returns:
             list: Lista de dicionários estruturados com campo 'dados'.
         """
-        # Remove acentos das colunas
-        df.columns = [UseCases.remover_acentos(str(c)) for c in df.columns]
+        return EmbrapaDataset.from_dataframe(df, num_colunas_fixas).registros()
+
+    @staticmethod
+    def nome_snapshot(csv_url: str, sep: str, encoding: str) -> str:
+        """Nome do snapshot em disco de um dataset (ex: Producao-1a2b3c4d5e6f)."""
+        base = os.path.splitext(os.path.basename(csv_url))[0] or "dataset"
+        digest = hashlib.sha1(f"{csv_url}|{sep}|{encoding}".encode("utf-8")).hexdigest()[:12]
+        return f"{base}-{digest}"
+
+    @staticmethod
+    def montar_dataset(
+        df: pd.DataFrame,
+        num_colunas_fixas: int,
+        anterior: Optional[EmbrapaDataset],
+        csv_url: str,
+        sep: str,
+        encoding: str,
+        validadores: Dict,
+    ) -> EmbrapaDataset:
+        """
+        Monta o dataset a partir do CSV recém-baixado e, se o conteúdo mudou, registra
+        as células alteradas no feed de mudanças, grava o snapshot e pré-serializa
+        a resposta JSON.
+
+        Se a versão (hash do conteúdo) for igual à anterior, devolve a cópia anterior.
+        """
+        dataset = EmbrapaDataset.from_dataframe(df, num_colunas_fixas, ANOS_COMO_CAMPO.get(nome_arquivo(csv_url), 0))
+        dataset.etag = validadores.get("etag")
+        dataset.last_modified = validadores.get("last_modified")
+        if anterior is not None and anterior.versao == dataset.versao:
+            anterior.etag, anterior.last_modified = dataset.etag, dataset.last_modified
+            return anterior
+
+        if anterior is not None:
+            try:
+                mudancas = calcular_mudancas(anterior, dataset, *UseCases.posicoes_chave(dataset))
+                feed_mudancas.registrar((csv_url, sep, encoding), anterior.versao, dataset.versao, mudancas)
+                logger.info(f"{csv_url}: versão {dataset.versao} com {len(mudancas)} células alteradas")
+            except Exception as e:
+                logger.warning(f"Não foi possível calcular as mudanças de {csv_url}: {e}")
+
+        if settings.EMBRAPA_SNAPSHOT_ENABLED:
+            try:
+                arrays, meta = dataset.to_snapshot()
+                snapshot_store.save(UseCases.nome_snapshot(csv_url, sep, encoding), dataset.versao, arrays, meta)
+            except OSError as e:
+                logger.warning(f"Não foi possível gravar o snapshot de {csv_url}: {e}")
+
+        # Serializa a resposta completa agora, na atualização, e não na primeira requisição
+        dataset.corpo_serializado()
+        return dataset
+
+    @staticmethod
+    def restaurar_snapshot(csv_url: str, sep: str, encoding: str) -> Optional[EmbrapaDataset]:
+        """
+        Carrega o último snapshot gravado do dataset (arrays via memmap) para o cache.
+
+        Também restaura o ETag/Last-Modified, para que a primeira atualização
+        após o restart seja apenas um GET condicional.
+        """
+        if not settings.EMBRAPA_SNAPSHOT_ENABLED:
+            return None
+        snapshot = snapshot_store.load(UseCases.nome_snapshot(csv_url, sep, encoding))
+        if snapshot is None:
+            return None
+        _, arrays, meta = snapshot
+        try:
+            dataset = EmbrapaDataset.from_snapshot(arrays, meta)
+        except KeyError as e:
+            # Snapshot gravado num formato anterior: ignora e deixa o dataset ser baixado de novo
+            logger.warning(f"Snapshot de {csv_url} em formato antigo, ignorando: {e}")
+            return None
+        dataset.corpo_serializado()
+        data_source.seed(csv_url, dataset.etag, dataset.last_modified)
+        dataset_cache.put((csv_url, sep, encoding), dataset)
+        return dataset
+
+    @staticmethod
+    def posicoes_chave(dataset: EmbrapaDataset):
+        """
+        Colunas fixas que identificam um registro: a chave principal (produto ou país)
+        e a categoria (controle), quando existir.
+
+        Returns:
+            Tuple[int, Optional[int]]: Posição da chave e da categoria.
+        """
+        posicao_chave = next(
+            (p for p in (dataset.posicao_coluna_fixa(c) for c in COLUNAS_FILTRO["produto"] + COLUNAS_FILTRO["pais"]) if p is not None),
+            len(dataset.colunas_fixas) - 1,
+        )
+        posicao_categoria = next(
+            (p for p in (dataset.posicao_coluna_fixa(c) for c in COLUNAS_FILTRO["controle"]) if p is not None), None
+        )
+        return posicao_chave, posicao_categoria
+
+    @staticmethod
+    def sincronizar_banco(nome: str, dataset: EmbrapaDataset) -> int:
+        """
+        Grava a versão do dataset na tabela `embrapa_series`, se ela ainda não estiver no banco.
+
+        Se o banco está numa versão anterior cujas mudanças até a atual estão no feed
+        de mudanças, grava só as células alteradas; senão (primeira carga, ou versão
+        desconhecida por este processo), recarrega o dataset inteiro.
+
+        A chave principal é a coluna de produto ou de país e a categoria, a coluna de controle.
+
+        Returns:
+            int: Células gravadas (0 quando a versão já estava carregada).
+        """
+        # Atalho para não montar o formato longo à toa; as cargas conferem a versão
+        # de novo dentro da própria transação, com o dataset travado
+        carregada = series_loader.versao_carregada(nome)
+        if carregada == dataset.versao:
+            return 0
+        if carregada is not None:
+            config = DATASETS_EMBRAPA[nome]
+            atualizacoes = feed_mudancas.desde((config["csv_url"], config["sep"], config["encoding"]), carregada, dataset.versao)
+            if atualizacoes and atualizacoes[-1]["versao"] == dataset.versao:
+                alteradas = series_loader.aplicar_mudancas(nome, carregada, atualizacoes)
+                if alteradas is not None:
+                    return alteradas
+        series = celulas(dataset, *UseCases.posicoes_chave(dataset))
+        return series_loader.carregar(nome, dataset.versao, series)
+
+    @staticmethod
+    def posicao_filtro(dataset: EmbrapaDataset, nome_filtro: str) -> Optional[int]:
+        """Posição da coluna fixa correspondente a um filtro de `COLUNAS_FILTRO` (None se não houver)."""
+        return next(
+            (p for p in (dataset.posicao_coluna_fixa(c) for c in COLUNAS_FILTRO[nome_filtro]) if p is not None), None
+        )
+
+    @staticmethod
+    def selecionar(dataset: EmbrapaDataset, filtros: Optional[FiltrosDatasetSchema] = None) -> SelecaoDataset:
+        """
+        Traduz filtros de ano, de valor (produto/país/controle) e a projeção de campos
+        em linhas e colunas do dataset.
+
+        Os filtros usam os índices do dataset (anos ordenados e índices invertidos
+        das colunas fixas), sem percorrer a lista completa de registros.
+        """
+        if filtros is None or filtros.vazio:
+            return SelecaoDataset()
+
+        linhas = None
+        for nome_filtro in COLUNAS_FILTRO:
+            valores = getattr(filtros, nome_filtro)
+            if not valores:
+                continue
+            posicao = UseCases.posicao_filtro(dataset, nome_filtro)
+            if posicao is None:
+                raise ValueError(f"O filtro '{nome_filtro}' não se aplica a este dataset. Colunas disponíveis: {', '.join(dataset.colunas_fixas)}")
+            encontradas = dataset.linhas_com_valores(posicao, valores)
+            linhas = encontradas if linhas is None else np.intersect1d(linhas, encontradas)
+
+        posicoes_anos = None
+        if filtros.ano_inicio is not None or filtros.ano_fim is not None:
+            posicoes_anos = dataset.posicoes_anos(filtros.ano_inicio, filtros.ano_fim)
+
+        campos = None
+        if filtros.campos:
+            campos = []
+            for nome in filtros.campos:
+                posicao = dataset.posicao_coluna_fixa(nome)
+                if posicao is None:
+                    raise ValueError(f"Campo '{nome}' inexistente. Campos disponíveis: {', '.join(dataset.colunas_fixas)}")
+                campos.append(posicao)
+
+        return SelecaoDataset(linhas=linhas, posicoes_anos=posicoes_anos, campos=campos)
+
+    @staticmethod
+    def codificar_cursor(versao: str, posicao: int) -> str:
+        return base64.urlsafe_b64encode(f"{versao}:{posicao}".encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decodificar_cursor(cursor: str, versao: str) -> int:
+        try:
+            versao_cursor, posicao = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(":")
+            posicao = int(posicao)
+        except (ValueError, UnicodeError):
+            raise ValueError("Cursor inválido.")
+        if versao_cursor != versao:
+            raise CursorExpiradoError("O dataset foi atualizado desde o início da paginação. Reinicie sem o cursor.")
+        return posicao
+
+    @staticmethod
+    def paginar(dataset: EmbrapaDataset, selecao: SelecaoDataset, paginacao: PaginacaoSchema):
+        """
+        Restringe a seleção a uma página de `limit` linhas a partir do `cursor`.
 
-        # Remove acentos em colunas tipo "Pais"
-        for col in df.columns[:num_colunas_fixas]:
-            if df[col].dtype == object:
-                df[col] = df[col].apply(UseCases.remover_acentos)
+        O cursor guarda a versão do dataset e a posição da próxima linha; se o
+        dataset mudar entre as páginas, a paginação precisa ser reiniciada.
 
-        colunas_fixas = df.columns[:num_colunas_fixas]
-        colunas_dados = df.columns[num_colunas_fixas:]
+        Returns:
+            Tuple[SelecaoDataset, Optional[str]]: Seleção da página e cursor da próxima (ou None).
+        """
+        linhas = np.arange(dataset.num_linhas) if selecao.linhas is None else selecao.linhas
+        limite = min(paginacao.limit or settings.EMBRAPA_PAGE_DEFAULT_LIMIT, settings.EMBRAPA_PAGE_MAX_LIMIT)
+        inicio = 0 if paginacao.cursor is None else UseCases.decodificar_cursor(paginacao.cursor, dataset.versao)
+        fim = inicio + limite
+        proximo = UseCases.codificar_cursor(dataset.versao, fim) if fim < len(linhas) else None
+        return selecao._replace(linhas=linhas[inicio:fim]), proximo
 
-        resultado = []
 
-        for _, row in df.iterrows():
-            item = {col: row[col] for col in colunas_fixas}
-            dados = []
+class AsyncUseCases:
+    """
+    Casos de uso da Embrapa chamados pelas rotas e pelo agendador de ingestão.
 
-            for col in colunas_dados:
-                try:
-                    ano = float(col)
-                    valor = row[col]
-                    dados.append({"ano": ano, "valor": valor})
-                except:
-                    continue
+    O download usa o cliente HTTP compartilhado (pool keep-alive) e o parse e a
+    transformação dos CSVs rodam no `parse_executor`, sem bloquear o event loop.
+    """
 
-            item["dados"] = dados
-            resultado.append(item)
+    @staticmethod
+    async def iniciar() -> None:
+        """Abre a origem dos CSVs (ex: cliente HTTP compartilhado). Chamado no startup da aplicação."""
+        await data_source.open()
 
-        return resultado
+    @staticmethod
+    async def encerrar() -> None:
+        """Fecha a origem dos CSVs e o pool de parse (recriado no próximo uso). Chamado no shutdown da aplicação."""
+        global _parse_executor
+        await data_source.close()
+        with _parse_executor_lock:
+            executor, _parse_executor = _parse_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     @staticmethod
-    def get_producao(csv_url: str = "http://vitibrasil.cnpuv.embrapa.br/download/Producao.csv", sep: str = ';', encoding: str = 'latin1') -> List[Dict]:
-        df = UseCases.fetch_data(csv_url, sep=sep, encoding=encoding)
-        json = UseCases.transformar_dataframe_em_json(df,3)
-        return json
+    async def executar(funcao, *args):
+        """Executa `funcao(*args)` no pool de parse, sem bloquear o event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(parse_executor(), funcao, *args)
 
     @staticmethod
-    def get_processamento(csv_url: str = "http://vitibrasil.cnpuv.embrapa.br/download/ProcessaViniferas.csv", sep: str = ';', encoding: str = 'latin1') -> List[Dict]:  
-        df = UseCases.fetch_data(csv_url, sep=sep, encoding=encoding)
-        json = UseCases.transformar_dataframe_em_json(df,3)
-        return json 
+    async def fetch_data(url: str, sep: str = ';', encoding: str = 'latin1', condicional: bool = False, num_colunas_fixas: int = 3) -> Optional[pd.DataFrame]:
+        upstream_breaker.permitir()
+        try:
+            resultado = await data_source.afetch(url, conditional=condicional)
+        except httpx.HTTPStatusError as http_err:
+            if http_err.response.status_code >= 500:
+                raise _falha_upstream(f"Erro HTTP ao acessar {url}: {http_err}")
+            upstream_breaker.registrar_sucesso()
+            raise Exception(f"Erro HTTP ao acessar {url}: {http_err}")
+        except httpx.TimeoutException:
+            raise _falha_upstream(f"Timeout ao tentar acessar {url}.")
+        except httpx.TransportError:
+            raise _falha_upstream(f"Erro de conexão ao acessar {url}. Verifique a URL ou sua conexão.")
+        except Exception as e:
+            raise Exception(f"Erro inesperado ao processar {url}: {e}")
+        upstream_breaker.registrar_sucesso()
+
+        if resultado.not_modified:
+            return None
+        try:
+            return await AsyncUseCases.executar(
+                UseCases.parse_csv, resultado.content, sep, encoding, num_colunas_fixas, nome_arquivo(url)
+            )
+        except (pd.errors.ParserError, CabecalhoInvalidoError) as parse_err:
+            raise Exception(f"Erro ao ler o CSV de {url}: {parse_err}")
+        except Exception as e:
+            raise Exception(f"Erro inesperado ao processar {url}: {e}")
 
     @staticmethod
-    def get_comercializacao(csv_url: str = "http://vitibrasil.cnpuv.embrapa.br/download/Comercio.csv", sep: str = ';', encoding: str = 'latin1') -> List[Dict]:
-        df = UseCases.fetch_data(csv_url, sep=sep, encoding=encoding)
-        json = UseCases.transformar_dataframe_em_json(df,3)
-        return json 
+    async def obter_dataset(csv_url: str, sep: str, encoding: str, num_colunas_fixas: int, forcar: bool = False) -> EmbrapaDataset:
+        """
+        Retorna o dataset a partir do cache em memória.
+
+        O download e a transformação só acontecem no primeiro acesso; depois disso
+        o cache devolve a cópia existente e a atualiza em background quando expira.
+        Se o arquivo não mudou no upstream, a atualização custa apenas um 304.
+        Com o upstream indisponível, a cópia em cache (ou o último snapshot em
+        disco) continua sendo servida.
+
+        Com `forcar=True` baixa (condicionalmente) e substitui a cópia em cache
+        mesmo que ela ainda não tenha expirado.
+        """
+        async def carregar(anterior: Optional[EmbrapaDataset]) -> EmbrapaDataset:
+            try:
+                df = await AsyncUseCases.fetch_data(
+                    csv_url, sep=sep, encoding=encoding, condicional=anterior is not None, num_colunas_fixas=num_colunas_fixas
+                )
+            except (CircuitoAbertoError, UpstreamIndisponivelError):
+                # Cache frio com o upstream fora do ar: serve o último snapshot em disco, se houver
+                restaurado = None
+                if anterior is None:
+                    restaurado = await AsyncUseCases.executar(UseCases.restaurar_snapshot, csv_url, sep, encoding)
+                if restaurado is None:
+                    raise
+                return restaurado
+            if df is None:
+                return anterior
+            return await AsyncUseCases.executar(
+                UseCases.montar_dataset,
+                df, num_colunas_fixas, anterior, csv_url, sep, encoding, data_source.validators(csv_url),
+            )
+
+        if forcar:
+            return await dataset_cache.arefresh((csv_url, sep, encoding), carregar)
+        return await dataset_cache.aget((csv_url, sep, encoding), carregar)
+
+    @staticmethod
+    async def atualizar_dataset(nome: str) -> EmbrapaDataset:
+        """
+        Força a atualização de um dos datasets de `DATASETS_EMBRAPA` e, se habilitado,
+        grava a nova versão no banco. Falhas no banco não interrompem a atualização.
+        """
+        dataset = await AsyncUseCases.obter_dataset(**DATASETS_EMBRAPA[nome], forcar=True)
+        if settings.EMBRAPA_DB_SYNC_ENABLED:
+            loop = asyncio.get_running_loop()
+            try:
+                linhas = await loop.run_in_executor(None, UseCases.sincronizar_banco, nome, dataset)
+                if linhas:
+                    logger.info(f"Dataset {nome} (versão {dataset.versao}) gravado no banco: {linhas} células")
+            except Exception as e:
+                logger.warning(f"Falha ao gravar o dataset {nome} no banco: {e}")
+        return dataset
 
     @staticmethod
-    def get_importacao(csv_url: str = "http://vitibrasil.cnpuv.embrapa.br/download/ImpVinhos.csv", sep: str = '\t', encoding: str = 'latin1') -> List[Dict]:
-        df = UseCases.fetch_data(csv_url, sep=sep, encoding=encoding)
-        json = UseCases.transformar_dataframe_em_json(df,3)
-        return json 
+    async def obter_dataset_por_nome(nome: str) -> EmbrapaDataset:
+        """Retorna um dos datasets de `DATASETS_EMBRAPA` a partir do cache."""
+        return await AsyncUseCases.obter_dataset(**DATASETS_EMBRAPA[nome])
+
+    @staticmethod
+    def dataset_em_cache(nome: str) -> Optional[EmbrapaDataset]:
+        """Cópia em cache de um dos datasets de `DATASETS_EMBRAPA`, sem baixar (None se ainda não carregado)."""
+        config = DATASETS_EMBRAPA[nome]
+        return dataset_cache.peek((config["csv_url"], config["sep"], config["encoding"]))
+
+    @staticmethod
+    async def mudancas_desde(nome: str, versao: str) -> Dict:
+        """
+        Mudanças de um dos datasets de `DATASETS_EMBRAPA` desde a `versao` informada.
+
+        Raises:
+            LookupError: A versão não está no histórico de mudanças (é preciso recarregar o dataset completo).
+        """
+        config = DATASETS_EMBRAPA[nome]
+        dataset = await AsyncUseCases.obter_dataset(**config)
+        atualizacoes = feed_mudancas.desde((config["csv_url"], config["sep"], config["encoding"]), versao, dataset.versao)
+        if atualizacoes is None:
+            raise LookupError(f"A versão '{versao}' não está no histórico de mudanças. Recarregue o dataset completo (versão atual: {dataset.versao}).")
+        return {"dataset": nome, "desde": versao, "versao": dataset.versao, "atualizacoes": atualizacoes}
 
     @staticmethod
-    def get_exportacao(csv_url: str = "http://vitibrasil.cnpuv.embrapa.br/download/ExpVinho.csv", sep: str = '\t', encoding: str = 'latin1') -> List[Dict]:
-        df = UseCases.fetch_data(csv_url, sep=sep, encoding=encoding)
-        json = UseCases.transformar_dataframe_em_json(df,3)
-        return json 
+    async def restaurar_snapshot(nome: str) -> Optional[EmbrapaDataset]:
+        """Carrega para o cache o snapshot em disco de um dos datasets de `DATASETS_EMBRAPA`."""
+        config = DATASETS_EMBRAPA[nome]
+        return await AsyncUseCases.executar(
+            UseCases.restaurar_snapshot, config["csv_url"], config["sep"], config["encoding"]
+        )
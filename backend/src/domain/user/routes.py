@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from domain.user import schemas
-from domain.user.use_cases import UserUseCases
-from infra.db.database import get_db
+from domain.user.use_cases import UserAsyncUseCases
+from core.settings import settings
+from infra.db.database import DbSession, get_session
 from utils.auth import AuthUtils, oauth2_scheme
 
 
@@ -21,43 +22,58 @@ def get_current_user_data(token: str = Depends(oauth2_scheme)):
     summary="Criar um novo usuário",
     description="Cria um novo usuário no sistema. Requer `username`, `email` e `password`. Retorna os dados do usuário criado."
 )
-def create_user(user: schemas.UserCreateRequestSchema, db: Session = Depends(get_db)):
+async def create_user(user: schemas.UserCreateRequestSchema, db: DbSession = Depends(get_session)):
     """
     Cria um novo usuário no banco de dados.
 
     - Verifica se o username ou email já estão cadastrados.
     - Retorna o usuário criado caso tenha sucesso.
     """
-    existing_user_username = UserUseCases.get_by_email_or_username(db, user.username) 
+    existing_user_username = await UserAsyncUseCases.get_by_email_or_username(db, user.username) 
     if existing_user_username is not None:
         raise HTTPException(
             status_code=409,
             detail="Username already registered"
         )
-    existing_user_email = UserUseCases.get_by_email_or_username(db, user.email) 
+    existing_user_email = await UserAsyncUseCases.get_by_email_or_username(db, user.email) 
     if existing_user_email is not None:
         raise HTTPException(
             status_code=409,
             detail="Email already registered"
         )
     
-    return UserUseCases.create(db, user)
+    return await UserAsyncUseCases.create(db, user)
 
 
 # 🚀 Get All Users
 @router.get(
     "/",
     response_model=list[schemas.UserCreateResponseSchema],
-    summary="Listar todos os usuários",
-    description="Retorna uma lista com todos os usuários cadastrados. Requer autenticação JWT."
+    summary="Listar usuários (paginado)",
+    description="Retorna os usuários em ordem de id, paginados por cursor (`after_id`/`limit`) e filtráveis por `user_type` e `is_active`. O cursor da próxima página vem no header `X-Next-Cursor`. Requer autenticação JWT."
 )
-def get_users(db: Session = Depends(get_db), token_data: dict = Depends(get_current_user_data)):
+async def get_users(
+    response: Response,
+    after_id: Optional[int] = Query(None, ge=0, description="Retorna usuários com id maior que este (valor do header `X-Next-Cursor`)."),
+    limit: int = Query(settings.USERS_PAGE_DEFAULT_LIMIT, ge=1, le=settings.USERS_PAGE_MAX_LIMIT, description="Quantidade máxima de usuários por página."),
+    user_type: Optional[schemas.UserTypeEnum] = Query(None, description="Filtra pelo tipo de usuário."),
+    is_active: Optional[bool] = Query(None, description="Filtra por usuários ativos/inativos."),
+    db: DbSession = Depends(get_session),
+    token_data: dict = Depends(get_current_user_data)
+):
     """
-    Lista todos os usuários cadastrados no sistema.
+    Lista os usuários cadastrados no sistema, uma página por vez.
+
+    Só as colunas da resposta são lidas do banco (sem `hashed_password`).
+    Enquanto houver mais usuários, o header `X-Next-Cursor` traz o `after_id`
+    da próxima página.
 
     Requer token de autenticação válido.
     """
-    return UserUseCases.get_all(db)
+    usuarios, proximo = await UserAsyncUseCases.get_page(db, after_id, limit, user_type, is_active)
+    if proximo is not None:
+        response.headers["X-Next-Cursor"] = str(proximo)
+    return usuarios
 
 
 # 🚀 Get User by ID
@@ -67,13 +83,13 @@ def get_users(db: Session = Depends(get_db), token_data: dict = Depends(get_curr
     summary="Obter usuário por ID",
     description="Retorna os dados de um usuário específico pelo seu ID. Requer autenticação JWT."
 )
-def get_user(user_id: int, db: Session = Depends(get_db), token_data: dict = Depends(get_current_user_data)):
+async def get_user(user_id: int, db: DbSession = Depends(get_session), token_data: dict = Depends(get_current_user_data)):
     """
     Retorna um único usuário com base no ID fornecido.
 
     Se o usuário não existir, retorna erro 404.
     """
-    user = UserUseCases.get_by_id(db, user_id)
+    user = await UserAsyncUseCases.get_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -86,10 +102,10 @@ def get_user(user_id: int, db: Session = Depends(get_db), token_data: dict = Dep
     summary="Atualizar um usuário",
     description="Atualiza os dados de um usuário existente com base no ID. Requer autenticação JWT."
 )
-def update_user(
+async def update_user(
     user_id: int,
     user_update: schemas.UserUpdateRequestSchema,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
     token_data: dict = Depends(get_current_user_data)
 ):
     """
@@ -97,7 +113,7 @@ def update_user(
 
     Requer token de autenticação válido.
     """
-    user = UserUseCases.update(db, user_id, user_update)
+    user = await UserAsyncUseCases.update(db, user_id, user_update)
     return user
 
 
@@ -107,13 +123,13 @@ def update_user(
     summary="Deletar um usuário",
     description="Remove um usuário do sistema com base no ID fornecido. Requer autenticação JWT."
 )
-def delete_user(user_id: int, db: Session = Depends(get_db), token_data: dict = Depends(get_current_user_data)):
+async def delete_user(user_id: int, db: DbSession = Depends(get_session), token_data: dict = Depends(get_current_user_data)):
     """
     Deleta um usuário pelo seu ID.
 
     Se o usuário não for encontrado, retorna erro 404.
     """
-    success = UserUseCases.delete(db, user_id)
+    success = await UserAsyncUseCases.delete(db, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": f"User {user_id} deleted successfully"}
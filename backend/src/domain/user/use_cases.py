@@ -1,9 +1,21 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from infra.db.database import DbSession
 from infra.db.models import User
 from domain.user import  schemas
 from utils.auth import AuthUtils
 from datetime import timedelta
 
+# Colunas de `UserCreateResponseSchema`: a listagem não carrega as demais (ex: hashed_password)
+COLUNAS_LISTAGEM = (User.id, User.username, User.email, User.is_active, User.user_type)
+
+# Linhas buscadas por vez no cursor do banco (server-side no Postgres)
+LOTE_CURSOR = 100
+
 
 class UserUseCases:
 
@@ -38,8 +50,50 @@ class UserUseCases:
         ).first()
 
     @staticmethod
-    def get_all(db: Session):
-        return db.query(User).all()
+    def consulta_pagina(
+        after_id: Optional[int],
+        limit: int,
+        user_type: Optional[schemas.UserTypeEnum] = None,
+        is_active: Optional[bool] = None,
+    ) -> Select:
+        """
+        SELECT de uma página da listagem: só as colunas da resposta, em ordem de
+        id, a partir de `after_id` (keyset). Busca `limit + 1` linhas para saber
+        se existe uma próxima página.
+        """
+        consulta = select(*COLUNAS_LISTAGEM)
+        if after_id is not None:
+            consulta = consulta.where(User.id > after_id)
+        if user_type is not None:
+            consulta = consulta.where(User.user_type == user_type)
+        if is_active is not None:
+            consulta = consulta.where(User.is_active == is_active)
+        return consulta.order_by(User.id).limit(limit + 1).execution_options(yield_per=LOTE_CURSOR)
+
+    @staticmethod
+    def montar_pagina(linhas, limit: int) -> Tuple[List[schemas.UserCreateResponseSchema], Optional[int]]:
+        """Converte as linhas na página e no cursor da próxima (id do último usuário, ou None)."""
+        pagina = [schemas.UserCreateResponseSchema(**linha._mapping) for linha in linhas[:limit]]
+        proximo = pagina[-1].id if len(linhas) > limit else None
+        return pagina, proximo
+
+    @staticmethod
+    def get_page(
+        db: Session,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        user_type: Optional[schemas.UserTypeEnum] = None,
+        is_active: Optional[bool] = None,
+    ) -> Tuple[List[schemas.UserCreateResponseSchema], Optional[int]]:
+        """
+        Uma página de usuários ordenada por id, com filtros opcionais.
+
+        Returns:
+            Tuple[List[UserCreateResponseSchema], Optional[int]]: Usuários da página e
+            o `after_id` da próxima página (None na última).
+        """
+        resultado = db.execute(UserUseCases.consulta_pagina(after_id, limit, user_type, is_active))
+        return UserUseCases.montar_pagina(list(resultado), limit)
 
     @staticmethod
     def delete(db: Session, user_id: int):
@@ -80,4 +134,105 @@ class UserUseCases:
         )
 
 
+class UserAsyncUseCases:
+    """
+    Versões assíncronas dos casos de uso de usuários.
+
+    Com uma `AsyncSession` (DB_ASYNC_ENABLED) as consultas usam o driver
+    assíncrono; com uma `Session` síncrona, delegam para `UserUseCases` no
+    threadpool, sem bloquear o event loop.
+    """
+
+    @staticmethod
+    async def _sincrono(funcao, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, funcao, *args)
+
+    @staticmethod
+    def _resposta(user: User) -> schemas.UserCreateResponseSchema:
+        return schemas.UserCreateResponseSchema(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=user.is_active,
+            user_type=user.user_type
+        )
+
+    @staticmethod
+    async def create(db: DbSession, request_schema: schemas.UserCreateRequestSchema) -> schemas.UserCreateResponseSchema:
+        if not isinstance(db, AsyncSession):
+            return await UserAsyncUseCases._sincrono(UserUseCases.create, db, request_schema)
+        hashed_password = await AuthUtils.aget_password_hash(request_schema.password)
+        user = User(
+            username=request_schema.username,
+            email=request_schema.email,
+            hashed_password=hashed_password,
+            user_type=schemas.UserTypeEnum.USER
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return UserAsyncUseCases._resposta(user)
+
+    @staticmethod
+    async def get_by_id(db: DbSession, user_id: int):
+        if not isinstance(db, AsyncSession):
+            return await UserAsyncUseCases._sincrono(UserUseCases.get_by_id, db, user_id)
+        return await db.get(User, user_id)
+
+    @staticmethod
+    async def get_by_email_or_username(db: DbSession, email_or_username: str):
+        if not isinstance(db, AsyncSession):
+            return await UserAsyncUseCases._sincrono(UserUseCases.get_by_email_or_username, db, email_or_username)
+        resultado = await db.execute(
+            select(User).where(or_(User.email == email_or_username, User.username == email_or_username)).limit(1)
+        )
+        return resultado.scalars().first()
+
+    @staticmethod
+    async def get_page(
+        db: DbSession,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        user_type: Optional[schemas.UserTypeEnum] = None,
+        is_active: Optional[bool] = None,
+    ) -> Tuple[List[schemas.UserCreateResponseSchema], Optional[int]]:
+        if not isinstance(db, AsyncSession):
+            return await UserAsyncUseCases._sincrono(UserUseCases.get_page, db, after_id, limit, user_type, is_active)
+        resultado = await db.stream(UserUseCases.consulta_pagina(after_id, limit, user_type, is_active))
+        linhas = [linha async for linha in resultado]
+        return UserUseCases.montar_pagina(linhas, limit)
+
+    @staticmethod
+    async def delete(db: DbSession, user_id: int):
+        if not isinstance(db, AsyncSession):
+            return await UserAsyncUseCases._sincrono(UserUseCases.delete, db, user_id)
+        user = await db.get(User, user_id)
+        if user:
+            await db.delete(user)
+            await db.commit()
+            return True
+        return False
+
+    @staticmethod
+    async def update(db: DbSession, user_id: int, update_data: schemas.UserUpdateRequestSchema):
+        if not isinstance(db, AsyncSession):
+            return await UserAsyncUseCases._sincrono(UserUseCases.update, db, user_id, update_data)
+        user = await db.get(User, user_id)
+        if not user:
+            raise Exception("User not found")
+
+        if update_data.username:
+            user.username = update_data.username
+        if update_data.email:
+            user.email = update_data.email
+        if update_data.password:
+            user.hashed_password = await AuthUtils.aget_password_hash(update_data.password)
+        if update_data.is_active is not None:
+            user.is_active = update_data.is_active
+        if update_data.user_type:
+            user.user_type = update_data.user_type
 
+        await db.commit()
+        await db.refresh(user)
+        return UserAsyncUseCases._resposta(user)
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from core.logger_config import logger
+from infra.cache.single_flight import SingleFlight
+
+
+class _CacheEntry:
+    __slots__ = ("value", "loaded_at", "refreshing")
+
+    def __init__(self, value: Any, loaded_at: float):
+        self.value = value
+        self.loaded_at = loaded_at
+        self.refreshing = False
+
+
+class DatasetCache:
+    """
+    Cache em memória para os datasets baixados da Embrapa.
+
+    - Cada entrada expira após `ttl_seconds`.
+    - O número de entradas é limitado por `max_entries` (evicção LRU).
+    - Entradas expiradas continuam sendo servidas (stale-while-revalidate)
+      enquanto uma atualização roda em background, então apenas o primeiro
+      acesso a uma chave (cache frio) espera pelo upstream.
+    - Carregamentos concorrentes da mesma chave (cache frio, atualização em
+      background ou forçada) são agrupados em um único download/transformação (single-flight).
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._flight = SingleFlight()
+
+    async def aget(self, key: Hashable, loader: Callable[[Optional[Any]], Awaitable[Any]]) -> Any:
+        """
+        Retorna o valor da chave, carregando-o com `loader` se necessário.
+
+        Args:
+            key (Hashable): Chave do dataset (ex: (url, sep, encoding)).
+            loader (Callable): Corrotina que baixa e monta o valor. Recebe a cópia
+                atual (ou None no cache frio) e pode devolvê-la se nada mudou.
+
+        Returns:
+            Any: Valor em cache (possivelmente expirado, enquanto é atualizado
+            por uma task no event loop).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if self._is_stale(entry) and not entry.refreshing:
+                    entry.refreshing = True
+                    task = asyncio.get_running_loop().create_task(self._arefresh(key, loader))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return entry.value
+
+        # Cache frio: o primeiro acesso espera o carregamento; acessos simultâneos esperam o mesmo
+        return await self._flight.ado(key, lambda: self._aload(key, loader, cold=True))
+
+    async def arefresh(self, key: Hashable, loader: Callable[[Optional[Any]], Awaitable[Any]]) -> Any:
+        """
+        Força a atualização de uma chave, mesmo que ainda não tenha expirado.
+
+        Usado pelo agendador de ingestão. Erros são propagados ao chamador e a
+        cópia atual (se houver) continua no cache. Se já houver um carregamento
+        da chave em andamento, aproveita o resultado dele.
+        """
+        return await self._flight.ado(key, lambda: self._aload(key, loader))
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Valor atual da chave (mesmo expirado) sem carregar nem disparar atualização; None se ausente."""
+        return self._previous(key)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insere ou substitui o valor de uma chave (ex: restaurado de um snapshot)."""
+        self._store(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna um resumo do estado do cache."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "stale": sum(1 for e in self._entries.values() if now - e.loaded_at >= self.ttl_seconds),
+                "refreshing": sum(1 for e in self._entries.values() if e.refreshing),
+                "in_flight": self._flight.in_flight(),
+                "coalesced": self._flight.coalesced,
+            }
+
+    def _is_stale(self, entry: _CacheEntry) -> bool:
+        return time.monotonic() - entry.loaded_at >= self.ttl_seconds
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _previous(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def _refresh_failed(self, key: Hashable, error: Exception) -> None:
+        # Mantém a cópia antiga; a próxima requisição tentará de novo
+        logger.warning(f"Falha ao atualizar o dataset {key} em background: {error}")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refreshing = False
+
+    def _fresh(self, key: Hashable) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry if entry is not None and not self._is_stale(entry) else None
+
+    async def _aload(self, key: Hashable, loader: Callable[[Optional[Any]], Awaitable[Any]], cold: bool = False) -> Any:
+        # Outro chamador pode ter carregado a chave entre a consulta ao cache e a entrada no single-flight
+        entry = self._fresh(key) if cold else None
+        if entry is not None:
+            return entry.value
+        value = await loader(self._previous(key))
+        self._store(key, value)
+        return value
+
+    async def _arefresh(self, key: Hashable, loader: Callable[[Optional[Any]], Awaitable[Any]]) -> None:
+        try:
+            await self._flight.ado(key, lambda: self._aload(key, loader))
+        except Exception as e:
+            self._refresh_failed(key, e)
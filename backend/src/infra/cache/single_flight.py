@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução.
+
+    O primeiro chamador (líder) executa a função; os demais esperam o mesmo
+    resultado (ou a mesma exceção). O resultado não é guardado: assim que a
+    execução termina, a próxima chamada com a chave executa de novo.
+
+    A corrotina do líder roda em uma task própria e o resultado é entregue por
+    um `concurrent.futures.Future`, esperado via `asyncio.wrap_future`.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self.coalesced = 0
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa a corrotina de `fn` (ou espera a execução em andamento da mesma chave).
+
+        A corrotina do líder roda em uma task própria, então o cancelamento de um
+        chamador não cancela a execução compartilhada.
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._tasks.add(task)
+            task.add_done_callback(lambda t: self._task_done(key, future, t))
+        # shield: cancelar a espera de um chamador não cancela o Future compartilhado
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, value: Any = None, error: BaseException = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _task_done(self, key: Hashable, future: Future, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, value=task.result())
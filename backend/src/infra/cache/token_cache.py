@@ -0,0 +1,76 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class VerifiedTokenCache:
+    """
+    Cache LRU de tokens JWT já verificados (assinatura e claims).
+
+    - A chave é o SHA-256 do token, então o token em si não fica em memória.
+    - Cada entrada vale até o `exp` do próprio token; depois disso é descartada
+      e o token volta a passar pela verificação completa (que o rejeita).
+      Tokens sem `exp` não são guardados.
+    - O número de entradas é limitado por `max_entries` (evicção LRU).
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Payload do token, se já verificado e ainda não expirado (cópia rasa); senão None."""
+        chave = self._digest(token)
+        with self._lock:
+            entrada = self._entries.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            payload, exp = entrada
+            if time.time() >= exp:
+                del self._entries[chave]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(chave)
+            self.hits += 1
+        return dict(payload)
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Guarda o payload de um token que acabou de passar pela verificação completa."""
+        exp = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        chave = self._digest(token)
+        with self._lock:
+            self._entries[chave] = (dict(payload), float(exp))
+            self._entries.move_to_end(chave)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna um resumo do estado do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
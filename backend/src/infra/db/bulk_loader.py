@@ -0,0 +1,155 @@
+import hashlib
+import io
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import and_, bindparam, delete, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from infra.db.database import engine as default_engine
+from infra.db.models import EmbrapaCarga, EmbrapaSerie
+
+# Colunas gravadas em embrapa_series (na ordem do COPY)
+COLUNAS_SERIE = ["dataset", "categoria", "chave", "ocorrencia", "ano", "medida", "valor"]
+
+# Colunas que identificam uma célula (a categoria e a medida podem ser nulas)
+CHAVE_SERIE = ["dataset", "categoria", "chave", "ocorrencia", "ano", "medida"]
+
+
+class SeriesBulkLoader:
+    """
+    Carga em massa das séries da Embrapa na tabela `embrapa_series`.
+
+    Cada carga substitui, numa única transação, todas as linhas do dataset:
+    no Postgres via `COPY ... FROM STDIN` e nos demais bancos via `executemany`
+    em lotes de `batch_size` linhas. A versão carregada é registrada em
+    `embrapa_cargas` na mesma transação, o que permite pular cargas de uma
+    versão que já está no banco.
+
+    Quando a versão anterior já está no banco e as mudanças entre as versões são
+    conhecidas, `aplicar_mudancas` grava só as células alteradas (update, insert
+    e delete pela chave da célula), sem recarregar o dataset.
+
+    As transações começam travando o dataset (advisory lock no Postgres; nos demais
+    bancos vale a serialização das escritas do próprio banco) e conferindo a
+    versão de novo: workers ou réplicas carregando a mesma versão ao mesmo
+    tempo não duplicam linhas, o segundo apenas pula a carga.
+    """
+
+    def __init__(self, engine: Engine = default_engine, batch_size: int = 5000):
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def versao_carregada(self, dataset: str) -> Optional[str]:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(EmbrapaCarga.versao).where(EmbrapaCarga.dataset == dataset)
+            ).scalar_one_or_none()
+
+    def carregar(self, dataset: str, versao: str, series: pd.DataFrame) -> int:
+        """
+        Substitui as séries de `dataset` pelas linhas de `series`.
+
+        Args:
+            dataset (str): Nome do dataset (ex: producao).
+            versao (str): Versão (hash do conteúdo) que está sendo carregada.
+            series (pd.DataFrame): Formato longo com as colunas de `COLUNAS_SERIE` (exceto `dataset`).
+
+        Returns:
+            int: Quantidade de linhas gravadas (0 se a versão já estava no banco).
+        """
+        series = series.assign(dataset=dataset)[COLUNAS_SERIE]
+        with self.engine.begin() as conn:
+            if self._travar(conn, dataset) == versao:
+                return 0
+            conn.execute(delete(EmbrapaSerie).where(EmbrapaSerie.dataset == dataset))
+            if conn.dialect.name == "postgresql":
+                self._copy(conn, series)
+            else:
+                self._executemany(conn, series)
+            conn.execute(delete(EmbrapaCarga).where(EmbrapaCarga.dataset == dataset))
+            conn.execute(insert(EmbrapaCarga).values(dataset=dataset, versao=versao, linhas=len(series)))
+        return len(series)
+
+    def aplicar_mudancas(self, dataset: str, versao_anterior: str, atualizacoes: List[Dict]) -> Optional[int]:
+        """
+        Aplica ao banco as mudanças entre `versao_anterior` e a última versão de
+        `atualizacoes` (entradas do feed de mudanças, da mais antiga para a mais recente).
+
+        Returns:
+            Optional[int]: Células gravadas (0 se a versão final já estava no banco), ou
+            None se o banco não está em `versao_anterior` (é preciso usar `carregar`).
+        """
+        versao = atualizacoes[-1]["versao"]
+        with self.engine.begin() as conn:
+            carregada = self._travar(conn, dataset)
+            if carregada == versao:
+                return 0
+            if carregada != versao_anterior:
+                return None
+            alteradas, saldo = 0, 0
+            # Uma atualização por vez: dentro de cada uma, cada célula aparece uma única vez
+            for atualizacao in atualizacoes:
+                por_tipo: Dict[str, List[Dict]] = {"insercao": [], "atualizacao": [], "remocao": []}
+                for mudanca in atualizacao["mudancas"]:
+                    parametros = {f"b_{coluna}": mudanca.get(coluna) for coluna in CHAVE_SERIE[1:]}
+                    parametros["b_dataset"] = dataset
+                    parametros["b_valor"] = mudanca["atual"]
+                    por_tipo[mudanca["tipo"]].append(parametros)
+                if por_tipo["remocao"]:
+                    conn.execute(delete(EmbrapaSerie).where(self._filtro_celula()), por_tipo["remocao"])
+                if por_tipo["atualizacao"]:
+                    conn.execute(
+                        update(EmbrapaSerie).where(self._filtro_celula()).values(valor=bindparam("b_valor")),
+                        por_tipo["atualizacao"],
+                    )
+                if por_tipo["insercao"]:
+                    registros = [{coluna: p[f"b_{coluna}"] for coluna in COLUNAS_SERIE} for p in por_tipo["insercao"]]
+                    for inicio in range(0, len(registros), self.batch_size):
+                        conn.execute(insert(EmbrapaSerie), registros[inicio:inicio + self.batch_size])
+                alteradas += sum(len(lista) for lista in por_tipo.values())
+                saldo += len(por_tipo["insercao"]) - len(por_tipo["remocao"])
+            conn.execute(
+                update(EmbrapaCarga)
+                .where(EmbrapaCarga.dataset == dataset)
+                .values(versao=versao, linhas=EmbrapaCarga.linhas + saldo)
+            )
+        return alteradas
+
+    @staticmethod
+    def _filtro_celula():
+        """WHERE de uma célula pelos parâmetros `b_<coluna>` (comparação que aceita nulos)."""
+        return and_(*(
+            getattr(EmbrapaSerie, coluna).is_not_distinct_from(bindparam(f"b_{coluna}"))
+            if coluna in ("categoria", "medida") else getattr(EmbrapaSerie, coluna) == bindparam(f"b_{coluna}")
+            for coluna in CHAVE_SERIE
+        ))
+
+    @staticmethod
+    def _travar(conn: Connection, dataset: str) -> Optional[str]:
+        """Trava o dataset até o fim da transação e retorna a versão carregada no banco."""
+        if conn.dialect.name == "postgresql":
+            # hash() do Python muda entre processos: a chave da trava precisa ser estável
+            chave = int.from_bytes(hashlib.sha256(dataset.encode("utf-8")).digest()[:8], "big", signed=True)
+            conn.execute(text("SELECT pg_advisory_xact_lock(:chave)"), {"chave": chave})
+        return conn.execute(
+            select(EmbrapaCarga.versao).where(EmbrapaCarga.dataset == dataset)
+        ).scalar_one_or_none()
+
+    def _copy(self, conn: Connection, series: pd.DataFrame) -> None:
+        """COPY em CSV pela conexão DBAPI (psycopg2), na mesma transação da conexão SQLAlchemy."""
+        buffer = io.StringIO()
+        series.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        with conn.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {EmbrapaSerie.__tablename__} ({', '.join(COLUNAS_SERIE)}) "
+                "FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (chave))",
+                buffer,
+            )
+
+    def _executemany(self, conn: Connection, series: pd.DataFrame) -> None:
+        # None no lugar de NaN, para gravar NULL nas colunas opcionais
+        registros = series.astype(object).where(series.notna(), None).to_dict("records")
+        for inicio in range(0, len(registros), self.batch_size):
+            conn.execute(insert(EmbrapaSerie), registros[inicio:inicio + self.batch_size])
@@ -1,27 +1,85 @@
+from typing import AsyncIterator, Optional, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from core.settings import settings
 from sqlalchemy.exc import OperationalError
 
 Base = declarative_base()
 
+# Driver assíncrono de cada banco suportado (extra `async` do projeto)
+DRIVERS_ASSINCRONOS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def montar_url(assincrona: bool = False) -> str:
+    """URL do banco a partir das settings; com `assincrona=True`, usa o driver asyncio do banco."""
+    dialeto = settings.DB_DRIVERNAME.split("+")[0]
+    drivername = settings.DB_DRIVERNAME
+    if assincrona:
+        if dialeto not in DRIVERS_ASSINCRONOS:
+            raise RuntimeError(f"Sem driver assíncrono para o banco '{dialeto}'.")
+        drivername = f"{dialeto}+{DRIVERS_ASSINCRONOS[dialeto]}"
+    if dialeto == "sqlite":
+        return f"{drivername}:///{settings.DB_DATABASENAME}"
+    return (
+        f"{drivername}://{settings.DB_USER}:{settings.DB_PASSWORD}"
+        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_DATABASENAME}"
+    )
+
+
+def opcoes_pool() -> dict:
+    """Parâmetros do pool de conexões (iguais nos engines síncrono e assíncrono)."""
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
 # Construção condicional da URL do banco
+DATABASE_URL = montar_url()
 if settings.DB_DRIVERNAME == "sqlite":
-    DATABASE_URL = f"sqlite:///{settings.DB_DATABASENAME}"
     connect_args = {"check_same_thread": False}
 else:
-    DATABASE_URL = (
-        f"{settings.DB_DRIVERNAME}://{settings.DB_USER}:{settings.DB_PASSWORD}"
-        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_DATABASENAME}"
-    )
     connect_args = {}
 
 # Criação do engine
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **opcoes_pool())
 
 # Criação do session maker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono: criado no primeiro uso, para que asyncpg/aiosqlite só sejam
+# exigidos quando DB_ASYNC_ENABLED estiver ligado
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        try:
+            _async_engine = create_async_engine(montar_url(assincrona=True), **opcoes_pool())
+        except ImportError as e:
+            raise RuntimeError(
+                f"DB_ASYNC_ENABLED requer o driver assíncrono do banco (asyncpg ou aiosqlite): {e}"
+            ) from e
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Fecha as conexões do engine assíncrono, se ele foi criado (shutdown da aplicação)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
+
+
 # Função de dependência para uso com FastAPI ou manual
 def get_db() -> Session:
     db = SessionLocal()
@@ -29,3 +87,15 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependência das rotas de usuários e auth: sessão assíncrona ou síncrona, conforme DB_ASYNC_ENABLED
+get_session = get_async_db if settings.DB_ASYNC_ENABLED else get_db
+
+DbSession = Union[AsyncSession, Session]
@@ -9,6 +9,9 @@ def create_database():
     """Cria todas as tabelas do banco de dados."""
     try:
         Base.metadata.create_all(bind=engine)
+        # create_all não altera tabelas existentes: cria os índices adicionados depois
+        for indice in User.__table__.indexes:
+            indice.create(bind=engine, checkfirst=True)
         print("✅ Banco de dados verificado/criado")
     except OperationalError as e:
         print(f"❌ Erro ao conectar/criar banco: {e}")
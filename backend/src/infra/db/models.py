@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, func, Boolean, JSON, ARRAY, Text
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Float, DateTime, func, Boolean, JSON, ARRAY, Text, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Enum as SQLAlchemyEnum
@@ -22,4 +22,40 @@ class User(Base):
     created_at = Column(DateTime, default=func.now(), comment="Account creation date")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment="Last update timestamp")
 
+    # Listagem paginada por id (keyset) com filtros por tipo e/ou situação
+    __table_args__ = (
+        Index("ix_users_user_type_is_active_id", "user_type", "is_active", "id"),
+        Index("ix_users_is_active_id", "is_active", "id"),
+    )
 
+
+class EmbrapaSerie(Base):
+    """
+    Séries da Embrapa em formato longo: uma linha por célula com valor, identificada
+    por (dataset, categoria, chave, ocorrencia, ano, medida).
+    """
+    __tablename__ = "embrapa_series"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    dataset = Column(String, nullable=False, comment="Dataset name (producao, importacao, ...)")
+    categoria = Column(String, nullable=True, comment="Category key (control column), when present")
+    chave = Column(String, nullable=False, comment="Main key: product or country")
+    ocorrencia = Column(Integer, nullable=False, comment="Occurrence of the (categoria, chave) pair in the CSV, for repeated rows")
+    ano = Column(Integer, nullable=False, comment="Year")
+    medida = Column(String, nullable=True, comment="quantidade/valor for datasets with two columns per year")
+    valor = Column(Float, nullable=False, comment="Value")
+
+    __table_args__ = (
+        Index("ix_embrapa_series_dataset_ano", "dataset", "ano"),
+        Index("ix_embrapa_series_dataset_chave_ano", "dataset", "chave", "ano"),
+    )
+
+
+class EmbrapaCarga(Base):
+    """Versão de cada dataset carregada em embrapa_series."""
+    __tablename__ = "embrapa_cargas"
+
+    dataset = Column(String, primary_key=True, comment="Dataset name")
+    versao = Column(String, nullable=False, comment="Content hash of the loaded version")
+    linhas = Column(Integer, nullable=False, comment="Number of rows loaded")
+    carregado_em = Column(DateTime, default=func.now(), onupdate=func.now(), comment="Load timestamp")
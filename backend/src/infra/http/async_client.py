@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+
+@dataclass
+class FetchResult:
+    """Resultado de um download: o conteúdo, ou `not_modified=True` em caso de 304."""
+    content: Optional[bytes]
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class AsyncConditionalFetcher:
+    """
+    Faz o download de arquivos com uma única requisição HTTP por atualização.
+
+    Guarda o `ETag` e o `Last-Modified` do último download de cada URL e, quando
+    `conditional=True`, envia `If-None-Match`/`If-Modified-Since`. Se o servidor
+    responder 304, nenhum corpo é transferido e o chamador reaproveita a cópia
+    que já possui.
+
+    Usa um único `httpx.AsyncClient` com pool de conexões keep-alive,
+    aberto e fechado pelo `lifespan` da aplicação.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        connect_timeout: float = 3,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._validators: Dict[str, Dict[str, str]] = {}
+
+    async def open(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Cliente HTTP assíncrono não foi aberto. Verifique o lifespan da aplicação.")
+        return self._client
+
+    async def fetch(self, url: str, conditional: bool = False) -> FetchResult:
+        headers = {}
+        if conditional:
+            validators = self._validators.get(url, {})
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = await self.client.get(url, headers=headers)
+        if response.status_code == 304:
+            return FetchResult(
+                content=None,
+                not_modified=True,
+                etag=headers.get("If-None-Match"),
+                last_modified=headers.get("If-Modified-Since"),
+            )
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        self._validators[url] = {"etag": etag, "last_modified": last_modified}
+        return FetchResult(content=response.content, etag=etag, last_modified=last_modified)
+
+    def validators(self, url: str) -> Dict[str, Optional[str]]:
+        """Retorna o ETag/Last-Modified do último download da URL."""
+        return dict(self._validators.get(url, {}))
+
+    def seed(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Restaura validadores salvos (ex: de um snapshot), sem fazer download."""
+        self._validators[url] = {"etag": etag, "last_modified": last_modified}
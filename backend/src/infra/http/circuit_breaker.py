@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Any, Dict
+
+
+class CircuitoAbertoError(Exception):
+    """O circuito está aberto: o upstream não é chamado até o fim do intervalo de espera."""
+
+    def __init__(self, mensagem: str, retry_after: float):
+        super().__init__(mensagem)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para um upstream.
+
+    - fechado: as chamadas passam; após `failure_threshold` falhas consecutivas o circuito abre.
+    - aberto: as chamadas falham imediatamente com `CircuitoAbertoError` durante
+      o intervalo de espera, que começa em `reset_timeout` e é multiplicado por
+      `backoff_factor` a cada nova abertura (até `max_reset_timeout`). Falhas de
+      chamadas que já estavam em andamento quando o circuito abriu são ignoradas.
+    - meio-aberto: terminado o intervalo, uma única chamada de teste é liberada;
+      se der certo o circuito fecha, senão volta a abrir com o intervalo maior.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio-aberto"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        max_reset_timeout: float = 600,
+        backoff_factor: float = 2.0,
+        nome: str = "upstream",
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.backoff_factor = backoff_factor
+        self.nome = nome
+        self._estado = self.FECHADO
+        self._falhas = 0
+        self._aberturas = 0
+        self._aberto_ate = 0.0
+        self._sonda_desde = None
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            return self._estado
+
+    @property
+    def fechado(self) -> bool:
+        return self.estado == self.FECHADO
+
+    def permitir(self) -> None:
+        """
+        Verifica se a chamada pode ir ao upstream.
+
+        Raises:
+            CircuitoAbertoError: Circuito aberto, ou meio-aberto com a chamada de teste em andamento.
+        """
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return
+            agora = time.monotonic()
+            if self._estado == self.ABERTO:
+                if agora < self._aberto_ate:
+                    raise CircuitoAbertoError(
+                        f"{self.nome} indisponível; nova tentativa em {self._aberto_ate - agora:.0f}s.",
+                        retry_after=self._aberto_ate - agora,
+                    )
+                self._estado = self.MEIO_ABERTO
+                self._sonda_desde = None
+            # Meio-aberto: libera uma chamada de teste (ou outra, se a anterior nunca respondeu)
+            if self._sonda_desde is not None and agora - self._sonda_desde < self.reset_timeout:
+                raise CircuitoAbertoError(
+                    f"{self.nome} em teste após indisponibilidade; tente novamente em instantes.",
+                    retry_after=1,
+                )
+            self._sonda_desde = agora
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self._estado = self.FECHADO
+            self._falhas = 0
+            self._aberturas = 0
+            self._sonda_desde = None
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            if self._estado == self.ABERTO:
+                # Chamada que já estava em andamento quando o circuito abriu: não
+                # reagenda a espera nem conta como nova abertura
+                return
+            self._falhas += 1
+            if self._estado == self.MEIO_ABERTO or self._falhas >= self.failure_threshold:
+                espera = min(self.reset_timeout * self.backoff_factor ** self._aberturas, self.max_reset_timeout)
+                self._aberturas += 1
+                self._aberto_ate = time.monotonic() + espera
+                self._estado = self.ABERTO
+                self._sonda_desde = None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "estado": self._estado,
+                "falhas_consecutivas": self._falhas,
+                "aberturas_consecutivas": self._aberturas,
+                "retry_after": max(self._aberto_ate - time.monotonic(), 0) if self._estado == self.ABERTO else 0,
+            }
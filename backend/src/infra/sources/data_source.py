@@ -0,0 +1,167 @@
+import asyncio
+from abc import ABC, abstractmethod
+import os
+import tempfile
+import threading
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from infra.http.async_client import AsyncConditionalFetcher, FetchResult
+
+
+class DataSource(ABC):
+    """
+    Origem dos arquivos CSV da Embrapa.
+
+    `afetch` devolve um `FetchResult` (conteúdo ou `not_modified`) e
+    mantêm os validadores (ETag/Last-Modified) de cada URL, usados nos
+    downloads condicionais e gravados nos snapshots.
+    """
+
+    async def open(self) -> None:
+        """Abre os recursos da origem (chamado no startup da aplicação)."""
+
+    async def close(self) -> None:
+        """Libera os recursos da origem (chamado no shutdown da aplicação)."""
+
+    @abstractmethod
+    async def afetch(self, url: str, conditional: bool = False) -> FetchResult:
+        """Obtém o arquivo de `url`; com `conditional=True`, usa os validadores guardados."""
+
+    @abstractmethod
+    def validators(self, url: str) -> Dict[str, Optional[str]]:
+        """ETag/Last-Modified conhecidos de `url`."""
+
+    @abstractmethod
+    def seed(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Restaura os validadores de `url` (ex: a partir de um snapshot)."""
+
+
+def nome_arquivo(url: str) -> str:
+    """Nome do arquivo de uma URL (ex: .../download/Producao.csv -> Producao.csv)."""
+    nome = os.path.basename(urlparse(url).path)
+    if not nome:
+        raise ValueError(f"Não foi possível obter o nome do arquivo da URL {url}.")
+    return nome
+
+
+class HttpDataSource(DataSource):
+    """Baixa os arquivos do site da Embrapa (cliente assíncrono com GET condicional)."""
+
+    def __init__(self, async_fetcher: AsyncConditionalFetcher):
+        self.async_fetcher = async_fetcher
+
+    async def open(self) -> None:
+        await self.async_fetcher.open()
+
+    async def close(self) -> None:
+        await self.async_fetcher.close()
+
+    async def afetch(self, url: str, conditional: bool = False) -> FetchResult:
+        return await self.async_fetcher.fetch(url, conditional=conditional)
+
+    def validators(self, url: str) -> Dict[str, Optional[str]]:
+        return self.async_fetcher.validators(url)
+
+    def seed(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.async_fetcher.seed(url, etag, last_modified)
+
+
+class LocalDirectoryDataSource(DataSource):
+    """
+    Lê os CSVs de um diretório local, pelo nome do arquivo da URL
+    (ex: `Producao.csv`), sem acesso à rede.
+
+    Os bytes são entregues como estão no disco, então o parse continua
+    tratando encoding (latin1) e separador (`;`/`\\t`) como no upstream.
+    O ETag é derivado do tamanho e do mtime do arquivo, o que permite GETs
+    "condicionais" (arquivo não alterado = 304) e benchmarks determinísticos.
+    O conteúdo lido fica em memória até o arquivo mudar.
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._conteudos: Dict[str, Tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def caminho(self, url: str) -> str:
+        return os.path.join(self.base_dir, nome_arquivo(url))
+
+    def _ler(self, url: str, conditional: bool) -> FetchResult:
+        caminho = self.caminho(url)
+        info = os.stat(caminho)  # FileNotFoundError se o arquivo não existir
+        etag = f'"{info.st_size:x}-{info.st_mtime_ns:x}"'
+        last_modified = formatdate(info.st_mtime, usegmt=True)
+
+        with self._lock:
+            anterior = self._validators.get(url, {})
+            if conditional and anterior.get("etag") == etag:
+                return FetchResult(content=None, not_modified=True, etag=etag, last_modified=last_modified)
+            em_memoria = self._conteudos.get(caminho)
+
+        if em_memoria is not None and em_memoria[0] == etag:
+            conteudo = em_memoria[1]
+        else:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+
+        with self._lock:
+            self._conteudos[caminho] = (etag, conteudo)
+            self._validators[url] = {"etag": etag, "last_modified": last_modified}
+        return FetchResult(content=conteudo, etag=etag, last_modified=last_modified)
+
+    async def afetch(self, url: str, conditional: bool = False) -> FetchResult:
+        # Leitura de disco fora do event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._ler, url, conditional)
+
+    def validators(self, url: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            return dict(self._validators.get(url, {}))
+
+    def seed(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        with self._lock:
+            self._validators[url] = {"etag": etag, "last_modified": last_modified}
+
+
+class RecordingDataSource(DataSource):
+    """
+    Repassa as chamadas para outra origem (normalmente HTTP) e grava cada arquivo
+    baixado em `base_dir`, no formato lido pelo `LocalDirectoryDataSource`
+    (record/replay: grava uma vez com rede e reproduz depois sem rede).
+    """
+
+    def __init__(self, origem: DataSource, base_dir: str):
+        self.origem = origem
+        self.base_dir = base_dir
+
+    async def open(self) -> None:
+        await self.origem.open()
+
+    async def close(self) -> None:
+        await self.origem.close()
+
+    async def afetch(self, url: str, conditional: bool = False) -> FetchResult:
+        resultado = await self.origem.afetch(url, conditional=conditional)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._gravar, url, resultado)
+        return resultado
+
+    def validators(self, url: str) -> Dict[str, Optional[str]]:
+        return self.origem.validators(url)
+
+    def seed(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.origem.seed(url, etag, last_modified)
+
+    def _gravar(self, url: str, resultado: FetchResult) -> None:
+        if resultado.not_modified or resultado.content is None:
+            return
+        os.makedirs(self.base_dir, exist_ok=True)
+        # Grava em arquivo temporário e renomeia, para nunca deixar um CSV pela metade
+        fd, temporario = tempfile.mkstemp(dir=self.base_dir, prefix=".gravando-")
+        with os.fdopen(fd, "wb") as arquivo:
+            arquivo.write(resultado.content)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, os.path.join(self.base_dir, nome_arquivo(url)))
@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.logger_config import logger
+
+
+class SnapshotStore:
+    """
+    Armazena snapshots versionados e colunares em disco.
+
+    Cada snapshot é um diretório `<base_dir>/<nome>/<versao>/` com um arquivo
+    `.npy` por array e um `meta.json`. O arquivo `<base_dir>/<nome>/CURRENT`
+    aponta para a versão vigente e é trocado atomicamente (`os.replace`), de
+    modo que leitores nunca veem um snapshot incompleto. Os arrays são abertos
+    com `mmap_mode='r'`, então vários workers compartilham as mesmas páginas
+    pelo page cache do sistema operacional.
+    """
+
+    CURRENT = "CURRENT"
+    META = "meta.json"
+
+    def __init__(self, base_dir: str, keep_versions: int = 2):
+        self.base_dir = base_dir
+        self.keep_versions = keep_versions
+
+    def save(self, nome: str, versao: str, arrays: Dict[str, np.ndarray], meta: Dict) -> str:
+        """
+        Grava um snapshot e o torna a versão vigente.
+
+        Returns:
+            str: Caminho do diretório da versão gravada.
+        """
+        pasta = os.path.join(self.base_dir, nome)
+        destino = os.path.join(pasta, versao)
+        os.makedirs(pasta, exist_ok=True)
+
+        if not os.path.isdir(destino):
+            temporario = tempfile.mkdtemp(prefix=f".{versao}-", dir=pasta)
+            try:
+                for chave, array in arrays.items():
+                    np.save(os.path.join(temporario, f"{chave}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+                with open(os.path.join(temporario, self.META), "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False)
+                os.rename(temporario, destino)
+            except OSError:
+                # Outro worker pode ter gravado a mesma versão ao mesmo tempo
+                shutil.rmtree(temporario, ignore_errors=True)
+                if not os.path.isdir(destino):
+                    raise
+
+        self._write_current(pasta, versao)
+        self._prune(pasta, versao)
+        return destino
+
+    def load(self, nome: str) -> Optional[Tuple[str, Dict[str, np.ndarray], Dict]]:
+        """
+        Abre a versão vigente de um snapshot.
+
+        Returns:
+            Optional[Tuple]: (versao, arrays mapeados em memória, meta) ou None
+            se não houver snapshot válido.
+        """
+        pasta = os.path.join(self.base_dir, nome)
+        try:
+            with open(os.path.join(pasta, self.CURRENT), encoding="utf-8") as f:
+                versao = f.read().strip()
+            destino = os.path.join(pasta, versao)
+            with open(os.path.join(destino, self.META), encoding="utf-8") as f:
+                meta = json.load(f)
+            arrays = {
+                arquivo[:-4]: np.load(os.path.join(destino, arquivo), mmap_mode="r", allow_pickle=False)
+                for arquivo in os.listdir(destino)
+                if arquivo.endswith(".npy")
+            }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Snapshot {nome} inválido, ignorando: {e}")
+            return None
+        return versao, arrays, meta
+
+    def _write_current(self, pasta: str, versao: str) -> None:
+        fd, temporario = tempfile.mkstemp(prefix=f".{self.CURRENT}-", dir=pasta)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(versao)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, os.path.join(pasta, self.CURRENT))
+
+    def _prune(self, pasta: str, atual: str) -> None:
+        # Mantém a versão vigente e as mais recentes; as demais são removidas
+        versoes = [
+            os.path.join(pasta, d)
+            for d in os.listdir(pasta)
+            if not d.startswith(".") and d != atual and os.path.isdir(os.path.join(pasta, d))
+        ]
+        versoes.sort(key=os.path.getmtime, reverse=True)
+        for antiga in versoes[max(self.keep_versions - 1, 0):]:
+            shutil.rmtree(antiga, ignore_errors=True)
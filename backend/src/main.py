@@ -1,13 +1,18 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from infra.db.initialize import create_database, create_admin_user
+from infra.db.database import dispose_async_engine
 from contextlib import asynccontextmanager
 from domain.user.routes import router as user_router
 from domain.auth.routes import router as auth_router
 from domain.external_api.routes import router as external_api_router 
+from domain.external_api.use_cases import AsyncUseCases
+from domain.external_api.scheduler import ingestion_scheduler
+from core.settings import settings
 from colorama import Fore, Style
 from core.logger_config import logger
 import uvicorn
+import asyncio
 import os
 import time
 
@@ -15,14 +20,24 @@ import time
 async def lifespan(app: FastAPI):
     print("🔧 Inicializando recursos...")
     # 👉 Executa na startup (antes da API começar a aceitar requisições)
-    create_database()
-    create_admin_user()
+    # Criação das tabelas e do admin (bcrypt) fora do event loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, create_database)
+    await loop.run_in_executor(None, create_admin_user)
+    # Cliente HTTP compartilhado (pool keep-alive) para o upstream da Embrapa
+    await AsyncUseCases.iniciar()
+    # Aquece e mantém atualizados os datasets da Embrapa em background
+    if settings.EMBRAPA_SCHEDULER_ENABLED:
+        await ingestion_scheduler.start()
     # Aqui você poderia também abrir conexões com Redis, Mongo, Kafka, etc.
     yield
     # 👆 O yield separa o que é startup (acima) do que é shutdown (abaixo)
     print("🧹 Fechando recursos...")
     # 👉 Executa na shutdown (quando a API está desligando)
     # Fechar conexões com banco, Redis, encerrar consumidores, etc.
+    await ingestion_scheduler.stop()
+    await AsyncUseCases.encerrar()
+    await dispose_async_engine()
 
 # Instancia FastAPI
 app = FastAPI(
@@ -39,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "X-Data-Stale"],
 )
 
 # 🔗 Rotas
@@ -1,9 +1,12 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
 from core.settings import settings
+from infra.cache.token_cache import VerifiedTokenCache
 
 
 # Configurações
@@ -13,20 +16,39 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_EXP_MINUTES
 
 # Criptografia de senhas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Pool dedicado ao bcrypt (~100-300 ms por hash): limita quantos hashes rodam ao
+# mesmo tempo e mantém o event loop e o threadpool padrão livres
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# Tokens já verificados: requisições repetidas com o mesmo token não refazem a verificação
+token_cache = VerifiedTokenCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES)
+
 
 class AuthUtils:
     @staticmethod
     def verify_password(plain_password, hashed_password):
-        """Verifica a senha usando o hash armazenado."""
+        """Verifica a senha usando o hash armazenado (na thread de quem chama: use fora do event loop)."""
         return pwd_context.verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password):
-        """Gera o hash da senha."""
+        """Gera o hash da senha (na thread de quem chama: use fora do event loop)."""
         return pwd_context.hash(password)
 
+    @staticmethod
+    async def averify_password(plain_password, hashed_password):
+        """Versão assíncrona de `verify_password`: espera o pool do bcrypt sem bloquear o event loop."""
+        return await asyncio.wrap_future(password_executor.submit(pwd_context.verify, plain_password, hashed_password))
+
+    @staticmethod
+    async def aget_password_hash(password):
+        """Versão assíncrona de `get_password_hash`."""
+        return await asyncio.wrap_future(password_executor.submit(pwd_context.hash, password))
+
     @staticmethod
     def create_access_token(data: dict, expires_delta: timedelta = None):
         """Cria o token JWT com a data de expiração."""
@@ -41,9 +63,17 @@ class AuthUtils:
 
     @staticmethod
     def decode_access_token(token: str):
-        """Decodifica o token JWT e retorna o payload."""
+        """
+        Decodifica o token JWT e retorna o payload.
+
+        Tokens já verificados vêm do `token_cache` enquanto o `exp` não passar.
+        """
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            token_cache.put(token, payload)
             return payload
         except JWTError:
             raise HTTPException(
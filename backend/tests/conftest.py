@@ -0,0 +1,80 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.settings import settings
+from domain.external_api import use_cases
+from domain.external_api.routes import router
+from domain.external_api.use_cases import DATASETS_EMBRAPA, UseCases
+from infra.cache.dataset_cache import DatasetCache
+from utils.auth import AuthUtils
+
+# CSVs pequenos no formato da Embrapa. Importação e exportação têm duas colunas
+# por ano (quantidade e valor); produção e comercialização, uma só
+CSVS = {
+    "importacao": (
+        "Id\tPaís\t1970\t1970\t1971\t1971\n"
+        "1\tAlemanha\t10\t100\t20\t200\n"
+        "2\tÁfrica do Sul\t5\t50\t-\t\n"
+        "3\tEspanha\tnd\t30\t1\t2\n"
+    ),
+    "exportacao": (
+        "Id\tPaís\t1970\t1970\t1971\t1971\n"
+        "1\tAlemanha\t3\t33\t4\t44\n"
+        "2\tJapão\t7\t70\t8\t80\n"
+        "3\tEspanha\t1\t11\t-\t-\n"
+    ),
+    "producao": (
+        "id;control;produto;1970;1971;1972\n"
+        "1;VINHO DE MESA;VINHO DE MESA;100;110;120\n"
+        "2;vm_Tinto;Tinto;60;70;-\n"
+        "3;vm_Branco;Branco;40;nd;50\n"
+        "4;SUCO;SUCO;10;20;30\n"
+    ),
+    "comercializacao": (
+        "id;control;Produto;1970;1971;1972\n"
+        "1;VINHO DE MESA;VINHO DE MESA;90;100;110\n"
+        "2;vm_Tinto;Tinto;50;60;70\n"
+        "3;SUCO;SUCO;5;;15\n"
+    ),
+}
+
+
+def montar(nome: str, conteudo: str = None):
+    """Monta o dataset `nome` de `DATASETS_EMBRAPA` a partir de um CSV, como na atualização."""
+    config = DATASETS_EMBRAPA[nome]
+    df = UseCases.parse_csv(
+        (conteudo or CSVS[nome]).encode(config["encoding"]), config["sep"], config["encoding"], config["num_colunas_fixas"]
+    )
+    return UseCases.montar_dataset(
+        df, config["num_colunas_fixas"], None, config["csv_url"], config["sep"], config["encoding"], {}
+    )
+
+
+@pytest.fixture
+def montar_dataset(monkeypatch):
+    """`montar`, sem gravar snapshot."""
+    monkeypatch.setattr(settings, "EMBRAPA_SNAPSHOT_ENABLED", False)
+    return montar
+
+
+@pytest.fixture
+def datasets(montar_dataset):
+    """Datasets de `CSVS`."""
+    return {nome: montar_dataset(nome) for nome in CSVS}
+
+
+@pytest.fixture
+def cliente(datasets, monkeypatch):
+    """Cliente das rotas `/embrapa`, com os datasets de `CSVS` no cache e autenticação liberada."""
+    cache = DatasetCache(ttl_seconds=3600, max_entries=len(DATASETS_EMBRAPA))
+    for nome, dataset in datasets.items():
+        config = DATASETS_EMBRAPA[nome]
+        cache.put((config["csv_url"], config["sep"], config["encoding"]), dataset)
+    monkeypatch.setattr(use_cases, "dataset_cache", cache)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[AuthUtils.get_current_data_from_token] = lambda: {"sub": "teste", "user_type": "user"}
+    with TestClient(app) as cliente:
+        yield cliente
@@ -0,0 +1,79 @@
+import pytest
+
+from core.settings import settings
+from domain.external_api.aggregations import AgregacaoUseCases
+from domain.external_api.schemas import AgregacaoSchema, FiltrosDatasetSchema
+
+
+def _agregar(dataset, filtros=None, **parametros):
+    return AgregacaoUseCases.agregar(dataset, AgregacaoSchema(**parametros), filtros)
+
+
+def test_soma_por_ano(datasets):
+    assert _agregar(datasets["producao"]) == [
+        {"ano": 1970, "valor": 210.0},
+        {"ano": 1971, "valor": 200.0},
+        {"ano": 1972, "valor": 200.0},
+    ]
+
+
+def test_soma_por_ano_de_cada_medida_inclui_o_primeiro_ano(datasets):
+    importacao = datasets["importacao"]
+
+    assert _agregar(importacao, medida="quantidade") == [{"ano": 1970, "valor": 15.0}, {"ano": 1971, "valor": 21.0}]
+    assert _agregar(importacao, medida="valor") == [{"ano": 1970, "valor": 180.0}, {"ano": 1971, "valor": 202.0}]
+    # Sem `medida`, o padrão é o valor
+    assert _agregar(importacao) == _agregar(importacao, medida="valor")
+
+
+def test_media_por_pais(datasets):
+    resultado = _agregar(datasets["importacao"], group_by="Pais", op="mean")
+
+    assert resultado == [
+        {"chave": "Alemanha", "valor": 150.0},
+        {"chave": "Africa do Sul", "valor": 50.0},
+        {"chave": "Espanha", "valor": 16.0},
+    ]
+
+
+def test_top_n(datasets):
+    resultado = _agregar(datasets["producao"], group_by="produto", op="sum", top=2)
+
+    assert resultado == [{"chave": "VINHO DE MESA", "valor": 330.0}, {"chave": "Tinto", "valor": 130.0}]
+
+
+def test_filtros_de_ano_e_de_valor(datasets):
+    filtros = FiltrosDatasetSchema(ano_inicio=1971, pais=["espanha"])
+
+    assert _agregar(datasets["exportacao"], filtros, medida="quantidade") == [{"ano": 1971, "valor": None}]
+    assert _agregar(datasets["importacao"], filtros, medida="quantidade", op="count") == [{"ano": 1971, "valor": 1}]
+
+
+@pytest.mark.parametrize("medida", ["quantidade", "valor"])
+def test_medida_rejeitada_em_dataset_de_medida_unica(datasets, medida):
+    with pytest.raises(ValueError, match="única medida"):
+        _agregar(datasets["producao"], medida=medida)
+
+
+def test_operacao_de_serie_exige_group_by_ano(datasets):
+    with pytest.raises(ValueError, match="group_by=ano"):
+        _agregar(datasets["producao"], group_by="produto", op="yoy")
+
+
+def test_agregacoes_memoizadas_respeitam_o_limite(datasets, monkeypatch):
+    monkeypatch.setattr(settings, "EMBRAPA_AGGREGATION_CACHE_MAX_ENTRIES", 2)
+    calculos = []
+    calcular = AgregacaoUseCases._calcular
+
+    def contar(dataset, parametros, filtros):
+        calculos.append(parametros.op)
+        return calcular(dataset, parametros, filtros)
+
+    monkeypatch.setattr(AgregacaoUseCases, "_calcular", contar)
+    producao = datasets["producao"]
+
+    for op in ("sum", "mean", "sum", "max", "sum", "mean"):
+        _agregar(producao, op=op)
+
+    assert calculos == ["sum", "mean", "max", "mean"]
+    assert len(producao._agregacoes) == 2
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.settings import settings
+from domain.auth.use_cases import AsyncUseCases
+from domain.user import schemas
+from domain.user.use_cases import UserAsyncUseCases
+from infra.db.database import Base, montar_url
+from utils.auth import AuthUtils
+
+
+@pytest.fixture
+def sessao(tmp_path):
+    """Fábrica de `AsyncSession` sobre um SQLite com aiosqlite."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+
+    async def criar_tabelas():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(criar_tabelas())
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+def _novo(username: str) -> schemas.UserCreateRequestSchema:
+    return schemas.UserCreateRequestSchema(username=username, email=f"{username}@teste.com", password="segredo")
+
+
+def test_url_assincrona_do_sqlite_usa_aiosqlite(monkeypatch):
+    monkeypatch.setattr(settings, "DB_DRIVERNAME", "sqlite")
+    monkeypatch.setattr(settings, "DB_DATABASENAME", "teste.db")
+
+    assert montar_url(assincrona=True) == "sqlite+aiosqlite:///teste.db"
+
+
+def test_crud_de_usuarios_com_sessao_assincrona(sessao):
+    async def cenario():
+        async with sessao() as db:
+            criados = [await UserAsyncUseCases.create(db, _novo(nome)) for nome in ("ana", "bia", "caio")]
+            assert [u.is_active for u in criados] == [False, False, False]
+
+            por_email = await UserAsyncUseCases.get_by_email_or_username(db, "bia@teste.com")
+            assert por_email.username == "bia"
+            assert await AuthUtils.averify_password("segredo", por_email.hashed_password)
+
+            pagina, proximo = await UserAsyncUseCases.get_page(db, limit=2)
+            assert [u.username for u in pagina] == ["ana", "bia"]
+            pagina, proximo = await UserAsyncUseCases.get_page(db, after_id=proximo, limit=2)
+            assert ([u.username for u in pagina], proximo) == (["caio"], None)
+
+            atualizado = await UserAsyncUseCases.update(
+                db, criados[0].id, schemas.UserUpdateRequestSchema(is_active=True, user_type=schemas.UserTypeEnum.ADMIN)
+            )
+            assert (atualizado.is_active, atualizado.user_type) == (True, schemas.UserTypeEnum.ADMIN)
+            pagina, _ = await UserAsyncUseCases.get_page(db, is_active=True)
+            assert [u.username for u in pagina] == ["ana"]
+
+            assert await UserAsyncUseCases.delete(db, criados[1].id) is True
+            assert await UserAsyncUseCases.delete(db, criados[1].id) is False
+            assert await UserAsyncUseCases.get_by_id(db, criados[1].id) is None
+
+    asyncio.run(cenario())
+
+
+def test_login_com_sessao_assincrona(sessao):
+    async def status_do_login(db, usuario, senha):
+        try:
+            await AsyncUseCases.login(usuario, senha, db)
+        except HTTPException as e:
+            return e.status_code
+        return 200
+
+    async def cenario():
+        async with sessao() as db:
+            criado = await UserAsyncUseCases.create(db, _novo("ana"))
+            assert await status_do_login(db, "ana", "segredo") == 401  # conta ainda inativa
+
+            await UserAsyncUseCases.update(db, criado.id, schemas.UserUpdateRequestSchema(is_active=True))
+            resposta = await AsyncUseCases.login("ana@teste.com", "segredo", db)
+            assert AuthUtils.decode_access_token(resposta["access_token"])["sub"] == "ana"
+            assert await status_do_login(db, "ana", "errada") == 401
+            assert await status_do_login(db, "ninguem", "segredo") == 404
+
+    asyncio.run(cenario())
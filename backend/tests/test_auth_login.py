@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from core.settings import settings
+from domain.auth.use_cases import AsyncUseCases
+
+
+@pytest.fixture
+def login_lento(monkeypatch):
+    """`_login` que espera `liberar`; conta quantos logins rodam ao mesmo tempo."""
+    monkeypatch.setattr(settings, "AUTH_LOGIN_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "AUTH_LOGIN_MAX_QUEUE", 1)
+    estado = {"rodando": 0, "maximo": 0, "liberar": None}
+
+    async def _login(email_or_username, password, db_session):
+        estado["rodando"] += 1
+        estado["maximo"] = max(estado["maximo"], estado["rodando"])
+        try:
+            await estado["liberar"].wait()
+            if password == "errada":
+                raise HTTPException(status_code=401, detail="Incorrect password")
+            return {"access_token": email_or_username, "token_type": "bearer"}
+        finally:
+            estado["rodando"] -= 1
+
+    monkeypatch.setattr(AsyncUseCases, "_login", _login)
+    return estado
+
+
+async def _tentar(usuario, senha="segredo"):
+    try:
+        return await AsyncUseCases.login(usuario, senha, None)
+    except HTTPException as e:
+        return e
+
+
+def test_logins_acima_da_fila_recebem_503(login_lento):
+    async def cenario():
+        login_lento["liberar"] = asyncio.Event()
+        tarefas = [asyncio.create_task(_tentar(f"u{i}")) for i in range(5)]
+        await asyncio.sleep(0.01)
+        # 2 em andamento + 1 na fila; os outros 2 são recusados sem esperar
+        assert (login_lento["rodando"], AsyncUseCases._pendentes) == (2, 3)
+        login_lento["liberar"].set()
+        return await asyncio.gather(*tarefas)
+
+    resultados = asyncio.run(cenario())
+
+    assert [r["access_token"] for r in resultados[:3]] == ["u0", "u1", "u2"]
+    for recusado in resultados[3:]:
+        assert recusado.status_code == 503
+        assert recusado.headers == {"Retry-After": "1"}
+    assert login_lento["maximo"] == 2
+    assert AsyncUseCases._pendentes == 0
+
+
+def test_login_com_erro_libera_a_vaga(login_lento):
+    async def cenario():
+        login_lento["liberar"] = asyncio.Event()
+        login_lento["liberar"].set()
+        erros = await asyncio.gather(*(_tentar(f"u{i}", "errada") for i in range(3)))
+        assert AsyncUseCases._pendentes == 0
+        return erros, await asyncio.gather(*(_tentar(f"u{i}") for i in range(3)))
+
+    erros, sucessos = asyncio.run(cenario())
+
+    assert [e.status_code for e in erros] == [401, 401, 401]
+    assert [s["access_token"] for s in sucessos] == ["u0", "u1", "u2"]
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from domain.external_api.changes import CHAVE_CELULA, FeedMudancas, calcular_mudancas, celulas
+from domain.external_api.dataset import EmbrapaDataset
+from domain.external_api.use_cases import UseCases
+from infra.db.bulk_loader import SeriesBulkLoader
+from infra.db.models import EmbrapaCarga, EmbrapaSerie
+
+
+@pytest.fixture
+def loader(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'series.db'}")
+    EmbrapaSerie.__table__.create(engine)
+    EmbrapaCarga.__table__.create(engine)
+    yield SeriesBulkLoader(engine, batch_size=2)
+    engine.dispose()
+
+
+def _series(valores):
+    return pd.DataFrame({
+        "categoria": ["VINHO DE MESA", None, None][:len(valores)],
+        "chave": ["Tinto", "Branco", "Rosado"][:len(valores)],
+        "ocorrencia": np.zeros(len(valores), dtype=np.int64),
+        "ano": np.full(len(valores), 2020, dtype=np.int64),
+        "medida": [None] * len(valores),
+        "valor": np.asarray(valores, dtype=np.float64),
+    })
+
+
+def _linhas(loader, dataset="producao"):
+    with loader.engine.connect() as conn:
+        return conn.execute(
+            select(EmbrapaSerie.categoria, EmbrapaSerie.chave, EmbrapaSerie.ano, EmbrapaSerie.medida, EmbrapaSerie.valor)
+            .where(EmbrapaSerie.dataset == dataset)
+            .order_by(EmbrapaSerie.id)
+        ).all()
+
+
+def test_carga_grava_series_e_versao(loader):
+    assert loader.carregar("producao", "v1", _series([1.0, 2.5, 3.0])) == 3
+
+    assert _linhas(loader) == [
+        ("VINHO DE MESA", "Tinto", 2020, None, 1.0),
+        (None, "Branco", 2020, None, 2.5),
+        (None, "Rosado", 2020, None, 3.0),
+    ]
+    assert loader.versao_carregada("producao") == "v1"
+
+
+def test_mesma_versao_nao_e_recarregada(loader):
+    loader.carregar("producao", "v1", _series([1.0, 2.5, 3.0]))
+
+    assert loader.carregar("producao", "v1", _series([9.0, 9.0, 9.0])) == 0
+
+    assert [linha.valor for linha in _linhas(loader)] == [1.0, 2.5, 3.0]
+
+
+def test_nova_versao_substitui_as_linhas(loader):
+    loader.carregar("producao", "v1", _series([1.0, 2.5, 3.0]))
+    loader.carregar("comercializacao", "c1", _series([7.0]))
+
+    assert loader.carregar("producao", "v2", _series([4.0, 5.0])) == 2
+
+    assert [linha.valor for linha in _linhas(loader)] == [4.0, 5.0]
+    assert [linha.valor for linha in _linhas(loader, "comercializacao")] == [7.0]
+    assert loader.versao_carregada("producao") == "v2"
+    with loader.engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(EmbrapaCarga)).scalar_one() == 2
+
+
+def _dataset(linhas):
+    df = pd.DataFrame(linhas, columns=["id", "control", "produto", "2020", "2021"])
+    return EmbrapaDataset.from_dataframe(df, 3)
+
+
+def _conteudo(loader, dataset="producao"):
+    with loader.engine.connect() as conn:
+        linhas = conn.execute(
+            select(*(getattr(EmbrapaSerie, c) for c in CHAVE_CELULA + ["valor"])).where(EmbrapaSerie.dataset == dataset)
+        ).all()
+    return sorted(tuple(linha) for linha in linhas)
+
+
+def _esperado_celulas(dataset, posicoes):
+    return sorted(tuple(linha) for linha in celulas(dataset, *posicoes).astype(object).where(lambda d: d.notna(), None).itertuples(index=False))
+
+
+def _esperado(dataset):
+    return _esperado_celulas(dataset, (2, 1))
+
+
+def test_mudancas_sao_aplicadas_sem_recarregar(loader):
+    versoes = [
+        _dataset([[1, "TINTO", "Bordo", 10, 11], [2, "TINTO", "Bordo", 5, None], [3, None, "Total", 15, 11]]),
+        # Atualiza uma célula, remove outra, insere uma linha no meio (muda a posição das seguintes)
+        _dataset([[1, "TINTO", "Bordo", 10, 12], [2, "BRANCO", "Niagara", 1, 2], [3, "TINTO", "Bordo", None, None], [4, None, "Total", 16, 14]]),
+        _dataset([[1, "TINTO", "Bordo", 10, 12], [2, "BRANCO", "Niagara", 1, 3], [3, None, "Total", 11, 15]]),
+    ]
+    loader.carregar("producao", versoes[0].versao, celulas(versoes[0], 2, 1))
+    feed = FeedMudancas()
+    for anterior, atual in zip(versoes, versoes[1:]):
+        feed.registrar("producao", anterior.versao, atual.versao, calcular_mudancas(anterior, atual, 2, 1))
+    atualizacoes = feed.desde("producao", versoes[0].versao, versoes[-1].versao)
+
+    alteradas = loader.aplicar_mudancas("producao", versoes[0].versao, atualizacoes)
+
+    assert alteradas == sum(len(a["mudancas"]) for a in atualizacoes)
+    assert _conteudo(loader) == _esperado(versoes[-1])
+    assert loader.versao_carregada("producao") == versoes[-1].versao
+    with loader.engine.connect() as conn:
+        assert conn.execute(select(EmbrapaCarga.linhas)).scalar_one() == len(_esperado(versoes[-1]))
+    # Versão final já no banco: nada a fazer
+    assert loader.aplicar_mudancas("producao", versoes[0].versao, atualizacoes) == 0
+
+
+def test_mudancas_de_outra_versao_nao_sao_aplicadas(loader):
+    v1 = _dataset([[1, "TINTO", "Bordo", 10, 11]])
+    v2 = _dataset([[1, "TINTO", "Bordo", 10, 12]])
+    loader.carregar("producao", "outra", celulas(v1, 2, 1))
+    atualizacoes = [{"versao_anterior": v1.versao, "versao": v2.versao, "mudancas": calcular_mudancas(v1, v2, 2, 1)}]
+
+    assert loader.aplicar_mudancas("producao", v1.versao, atualizacoes) is None
+    assert loader.versao_carregada("producao") == "outra"
+
+
+def _contagem_por_ano_e_medida(loader):
+    with loader.engine.connect() as conn:
+        linhas = conn.execute(
+            select(EmbrapaSerie.dataset, EmbrapaSerie.ano, EmbrapaSerie.medida, func.count())
+            .group_by(EmbrapaSerie.dataset, EmbrapaSerie.ano, EmbrapaSerie.medida)
+        ).all()
+    return {(dataset, ano, medida): total for dataset, ano, medida, total in linhas}
+
+
+def test_carga_tem_as_duas_medidas_do_primeiro_ano(loader, datasets):
+    for nome in ("importacao", "exportacao"):
+        dataset = datasets[nome]
+        loader.carregar(nome, dataset.versao, celulas(dataset, *UseCases.posicoes_chave(dataset)))
+
+    assert _contagem_por_ano_e_medida(loader) == {
+        ("importacao", 1970, "quantidade"): 2,
+        ("importacao", 1970, "valor"): 3,
+        ("importacao", 1971, "quantidade"): 2,
+        ("importacao", 1971, "valor"): 2,
+        ("exportacao", 1970, "quantidade"): 3,
+        ("exportacao", 1970, "valor"): 3,
+        ("exportacao", 1971, "quantidade"): 2,
+        ("exportacao", 1971, "valor"): 2,
+    }
+
+
+def test_mudanca_na_quantidade_do_primeiro_ano_chega_ao_banco(loader, montar_dataset):
+    cabecalho = "Id\tPaís\t1970\t1970\t1971\t1971\n"
+    v1 = montar_dataset("importacao", cabecalho + "1\tAlemanha\t10\t100\t20\t200\n")
+    v2 = montar_dataset("importacao", cabecalho + "1\tAlemanha\t11\t100\t20\t200\n")
+    posicoes = UseCases.posicoes_chave(v1)
+    loader.carregar("importacao", v1.versao, celulas(v1, *posicoes))
+    mudancas = calcular_mudancas(v1, v2, *posicoes)
+
+    assert [(m["ano"], m["medida"], m["anterior"], m["atual"]) for m in mudancas] == [(1970, "quantidade", 10.0, 11.0)]
+
+    atualizacoes = [{"versao_anterior": v1.versao, "versao": v2.versao, "mudancas": mudancas}]
+    assert loader.aplicar_mudancas("importacao", v1.versao, atualizacoes) == 1
+    assert _conteudo(loader, "importacao") == _esperado_celulas(v2, posicoes)
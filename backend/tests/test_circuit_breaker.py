@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from infra.http.circuit_breaker import CircuitBreaker, CircuitoAbertoError
+
+
+def _falhas_simultaneas(breaker: CircuitBreaker, quantidade: int) -> None:
+    """Simula `quantidade` chamadas liberadas juntas que falham depois que todas começaram."""
+    liberadas = threading.Barrier(quantidade)
+
+    def chamada():
+        breaker.permitir()
+        liberadas.wait()
+        breaker.registrar_falha()
+
+    threads = [threading.Thread(target=chamada) for _ in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_falhas_simultaneas_abrem_o_circuito_uma_vez():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, max_reset_timeout=600)
+
+    _falhas_simultaneas(breaker, 8)
+
+    status = breaker.status()
+    assert status["estado"] == CircuitBreaker.ABERTO
+    assert status["aberturas_consecutivas"] == 1
+    assert status["retry_after"] == pytest.approx(30, abs=1)
+
+
+def test_falha_da_sonda_aumenta_a_espera(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr("infra.http.circuit_breaker.time.monotonic", lambda: agora[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, max_reset_timeout=600)
+
+    breaker.permitir()
+    breaker.registrar_falha()
+    with pytest.raises(CircuitoAbertoError):
+        breaker.permitir()
+
+    agora[0] += 31
+    breaker.permitir()  # sonda do meio-aberto
+    breaker.registrar_falha()
+
+    assert breaker.status()["aberturas_consecutivas"] == 2
+    assert breaker.status()["retry_after"] == pytest.approx(60)
+
+
+def test_sucesso_fecha_o_circuito():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.permitir()
+    breaker.registrar_falha()
+    breaker.permitir()
+    breaker.registrar_sucesso()
+    assert breaker.fechado
+    assert breaker.status()["aberturas_consecutivas"] == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.settings import settings
+from domain.external_api import use_cases
+from domain.external_api.use_cases import DATASETS_EMBRAPA, AsyncUseCases
+from infra.cache.dataset_cache import DatasetCache
+from infra.http.async_client import AsyncConditionalFetcher
+from infra.sources.data_source import HttpDataSource
+
+CSV = "id;control;produto;1970;1971\n1;VINHO DE MESA;VINHO DE MESA;100;110\n2;vm_Tinto;Tinto;60;70\n"
+ETAG = '"v1"'
+LAST_MODIFIED = "Sun, 18 Oct 2026 06:00:00 GMT"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Site da Embrapa simulado: responde 304 a quem envia o ETag atual. Guarda os headers de cada GET."""
+    monkeypatch.setattr(settings, "EMBRAPA_SNAPSHOT_ENABLED", False)
+    recebidos = []
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        recebidos.append(request.headers)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304)
+        return httpx.Response(200, content=CSV.encode("latin1"), headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+
+    fetcher = AsyncConditionalFetcher()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(responder))
+    monkeypatch.setattr(use_cases, "data_source", HttpDataSource(fetcher))
+    monkeypatch.setattr(use_cases, "dataset_cache", DatasetCache(ttl_seconds=3600, max_entries=4))
+    yield recebidos
+    asyncio.run(fetcher.close())
+
+
+def test_304_reaproveita_o_dataset_e_os_validadores(upstream):
+    config = DATASETS_EMBRAPA["producao"]
+
+    async def cenario():
+        primeiro = await AsyncUseCases.obter_dataset(**config)
+        atualizado = await AsyncUseCases.obter_dataset(**config, forcar=True)
+        return primeiro, atualizado
+
+    primeiro, atualizado = asyncio.run(cenario())
+
+    # Primeiro GET completo; o segundo é condicional e volta sem corpo
+    assert "if-none-match" not in upstream[0]
+    assert (upstream[1]["if-none-match"], upstream[1]["if-modified-since"]) == (ETAG, LAST_MODIFIED)
+    assert atualizado is primeiro
+    assert (atualizado.etag, atualizado.last_modified) == (ETAG, LAST_MODIFIED)
+    assert use_cases.data_source.validators(config["csv_url"]) == {"etag": ETAG, "last_modified": LAST_MODIFIED}
+    assert [r["produto"] for r in atualizado.registros()] == ["VINHO DE MESA", "Tinto"]
+
+
+def test_304_nao_apaga_os_validadores_do_fetcher(upstream):
+    fetcher = use_cases.data_source.async_fetcher
+    url = DATASETS_EMBRAPA["producao"]["csv_url"]
+
+    async def cenario():
+        completo = await fetcher.fetch(url)
+        return completo, await fetcher.fetch(url, conditional=True)
+
+    completo, nao_modificado = asyncio.run(cenario())
+
+    assert (completo.not_modified, completo.content) == (False, CSV.encode("latin1"))
+    assert (nao_modificado.not_modified, nao_modificado.content) == (True, None)
+    assert (nao_modificado.etag, nao_modificado.last_modified) == (ETAG, LAST_MODIFIED)
+    assert fetcher.validators(url) == {"etag": ETAG, "last_modified": LAST_MODIFIED}
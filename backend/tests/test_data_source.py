@@ -0,0 +1,42 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from core.settings import settings
+from domain.external_api.use_cases import DATASETS_EMBRAPA, criar_data_source
+from infra.sources.data_source import HttpDataSource, LocalDirectoryDataSource
+
+URL = DATASETS_EMBRAPA["producao"]["csv_url"]
+
+
+@pytest.mark.parametrize("tipo", ["local", "record"])
+def test_origem_local_exige_diretorio(tipo):
+    with pytest.raises(ValueError, match="EMBRAPA_SOURCE_DIR"):
+        criar_data_source(tipo, None)
+
+
+def test_origem_padrao_nao_usa_diretorio():
+    assert isinstance(criar_data_source("http", None), HttpDataSource)
+
+
+def test_diretorio_local_entrega_o_arquivo_e_304_sem_mudancas(tmp_path):
+    (tmp_path / "Producao.csv").write_bytes("id;produto;1970\n1;Tinto;10\n".encode("latin1"))
+    origem = criar_data_source("local", str(tmp_path))
+
+    async def cenario():
+        return await origem.afetch(URL), await origem.afetch(URL, conditional=True)
+
+    completo, nao_modificado = asyncio.run(cenario())
+
+    assert isinstance(origem, LocalDirectoryDataSource)
+    assert completo.content == "id;produto;1970\n1;Tinto;10\n".encode("latin1")
+    assert (nao_modificado.not_modified, nao_modificado.etag) == (True, completo.etag)
+
+
+@pytest.mark.skipif("EMBRAPA_SNAPSHOT_DIR" in os.environ, reason="diretório definido no ambiente")
+def test_snapshots_ficam_dentro_do_projeto_por_padrao():
+    backend = Path(__file__).resolve().parents[1]
+
+    assert Path(settings.EMBRAPA_SNAPSHOT_DIR) == backend / "snapshots"
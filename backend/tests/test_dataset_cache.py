@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from infra.cache import dataset_cache as modulo
+from infra.cache.dataset_cache import DatasetCache
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio monotônico controlado pelo teste (`relogio.agora`)."""
+    relogio = SimpleNamespace(agora=1000.0)
+    monkeypatch.setattr(modulo, "time", SimpleNamespace(monotonic=lambda: relogio.agora))
+    return relogio
+
+
+class Carregador:
+    """Loader que devolve `valor` e registra a cópia anterior recebida em cada chamada."""
+
+    def __init__(self, valor="v1", erro=None):
+        self.valor = valor
+        self.erro = erro
+        self.anteriores = []
+
+    async def __call__(self, anterior):
+        self.anteriores.append(anterior)
+        await asyncio.sleep(0)
+        if self.erro is not None:
+            raise self.erro
+        return self.valor
+
+
+async def _concluir_atualizacoes(cache):
+    while cache._tasks:
+        await asyncio.gather(*cache._tasks)
+
+
+def test_cache_frio_carrega_e_os_acessos_seguintes_usam_a_copia(relogio):
+    cache = DatasetCache(ttl_seconds=60, max_entries=4)
+    carregar = Carregador()
+
+    async def cenario():
+        return [await cache.aget("producao", carregar) for _ in range(3)]
+
+    assert asyncio.run(cenario()) == ["v1", "v1", "v1"]
+    assert carregar.anteriores == [None]
+
+
+def test_entrada_expirada_e_servida_enquanto_atualiza(relogio):
+    cache = DatasetCache(ttl_seconds=60, max_entries=4)
+    carregar = Carregador()
+
+    async def cenario():
+        await cache.aget("producao", carregar)
+        relogio.agora += 59
+        assert cache.stats()["stale"] == 0
+        relogio.agora += 1  # TTL atingido
+        assert cache.stats()["stale"] == 1
+
+        carregar.valor = "v2"
+        # Stale-while-revalidate: a cópia antiga volta na hora e a atualização roda em background
+        antigos = [await cache.aget("producao", carregar) for _ in range(3)]
+        assert cache.stats()["refreshing"] == 1
+        await _concluir_atualizacoes(cache)
+        return antigos, await cache.aget("producao", carregar)
+
+    antigos, atualizado = asyncio.run(cenario())
+
+    assert antigos == ["v1", "v1", "v1"]
+    assert atualizado == "v2"
+    # Uma única atualização, que recebeu a cópia anterior (para o GET condicional)
+    assert carregar.anteriores == [None, "v1"]
+    assert cache.stats()["stale"] == cache.stats()["refreshing"] == 0
+
+
+def test_falha_na_atualizacao_mantem_a_copia_antiga(relogio):
+    cache = DatasetCache(ttl_seconds=60, max_entries=4)
+
+    async def cenario():
+        await cache.aget("producao", Carregador())
+        relogio.agora += 60
+        falha = Carregador(erro=RuntimeError("upstream fora do ar"))
+        assert await cache.aget("producao", falha) == "v1"
+        await _concluir_atualizacoes(cache)
+        assert cache.stats()["refreshing"] == 0
+        # A próxima requisição tenta de novo
+        assert await cache.aget("producao", Carregador("v2")) == "v1"
+        await _concluir_atualizacoes(cache)
+        return await cache.aget("producao", falha)
+
+    assert asyncio.run(cenario()) == "v2"
+
+
+def test_evicao_lru(relogio):
+    cache = DatasetCache(ttl_seconds=60, max_entries=2)
+
+    async def cenario():
+        for chave in ("a", "b"):
+            await cache.aget(chave, Carregador(chave))
+        await cache.aget("a", Carregador())  # "a" passa a ser o mais recente
+        await cache.aget("c", Carregador("c"))
+
+    asyncio.run(cenario())
+
+    assert cache.stats()["entries"] == 2
+    assert (cache.peek("a"), cache.peek("b"), cache.peek("c")) == ("a", None, "c")
+
+
+def test_put_respeita_o_limite_e_arefresh_ignora_o_ttl(relogio):
+    cache = DatasetCache(ttl_seconds=60, max_entries=2)
+    for chave in ("a", "b", "c"):
+        cache.put(chave, chave)
+
+    assert (cache.peek("a"), cache.stats()["entries"]) == (None, 2)
+
+    carregar = Carregador("b2")
+    assert asyncio.run(cache.arefresh("b", carregar)) == "b2"
+    assert carregar.anteriores == ["b"]
+
+
+def test_stats(relogio):
+    cache = DatasetCache(ttl_seconds=60, max_entries=4)
+    cache.put("a", "a")
+
+    assert cache.stats() == {
+        "entries": 1, "max_entries": 4, "ttl_seconds": 60, "stale": 0, "refreshing": 0, "in_flight": 0, "coalesced": 0,
+    }
+
+
+def test_status_mostra_o_cache(cliente):
+    resposta = cliente.get("/embrapa/status")
+
+    assert resposta.status_code == 200
+    assert {"entries", "max_entries", "ttl_seconds", "stale", "refreshing", "in_flight", "coalesced"} <= set(resposta.json()["cache"])
@@ -0,0 +1,59 @@
+import json
+
+from core.settings import settings
+from domain.external_api import joins
+from domain.external_api.joins import JuncaoUseCases
+from domain.external_api.schemas import JuncaoSchema
+
+
+def _juntar(datasets, nome_par, esquerda, direita, **parametros):
+    corpo = JuncaoUseCases.juntar(nome_par, datasets[esquerda], datasets[direita], JuncaoSchema(**parametros))
+    return {(r["chave"], r["ano"]): r for r in json.loads(corpo)}
+
+
+def test_balanca_comercial_tem_as_duas_medidas_do_primeiro_ano(datasets):
+    quantidade = _juntar(datasets, "balanca-comercial", "exportacao", "importacao", medida="quantidade")
+    valor = _juntar(datasets, "balanca-comercial", "exportacao", "importacao", medida="valor")
+
+    assert quantidade[("Alemanha", 1970)] == {"chave": "Alemanha", "ano": 1970, "exportacao": 3.0, "importacao": 10.0, "saldo": -7.0}
+    assert valor[("Alemanha", 1970)] == {"chave": "Alemanha", "ano": 1970, "exportacao": 33.0, "importacao": 100.0, "saldo": -67.0}
+    assert {ano for _, ano in quantidade} == {ano for _, ano in valor} == {1970, 1971}
+
+
+def test_balanca_comercial_junta_paises_sem_acento_e_mantem_os_dois_lados(datasets):
+    valor = _juntar(datasets, "balanca-comercial", "exportacao", "importacao")
+
+    assert valor[("Espanha", 1970)]["importacao"] == 30.0
+    assert valor[("Japao", 1971)] == {"chave": "Japao", "ano": 1971, "exportacao": 80.0, "importacao": None, "saldo": None}
+    assert valor[("Africa do Sul", 1970)]["exportacao"] is None
+    # Sem valor nos dois lados: o par (chave, ano) não aparece
+    assert ("Africa do Sul", 1971) not in valor
+
+
+def test_producao_comercializacao(datasets):
+    juncao = _juntar(datasets, "producao-comercializacao", "producao", "comercializacao", how="inner")
+
+    assert juncao[("Tinto", 1972)] == {"chave": "Tinto", "ano": 1972, "producao": None, "comercializacao": 70.0, "diferenca": None}
+    assert juncao[("SUCO", 1970)]["diferenca"] == 5.0
+    assert ("Branco", 1970) not in juncao
+
+
+def test_cache_de_juncoes_usa_o_proprio_limite(datasets, monkeypatch):
+    monkeypatch.setattr(joins, "juncao_cache", type(joins.juncao_cache)())
+    monkeypatch.setattr(settings, "EMBRAPA_CACHE_MAX_ENTRIES", 1)
+    monkeypatch.setattr(settings, "EMBRAPA_JOIN_CACHE_MAX_ENTRIES", 2)
+    calculos = []
+    calcular = JuncaoUseCases._calcular
+
+    def contar(nome_par, esquerda, direita, parametros, filtros):
+        calculos.append(parametros.how)
+        return calcular(nome_par, esquerda, direita, parametros, filtros)
+
+    monkeypatch.setattr(JuncaoUseCases, "_calcular", contar)
+
+    for how in ("outer", "inner", "outer", "left", "outer", "inner"):
+        _juntar(datasets, "balanca-comercial", "exportacao", "importacao", how=how)
+
+    # LRU de 2 corpos: "outer" continua em cache por ser reusado; "inner" foi descartado por "left"
+    assert calculos == ["outer", "inner", "left", "inner"]
+    assert len(joins.juncao_cache) == 2
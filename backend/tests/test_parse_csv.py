@@ -0,0 +1,156 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from core.settings import settings
+from domain.external_api.dataset import remover_acentos
+from domain.external_api.parsing import VALORES_AUSENTES, EsquemaCsv, ler_csv
+from domain.external_api.use_cases import UseCases
+
+# Arquivos no formato da Embrapa: faltantes vazios e marcados ("-", "nd"),
+# acentos nas colunas fixas e, na importação, duas colunas por ano (quantidade/valor)
+PRODUCAO = (
+    "id;control;Produção;1970;1971;1972\n"
+    "1;VINHO DE MESA;Tinto;217208604;-;2.5\n"
+    "2;VINHO DE MESA;  Rosé ;;nd;3\n"
+    "3;SUCO;Suco de uva;7;8;\n"
+).encode("latin1")
+
+IMPORTACAO = (
+    "Id\tPaís\t1970\t1970\t1971\t1971\n"
+    "1\tAlemanha\t52297\t30498\t-\t\n"
+    "2\tÁfrica do Sul\t0\t0\t12\t34.5\n"
+    "3\tEspanha\tnd\t\t1\t2\n"
+).encode("latin1")
+
+ARQUIVOS = [
+    pytest.param(PRODUCAO, ";", 3, id="producao"),
+    pytest.param(IMPORTACAO, "\t", 2, id="importacao"),
+]
+
+
+@pytest.fixture(params=["pandas", "pyarrow"])
+def engine(request, monkeypatch):
+    """Leitor dos CSVs; os testes com pyarrow são pulados se ele não estiver instalado."""
+    if request.param == "pyarrow":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(settings, "EMBRAPA_CSV_ENGINE", request.param)
+    return request.param
+
+
+def _transformar_legado(df: pd.DataFrame, num_colunas_fixas: int) -> list:
+    """Implementação original (iterrows), mantida aqui como referência."""
+    df.columns = [remover_acentos(str(c)) for c in df.columns]
+    for col in df.columns[:num_colunas_fixas]:
+        if df[col].dtype == object:
+            df[col] = df[col].apply(remover_acentos)
+
+    colunas_fixas = df.columns[:num_colunas_fixas]
+    colunas_dados = df.columns[num_colunas_fixas:]
+
+    resultado = []
+    for _, row in df.iterrows():
+        item = {col: row[col] for col in colunas_fixas}
+        dados = []
+        for col in colunas_dados:
+            try:
+                ano = float(col)
+                valor = row[col]
+                dados.append({"ano": ano, "valor": valor})
+            except:
+                continue
+        item["dados"] = dados
+        resultado.append(item)
+    return resultado
+
+
+def _ler_legado(conteudo: bytes, sep: str) -> pd.DataFrame:
+    """Leitura original: `read_csv` sem tipos e `fillna('')`."""
+    return pd.read_csv(io.BytesIO(conteudo), sep=sep, encoding="latin1").fillna('')
+
+
+def _valor_tipado(valor):
+    """Como o parse tipado entrega as células que o legado mantinha como texto."""
+    if not isinstance(valor, str):
+        return valor
+    if valor.strip() in VALORES_AUSENTES:
+        return ''
+    return float(valor)
+
+
+@pytest.mark.parametrize("conteudo, sep, num_colunas_fixas", ARQUIVOS)
+def test_transformacao_vetorizada_igual_ao_legado(conteudo, sep, num_colunas_fixas):
+    esperado = _transformar_legado(_ler_legado(conteudo, sep), num_colunas_fixas)
+
+    obtido = UseCases.transformar_dataframe_em_json(_ler_legado(conteudo, sep), num_colunas_fixas)
+
+    assert obtido == esperado
+
+
+@pytest.mark.parametrize("conteudo, sep, num_colunas_fixas", ARQUIVOS)
+def test_parse_csv_e_montar_dataset_iguais_ao_legado(monkeypatch, engine, conteudo, sep, num_colunas_fixas):
+    monkeypatch.setattr(settings, "EMBRAPA_SNAPSHOT_ENABLED", False)
+    legado = _transformar_legado(_ler_legado(conteudo, sep), num_colunas_fixas)
+    # Única diferença esperada: marcadores de ausente viram '' e números deixam de vir como texto
+    esperado = [
+        {**registro, "dados": [{**d, "valor": _valor_tipado(d["valor"])} for d in registro["dados"]]}
+        for registro in legado
+    ]
+
+    df = UseCases.parse_csv(conteudo, sep, "latin1", num_colunas_fixas)
+    dataset = UseCases.montar_dataset(df, num_colunas_fixas, None, "http://teste/arquivo.csv", sep, "latin1", {})
+
+    assert dataset.registros() == esperado
+    assert json.loads(dataset.corpo_serializado().identity) == json.loads(json.dumps(esperado))
+
+
+def test_importacao_mantem_o_layout_legado_com_a_quantidade_do_primeiro_ano(monkeypatch, engine):
+    monkeypatch.setattr(settings, "EMBRAPA_SNAPSHOT_ENABLED", False)
+    # As rotas originais liam ImpVinhos/ExpVinho com 3 colunas fixas: a quantidade de 1970 ia no campo "1970"
+    legado = _transformar_legado(_ler_legado(IMPORTACAO, "\t"), 3)
+    esperado = [
+        {
+            **registro,
+            "1970": _valor_tipado(registro["1970"]),
+            "dados": [{**d, "valor": _valor_tipado(d["valor"])} for d in registro["dados"]],
+        }
+        for registro in legado
+    ]
+
+    df = UseCases.parse_csv(IMPORTACAO, "\t", "latin1", 2)
+    dataset = UseCases.montar_dataset(df, 2, None, "http://teste/ImpVinhos.csv", "\t", "latin1", {})
+
+    assert dataset.colunas_fixas == ["Id", "Pais"]
+    assert dataset.registros() == esperado
+    # Na matriz, 1970 tem as duas medidas
+    assert dataset.valores[0, dataset.posicoes_medida("quantidade")].tolist()[0] == 52297
+    assert dataset.valores[0, dataset.posicoes_medida("valor")].tolist()[0] == 30498
+
+
+@pytest.mark.parametrize("conteudo, sep, num_colunas_fixas", ARQUIVOS)
+@pytest.mark.parametrize("infer_string", [False, True])
+def test_pyarrow_e_pandas_entregam_o_mesmo_dataframe(conteudo, sep, num_colunas_fixas, infer_string):
+    pytest.importorskip("pyarrow")
+    esquema = EsquemaCsv.padrao(sep, "latin1", num_colunas_fixas)
+
+    with pd.option_context("future.infer_string", infer_string):
+        df_pandas, relatorio_pandas = ler_csv(conteudo, esquema, engine="pandas")
+        df_pyarrow, relatorio_pyarrow = ler_csv(conteudo, esquema, engine="pyarrow")
+
+    assert (relatorio_pandas.engine, relatorio_pyarrow.engine) == ("pandas", "pyarrow")
+    # Mesmos valores e mesmos dtypes: texto como object (não StringDtype), anos como int64/float64
+    pd.testing.assert_frame_equal(df_pyarrow, df_pandas)
+    assert all(df_pyarrow[nome].dtype == object for nome in df_pyarrow.columns[1:num_colunas_fixas])
+
+
+def test_pyarrow_cai_no_pandas_com_valor_invalido():
+    pytest.importorskip("pyarrow")
+    conteudo = PRODUCAO.replace(b";nd;", b";abc;")
+
+    df, relatorio = ler_csv(conteudo, EsquemaCsv.padrao(";", "latin1", 3), engine="pyarrow")
+
+    assert relatorio.engine == "pandas"
+    assert relatorio.valores_invalidos == 1
+    assert pd.isna(df.loc[1, "1971"])
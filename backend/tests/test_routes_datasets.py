@@ -0,0 +1,166 @@
+import json
+import threading
+
+from domain.external_api import routes, use_cases
+from domain.external_api.use_cases import DATASETS_EMBRAPA
+
+
+def test_dataset_completo(cliente, datasets):
+    resposta = cliente.get("/embrapa/producao")
+
+    assert resposta.status_code == 200
+    assert resposta.json() == json.loads(json.dumps(datasets["producao"].registros()))
+    assert resposta.headers["etag"] == f'W/"{datasets["producao"].versao}"'
+
+
+def test_filtro_por_produto_ignora_acentos_e_maiusculas(cliente):
+    resposta = cliente.get("/embrapa/producao", params={"produto": ["tinto", "SUCO"]})
+
+    assert resposta.status_code == 200
+    assert [r["produto"] for r in resposta.json()] == ["Tinto", "SUCO"]
+
+
+def test_filtro_por_pais_e_intervalo_de_anos(cliente):
+    resposta = cliente.get("/embrapa/importacao", params={"pais": "africa do sul", "ano_inicio": 1971})
+
+    assert resposta.status_code == 200
+    [registro] = resposta.json()
+    assert registro["Pais"] == "Africa do Sul"
+    # Só 1971 (quantidade e valor, no layout legado `1971`/`1971.1`); "1970" fica de fora do intervalo
+    assert "1970" not in registro
+    assert registro["dados"] == [{"ano": 1971.0, "valor": ""}, {"ano": 1971.1, "valor": ""}]
+
+
+def test_projecao_de_campos(cliente):
+    resposta = cliente.get("/embrapa/producao", params={"campos": "produto", "ano_fim": 1970})
+
+    assert resposta.status_code == 200
+    assert resposta.json()[1] == {"produto": "Tinto", "dados": [{"ano": 1970.0, "valor": 60}]}
+    assert all(set(r) == {"produto", "dados"} for r in resposta.json())
+
+
+def test_filtro_sem_resultado_devolve_lista_vazia(cliente):
+    resposta = cliente.get("/embrapa/producao", params={"produto": "inexistente"})
+
+    assert resposta.status_code == 200
+    assert resposta.json() == []
+
+
+def test_filtro_que_nao_se_aplica_ao_dataset(cliente):
+    resposta = cliente.get("/embrapa/producao", params={"pais": "Alemanha"})
+
+    assert resposta.status_code == 400
+    assert "não se aplica" in resposta.json()["detail"]
+
+
+def test_parametros_diferentes_tem_etags_diferentes(cliente):
+    completo = cliente.get("/embrapa/producao")
+    filtrado = cliente.get("/embrapa/producao", params={"produto": "Tinto"})
+
+    assert filtrado.headers["etag"] != completo.headers["etag"]
+    assert cliente.get("/embrapa/producao", params={"produto": "Tinto"}, headers={"If-None-Match": filtrado.headers["etag"]}).status_code == 304
+
+
+def test_selecao_e_serializada_fora_do_event_loop(cliente, monkeypatch):
+    threads = []
+    corpo_json = routes._corpo_json
+
+    def registrar(dataset, selecao):
+        threads.append(threading.current_thread().name)
+        return corpo_json(dataset, selecao)
+
+    monkeypatch.setattr(routes, "_corpo_json", registrar)
+
+    assert cliente.get("/embrapa/producao", params={"produto": "Tinto"}).status_code == 200
+    assert len(threads) == 1 and threads[0].startswith("csv-parser")
+
+
+def _paginas(cliente, rota, **params):
+    """Segue o `X-Next-Cursor` até a última página; devolve os registros de cada página."""
+    paginas, cursor = [], None
+    while True:
+        resposta = cliente.get(rota, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert resposta.status_code == 200
+        paginas.append(resposta.json())
+        cursor = resposta.headers.get("x-next-cursor")
+        if cursor is None:
+            return paginas
+
+
+def test_paginacao_por_cursor_percorre_o_dataset(cliente):
+    completo = cliente.get("/embrapa/producao").json()
+
+    paginas = _paginas(cliente, "/embrapa/producao", limit=3)
+
+    assert [len(p) for p in paginas] == [3, 1]
+    assert [r for p in paginas for r in p] == completo
+
+
+def test_paginacao_com_filtro_e_projecao(cliente):
+    paginas = _paginas(cliente, "/embrapa/importacao", limit=1, pais=["alemanha", "espanha"], campos="Pais")
+
+    assert [[r["Pais"] for r in p] for p in paginas] == [["Alemanha"], ["Espanha"]]
+    assert all(set(r) == {"Pais", "1970", "dados"} for p in paginas for r in p)
+
+
+def test_cursor_invalido(cliente):
+    resposta = cliente.get("/embrapa/producao", params={"limit": 2, "cursor": "nao-e-um-cursor"})
+
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Cursor inválido."
+
+
+def test_cursor_de_versao_anterior_expira(cliente, montar_dataset):
+    cursor = cliente.get("/embrapa/producao", params={"limit": 2}).headers["x-next-cursor"]
+    # Nova versão do dataset entre uma página e outra
+    config = DATASETS_EMBRAPA["producao"]
+    novo = montar_dataset("producao", "id;control;produto;1970;1971\n1;VINHO DE MESA;VINHO DE MESA;101;110\n")
+    use_cases.dataset_cache.put((config["csv_url"], config["sep"], config["encoding"]), novo)
+
+    resposta = cliente.get("/embrapa/producao", params={"limit": 2, "cursor": cursor})
+
+    assert resposta.status_code == 409
+    assert "Reinicie sem o cursor" in resposta.json()["detail"]
+
+
+def test_ndjson_um_registro_por_linha(cliente, monkeypatch):
+    # Blocos menores que o dataset: o corpo é enviado em mais de um pedaço
+    blocos_linhas = use_cases.EmbrapaDataset.blocos_linhas
+    monkeypatch.setattr(use_cases.EmbrapaDataset, "blocos_linhas", lambda self, linhas=None: blocos_linhas(self, linhas, 3))
+    completo = cliente.get("/embrapa/producao").json()
+
+    resposta = cliente.get("/embrapa/producao", params={"stream": "true"})
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == "application/x-ndjson"
+    assert resposta.content.endswith(b"\n")
+    linhas = resposta.content.split(b"\n")[:-1]
+    assert [json.loads(linha) for linha in linhas] == completo
+
+
+def test_ndjson_pelo_accept_com_filtro_e_pagina(cliente):
+    resposta = cliente.get(
+        "/embrapa/importacao", params={"limit": 2, "campos": "Pais"}, headers={"Accept": "application/x-ndjson"}
+    )
+
+    assert resposta.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(linha)["Pais"] for linha in resposta.text.splitlines()] == ["Alemanha", "Africa do Sul"]
+    assert "x-next-cursor" in resposta.headers
+
+
+def test_ndjson_vazio(cliente):
+    resposta = cliente.get("/embrapa/producao", params={"stream": "true", "produto": "inexistente"})
+
+    assert resposta.status_code == 200
+    assert resposta.content == b""
+
+
+def test_paginas_e_ndjson_sao_serializados_fora_do_event_loop(cliente, monkeypatch):
+    threads = []
+    for nome in ("_corpo_json", "_bloco_ndjson"):
+        original = getattr(routes, nome)
+        monkeypatch.setattr(routes, nome, lambda *args, f=original: threads.append(threading.current_thread().name) or f(*args))
+
+    assert cliente.get("/embrapa/producao", params={"limit": 2}).status_code == 200
+    assert cliente.get("/embrapa/producao", params={"stream": "true"}).status_code == 200
+    assert len(threads) == 2 and all(nome.startswith("csv-parser") for nome in threads)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from domain.external_api.search import BuscaUseCases, IndiceBusca
+from domain.external_api import use_cases
+from domain.external_api.use_cases import AsyncUseCases, DATASETS_EMBRAPA
+
+
+@pytest.fixture
+def indice(datasets):
+    return IndiceBusca.montar(datasets)
+
+
+def _nomes(resultados):
+    return [(r["campo"], r["valor"]) for r in resultados]
+
+
+def test_busca_por_prefixo_sem_acentos_e_maiusculas(indice):
+    assert indice.buscar("ALEM") == [
+        {"valor": "Alemanha", "campo": "pais", "datasets": ["exportacao", "importacao"], "linhas": 2}
+    ]
+    assert _nomes(indice.buscar("áfrica")) == [("pais", "Africa do Sul")]
+    assert _nomes(indice.buscar("jap")) == [("pais", "Japao")]
+
+
+def test_cada_palavra_da_consulta_e_prefixo_de_uma_palavra_do_nome(indice):
+    assert _nomes(indice.buscar("vinho me", campo="produto")) == [("produto", "VINHO DE MESA")]
+    assert _nomes(indice.buscar("sul")) == [("pais", "Africa do Sul")]
+    assert indice.buscar("vinho tinto") == []
+
+
+def test_nome_igual_a_consulta_vem_primeiro(indice):
+    assert _nomes(indice.buscar("tinto")) == [("produto", "Tinto"), ("controle", "vm_Tinto")]
+    assert _nomes(indice.buscar("su")) == [("controle", "SUCO"), ("produto", "SUCO"), ("pais", "Africa do Sul")]
+    assert len(indice.buscar("su", limite=1)) == 1
+
+
+def test_consulta_sem_palavras(indice):
+    assert indice.buscar(" -- ") == []
+
+
+def test_indice_usa_apenas_datasets_em_cache(cliente, monkeypatch):
+    async def baixar(*args, **kwargs):
+        raise AssertionError("a busca não deve baixar datasets")
+
+    monkeypatch.setattr(AsyncUseCases, "obter_dataset", baixar)
+    monkeypatch.setattr(BuscaUseCases, "_indice", None)
+
+    indice = asyncio.run(BuscaUseCases.indice())
+
+    assert {nome for item in indice.itens for nome in item["datasets"]} == {"producao", "comercializacao", "importacao", "exportacao"}
+    # Mesmas versões em cache: o índice é reaproveitado
+    assert asyncio.run(BuscaUseCases.indice()) is indice
+
+
+def test_indice_e_remontado_quando_o_agendador_carrega_outra_versao(cliente, montar_dataset, monkeypatch):
+    monkeypatch.setattr(BuscaUseCases, "_indice", None)
+    antes = asyncio.run(BuscaUseCases.indice())
+    config = DATASETS_EMBRAPA["exportacao"]
+    novo = montar_dataset("exportacao", "Id\tPaís\t1970\t1970\n1\tUruguai\t1\t2\n")
+    use_cases.dataset_cache.put((config["csv_url"], config["sep"], config["encoding"]), novo)
+
+    depois = asyncio.run(BuscaUseCases.indice())
+
+    assert depois is not antes
+    assert _nomes(depois.buscar("urug")) == [("pais", "Uruguai")]
+    assert depois.buscar("jap") == []
+
+
+def test_rota_de_busca(cliente, monkeypatch):
+    monkeypatch.setattr(BuscaUseCases, "_indice", None)
+
+    resposta = cliente.get("/embrapa/search", params={"q": "espan", "campo": "pais"})
+
+    assert resposta.status_code == 200
+    assert resposta.json() == [{"valor": "Espanha", "campo": "pais", "datasets": ["exportacao", "importacao"], "linhas": 2}]
@@ -0,0 +1,47 @@
+import gzip
+import json
+
+import pytest
+
+from domain.external_api.serialization import CorpoSerializado, json_bytes, qualidades_encoding
+
+CORPO = CorpoSerializado(b'[{"pais":"Alemanha","dados":{"1970":10.0}}]' * 50)
+
+
+def _codificacao(accept_encoding):
+    corpo, codificacao = CORPO.escolher(accept_encoding)
+    assert corpo == {None: CORPO.identity, "gzip": CORPO.gzip, "br": CORPO.br}[codificacao]
+    return codificacao
+
+
+@pytest.mark.parametrize("accept_encoding, esperado", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("gzip;q=1, br;q=0.8", "gzip"),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0", "gzip"),
+    ("identity;q=1, gzip;q=0.5", None),
+    ("GZIP;Q=1", "gzip"),
+    ("gzip;q=abc", None),
+    ("", None),
+    (None, None),
+])
+def test_escolher_respeita_os_valores_q(accept_encoding, esperado):
+    assert _codificacao(accept_encoding) == esperado
+
+
+def test_qualidades_encoding():
+    assert qualidades_encoding("br;q=0, gzip ; q=0.7, deflate,") == {"br": 0.0, "gzip": 0.7, "deflate": 1.0}
+
+
+def test_variantes_tem_o_mesmo_conteudo():
+    assert gzip.decompress(CORPO.gzip) == CORPO.identity
+
+
+def test_json_bytes_no_formato_compacto():
+    obj = [{"país": "África do Sul", "dados": {"1970": 1.5, "1971": None}}]
+
+    assert json_bytes(obj) == json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
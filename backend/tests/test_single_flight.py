@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from infra.cache.dataset_cache import DatasetCache
+from infra.cache.single_flight import SingleFlight
+
+
+class Upstream:
+    """Corrotina contada que só termina quando `liberar` é sinalizado."""
+
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.chamadas = 0
+        self.liberar = None
+
+    async def __call__(self):
+        self.chamadas += 1
+        await self.liberar.wait()
+        if self.erro is not None:
+            raise self.erro
+        return f"resultado {self.chamadas}"
+
+
+async def _em_andamento(flight, chave, fn, quantidade):
+    fn.liberar = asyncio.Event()
+    tarefas = [asyncio.create_task(flight.ado(chave, fn)) for _ in range(quantidade)]
+    await asyncio.sleep(0)
+    return tarefas
+
+
+def test_chamadas_simultaneas_compartilham_uma_execucao():
+    flight, upstream = SingleFlight(), Upstream()
+
+    async def cenario():
+        tarefas = await _em_andamento(flight, "producao", upstream, 5)
+        assert flight.in_flight() == 1
+        upstream.liberar.set()
+        resultados = await asyncio.gather(*tarefas)
+        # Terminada a execução, a próxima chamada executa de novo
+        return resultados, await flight.ado("producao", upstream)
+
+    resultados, seguinte = asyncio.run(cenario())
+
+    assert resultados == ["resultado 1"] * 5
+    assert seguinte == "resultado 2"
+    assert (upstream.chamadas, flight.coalesced, flight.in_flight()) == (2, 4, 0)
+
+
+def test_chaves_diferentes_nao_sao_agrupadas():
+    flight, upstream = SingleFlight(), Upstream()
+
+    async def cenario():
+        upstream.liberar = asyncio.Event()
+        upstream.liberar.set()
+        return await asyncio.gather(flight.ado("producao", upstream), flight.ado("exportacao", upstream))
+
+    assert sorted(asyncio.run(cenario())) == ["resultado 1", "resultado 2"]
+    assert flight.coalesced == 0
+
+
+def test_excecao_chega_a_todos_os_que_esperam():
+    flight, upstream = SingleFlight(), Upstream(erro=RuntimeError("upstream fora do ar"))
+
+    async def cenario():
+        tarefas = await _em_andamento(flight, "producao", upstream, 3)
+        upstream.liberar.set()
+        return await asyncio.gather(*tarefas, return_exceptions=True)
+
+    erros = asyncio.run(cenario())
+
+    assert [str(e) for e in erros] == ["upstream fora do ar"] * 3
+    assert upstream.chamadas == 1
+    assert flight.in_flight() == 0
+
+
+def test_cancelar_um_chamador_nao_cancela_a_execucao():
+    flight, upstream = SingleFlight(), Upstream()
+
+    async def cenario():
+        lider, outro = await _em_andamento(flight, "producao", upstream, 2)
+        lider.cancel()
+        await asyncio.sleep(0)
+        upstream.liberar.set()
+        with pytest.raises(asyncio.CancelledError):
+            await lider
+        return await outro
+
+    assert asyncio.run(cenario()) == "resultado 1"
+    assert upstream.chamadas == 1
+
+
+def test_cache_frio_com_acessos_simultaneos_carrega_uma_vez():
+    cache = DatasetCache(ttl_seconds=60, max_entries=4)
+    upstream = Upstream()
+
+    async def carregar(anterior):
+        return await upstream()
+
+    async def cenario():
+        upstream.liberar = asyncio.Event()
+        tarefas = [asyncio.create_task(cache.aget("producao", carregar)) for _ in range(8)]
+        await asyncio.sleep(0)
+        upstream.liberar.set()
+        return await asyncio.gather(*tarefas)
+
+    assert asyncio.run(cenario()) == ["resultado 1"] * 8
+    assert upstream.chamadas == 1
+    assert cache.stats()["coalesced"] == 7
@@ -0,0 +1,88 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from infra.cache.token_cache import VerifiedTokenCache
+from utils import auth
+from utils.auth import AuthUtils
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """`token_cache` vazio no lugar do compartilhado."""
+    novo = VerifiedTokenCache(max_entries=8)
+    monkeypatch.setattr(auth, "token_cache", novo)
+    return novo
+
+
+def _payload(exp_em: float = 60) -> dict:
+    return {"sub": "ana", "exp": time.time() + exp_em}
+
+
+def test_token_verificado_vem_do_cache(cache):
+    token = AuthUtils.create_access_token({"sub": "ana", "user_type": "user"})
+
+    primeiro = AuthUtils.decode_access_token(token)
+    segundo = AuthUtils.decode_access_token(token)
+
+    assert segundo == primeiro and primeiro["sub"] == "ana"
+    assert (cache.stats()["hits"], cache.stats()["misses"], cache.stats()["entries"]) == (1, 1, 1)
+
+
+def test_token_em_cache_e_rejeitado_depois_do_exp(cache):
+    token = AuthUtils.create_access_token({"sub": "ana", "user_type": "user"}, expires_delta=timedelta(seconds=1))
+    exp = AuthUtils.decode_access_token(token)["exp"]
+    assert AuthUtils.decode_access_token(token)["sub"] == "ana"
+
+    # O jose só rejeita depois do segundo do `exp`; o cache descarta a entrada já no `exp`
+    time.sleep(max(0.0, exp + 1 - time.time()) + 0.05)
+
+    with pytest.raises(HTTPException) as erro:
+        AuthUtils.decode_access_token(token)
+    assert erro.value.status_code == 401
+    assert cache.stats()["expired"] >= 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_contadores(cache):
+    cache.put("a", _payload())
+
+    assert cache.get("b") is None
+    assert cache.get("a")["sub"] == "ana"
+    assert cache.get("a")["sub"] == "ana"
+    cache.put("velho", _payload(exp_em=-1))
+    assert cache.get("velho") is None
+
+    assert cache.stats() == {"entries": 1, "max_entries": 8, "hits": 2, "misses": 2, "expired": 1, "hit_ratio": 0.5}
+
+
+def test_evicao_lru_respeita_o_limite():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("a", _payload())
+    cache.put("b", _payload())
+    assert cache.get("a") is not None  # "a" passa a ser o mais recente
+
+    cache.put("c", _payload())
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_payload_devolvido_e_uma_copia(cache):
+    cache.put("a", _payload())
+
+    cache.get("a")["sub"] = "outro"
+
+    assert cache.get("a")["sub"] == "ana"
+
+
+def test_tokens_sem_exp_e_cache_desligado_nao_guardam_nada():
+    cache = VerifiedTokenCache(max_entries=8)
+    cache.put("sem-exp", {"sub": "ana"})
+    desligado = VerifiedTokenCache(max_entries=0)
+    desligado.put("a", _payload())
+
+    assert cache.stats()["entries"] == desligado.stats()["entries"] == 0